@@ -0,0 +1,9 @@
+"""
+Offline replay benchmark
+========================
+
+Replays a recorded (or synthetic) corpus of section and article pages
+through NewsBot against local stand-ins for the website, the Bot API and
+telegra.ph, and reports throughput, end-to-end latency and peak memory.
+See replay.py for the driver and corpus.py for recording a corpus.
+"""
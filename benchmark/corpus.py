@@ -0,0 +1,266 @@
+"""
+Benchmark corpus
+================
+
+A corpus is a directory holding the section listing pages, article pages
+and images of a website, indexed by manifest.json:
+
+    {
+      "website_url": "https://www.ansarollah.com.ye",
+      "sections": {"<name>": ["/archives/123", ...]},   # newest first
+      "section_pages": {"<name>": "sections/0.html"},
+      "pages": {"/archives/123": "pages/123.html"},
+      "files": {"/_files/<sha1>.jpg": {"path": "files/<sha1>.jpg", "content_type": "image/jpeg"}}
+    }
+
+Record one from the live site with
+
+    python -m benchmark.corpus record --out benchmark/corpus --per-section 20
+
+or generate a synthetic one with
+
+    python -m benchmark.corpus synthetic --out benchmark/corpus --per-section 30
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin, urlparse
+
+MANIFEST = "manifest.json"
+
+# Same selector the bot uses for the sections it creates
+DEFAULT_SELECTOR = "article a, .post-title a, .entry-title a"
+
+
+@dataclass
+class Corpus:
+    """Recorded website pages"""
+    root: str
+    website_url: str
+    sections: Dict[str, List[str]]
+    section_pages: Dict[str, str] = field(default_factory=dict)
+    pages: Dict[str, str] = field(default_factory=dict)
+    files: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, root: str) -> "Corpus":
+        with open(os.path.join(root, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        return cls(root=root, **manifest)
+
+    def save(self):
+        manifest = {
+            "website_url": self.website_url,
+            "sections": self.sections,
+            "section_pages": self.section_pages,
+            "pages": self.pages,
+            "files": self.files
+        }
+        with open(os.path.join(self.root, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    def read(self, relative_path: str) -> bytes:
+        with open(os.path.join(self.root, relative_path), "rb") as f:
+            return f.read()
+
+    def write(self, relative_path: str, data: bytes):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    @property
+    def article_count(self) -> int:
+        return sum(len(paths) for paths in self.sections.values())
+
+
+def record_corpus(out_dir: str, website_url: str, sections: Dict[str, str],
+                  selector: str = DEFAULT_SELECTOR, per_section: int = 20) -> Corpus:
+    """Download section and article pages from the live site"""
+    import requests
+    from bs4 import BeautifulSoup
+
+    session = requests.Session()
+    session.headers["User-Agent"] = "Mozilla/5.0 (benchmark recorder)"
+    corpus = Corpus(out_dir, website_url.rstrip("/"), {})
+
+    for index, (name, section_url) in enumerate(sections.items()):
+        response = session.get(section_url, timeout=30)
+        response.raise_for_status()
+        corpus.section_pages[name] = f"sections/{index}.html"
+        corpus.write(corpus.section_pages[name], response.content)
+
+        paths = []
+        soup = BeautifulSoup(response.content, "html.parser")
+        for link in soup.select(selector):
+            url = urljoin(section_url, link.get("href", ""))
+            path = urlparse(url).path
+            if not url.startswith(corpus.website_url) or path in paths or "/category/" in path:
+                continue
+            paths.append(path)
+            if len(paths) >= per_section:
+                break
+
+        for path in paths:
+            if path not in corpus.pages:
+                corpus.pages[path] = f"pages/{hashlib.sha1(path.encode()).hexdigest()}.html"
+                corpus.write(corpus.pages[path], _record_page(session, corpus, corpus.website_url + path))
+        corpus.sections[name] = paths
+        print(f"Recorded {len(paths)} articles of {name}")
+
+    corpus.save()
+    return corpus
+
+
+def _record_page(session, corpus: Corpus, url: str) -> bytes:
+    """Download an article and its images, pointing the images at the recorded copies"""
+    from bs4 import BeautifulSoup
+
+    response = session.get(url, timeout=30)
+    response.raise_for_status()
+    html = response.text
+
+    soup = BeautifulSoup(html, "html.parser")
+    image_urls = {tag.get("content") for tag in soup.select('meta[property="og:image"]')}
+    image_urls |= {tag.get("src") for tag in soup.select("article img, .entry-content img")}
+
+    for image_url in filter(None, image_urls):
+        absolute = urljoin(url, image_url)
+        try:
+            image = session.get(absolute, timeout=30)
+            image.raise_for_status()
+        except Exception as e:
+            print(f"Skipping image {absolute}: {e}")
+            continue
+
+        extension = os.path.splitext(urlparse(absolute).path)[1] or ".jpg"
+        path = f"/_files/{hashlib.sha1(absolute.encode()).hexdigest()}{extension}"
+        corpus.files[path] = {
+            "path": f"files{path[len('/_files'):]}",
+            "content_type": image.headers.get("Content-Type", "image/jpeg")
+        }
+        corpus.write(corpus.files[path]["path"], image.content)
+        html = html.replace(image_url, corpus.website_url + path)
+
+    return html.encode("utf-8")
+
+
+WORDS = (
+    "أعلن وزير الخارجية اليوم في مؤتمر صحفي عن مبادرة جديدة تهدف إلى تعزيز التعاون الإقليمي "
+    "بين الدول العربية وأكد أن الحكومة ستواصل جهودها لتحقيق الاستقرار والتنمية في مختلف "
+    "المحافظات كما أشار إلى أهمية دعم القطاع الصحي والتعليمي وتحسين الخدمات الأساسية "
+    "للمواطنين في المدن والأرياف وفي سياق متصل عقدت اللجنة الاقتصادية اجتماعها الدوري "
+    "لمناقشة الموازنة العامة وخطط الاستثمار في البنية التحتية والطاقة والزراعة"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+
+def _png(width: int, height: int, seed: int) -> bytes:
+    """Gradient RGB PNG, big enough to exercise the image pipeline"""
+    rows = b"".join(
+        b"\x00" + bytes((x * 255 // width + seed) % 256 for x in range(width)) * 3
+        for _ in range(height)
+    )
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def synthetic_corpus(out_dir: str, sections: List[str], per_section: int = 30,
+                     paragraphs: Tuple[int, int] = (4, 30), seed: int = 1,
+                     website_url: str = "https://www.ansarollah.com.ye") -> Corpus:
+    """Generate WordPress-like section and article pages"""
+    rng = random.Random(seed)
+    corpus = Corpus(out_dir, website_url, {})
+    article_id = 1000
+
+    for index, name in enumerate(sections):
+        paths = []
+        items = []
+        for _ in range(per_section):
+            article_id += 1
+            path = f"/archives/{article_id}"
+            title = _sentence(rng, rng.randint(6, 12)).rstrip(".")
+            image_path = f"/_files/{article_id}.png"
+
+            body = "".join(
+                f"<p>{' '.join(_sentence(rng, rng.randint(8, 25)) for _ in range(rng.randint(2, 6)))}</p>"
+                for _ in range(rng.randint(*paragraphs))
+            )
+            page = f"""<!DOCTYPE html>
+<html lang="ar" dir="rtl"><head><meta charset="utf-8"><title>{title}</title>
+<meta property="og:title" content="{title}">
+<meta property="og:image" content="{website_url}{image_path}">
+<meta property="article:published_time" content="2024-01-{article_id % 28 + 1:02d}T10:00:00+03:00">
+</head><body>
+<header><nav><a href="{website_url}/archives/category/news">أخبار</a></nav></header>
+<article><h1 class="entry-title">{title}</h1>
+<div class="entry-thumbnail"><img class="wp-post-image" src="{website_url}{image_path}"></div>
+<div class="entry-content">{body}</div></article>
+<footer><a href="{website_url}/tag/yemen">اليمن</a></footer>
+</body></html>"""
+
+            corpus.pages[path] = f"pages/{article_id}.html"
+            corpus.write(corpus.pages[path], page.encode("utf-8"))
+            corpus.files[image_path] = {"path": f"files/{article_id}.png", "content_type": "image/png"}
+            corpus.write(corpus.files[image_path]["path"], _png(480, 320, article_id))
+
+            paths.append(path)
+            items.append(f'<article><h2 class="entry-title"><a href="{website_url}{path}">{title}</a></h2></article>')
+
+        listing = f"""<!DOCTYPE html>
+<html lang="ar" dir="rtl"><head><meta charset="utf-8"><title>{name}</title></head><body>
+<main>{''.join(items)}</main>
+<a href="{website_url}/archives/category/{index}/page/2">التالي</a>
+</body></html>"""
+        corpus.section_pages[name] = f"sections/{index}.html"
+        corpus.write(corpus.section_pages[name], listing.encode("utf-8"))
+        corpus.sections[name] = paths
+
+    corpus.save()
+    return corpus
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Record or generate a benchmark corpus")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Record the live site's sections")
+    record.add_argument("--out", default="benchmark/corpus")
+    record.add_argument("--per-section", type=int, default=20)
+
+    synthetic = subparsers.add_parser("synthetic", help="Generate a synthetic corpus")
+    synthetic.add_argument("--out", default="benchmark/corpus")
+    synthetic.add_argument("--per-section", type=int, default=30)
+    synthetic.add_argument("--sections", nargs="+", default=["news", "statements", "articles"])
+    synthetic.add_argument("--seed", type=int, default=1)
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from ansarollah_config import AnsarallahConfig
+
+        sections = {name: section["url"] for name, section in AnsarallahConfig.SECTIONS.items()}
+        corpus = record_corpus(args.out, AnsarallahConfig.WEBSITE_URL, sections, per_section=args.per_section)
+    else:
+        corpus = synthetic_corpus(args.out, args.sections, args.per_section, seed=args.seed)
+
+    print(f"Corpus with {corpus.article_count} articles in {len(corpus.sections)} sections written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Fake servers
+============
+
+Local aiohttp stand-ins for the monitored website, the Telegram Bot API and
+telegra.ph. Each adds a configurable latency to every request and can
+answer a share of them with flood-control errors, so the bot's retry and
+backoff paths are part of the benchmark.
+
+FakeServerProcess runs the three servers in a child process with their own
+event loop, so serving them doesn't take CPU time, memory or event loop
+turns from the bot being measured.
+"""
+
+import asyncio
+import itertools
+import json
+import multiprocessing
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from aiohttp import web
+
+from benchmark.corpus import Corpus
+
+
+@dataclass
+class Behaviour:
+    """Latency and error injection of a fake server"""
+    latency: float = 0.0  # seconds added to every request
+    jitter: float = 0.0  # up to this many seconds more, uniformly
+    flood_rate: float = 0.0  # share of requests answered with flood control
+    retry_after: int = 1  # seconds the flood errors ask to wait
+
+    async def delay(self, rng: random.Random):
+        seconds = self.latency + (rng.uniform(0, self.jitter) if self.jitter else 0)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def flooded(self, rng: random.Random) -> bool:
+        return self.flood_rate > 0 and rng.random() < self.flood_rate
+
+
+class FakeServer:
+    """aiohttp application on a random local port"""
+
+    def __init__(self, behaviour: Behaviour = None, seed: int = 1):
+        self.behaviour = behaviour or Behaviour()
+        self.rng = random.Random(seed)
+        self.runner: Optional[web.AppRunner] = None
+        self.port = 0
+        self.requests = 0
+        self.floods = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def build_app(self) -> web.Application:
+        raise NotImplementedError
+
+    async def start(self):
+        self.runner = web.AppRunner(self.build_app(), access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.port = self.runner.addresses[0][1]
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+class FakeWebsite(FakeServer):
+    """Serves a corpus, revealing the articles of each section gradually like new posts"""
+
+    def __init__(self, corpus: Corpus, behaviour: Behaviour = None, seed: int = 1):
+        super().__init__(behaviour, seed)
+        self.corpus = corpus
+        self.visible = 0  # Articles listed per section, oldest first
+
+    def reveal(self, count: int):
+        """List `count` more articles of every section"""
+        self.visible += count
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self.handle)
+        return app
+
+    def _rewrite(self, html: str) -> str:
+        return html.replace(self.corpus.website_url, self.url)
+
+    def _section_page(self, name: str) -> str:
+        html = self.corpus.read(self.corpus.section_pages[name]).decode("utf-8", "replace")
+
+        # Newest first: only the oldest `visible` articles are published so far
+        paths = self.corpus.sections[name]
+        hidden = paths[:max(len(paths) - self.visible, 0)]
+        for path in hidden:
+            for href in (f'href="{self.corpus.website_url}{path}"', f'href="{path}"'):
+                html = html.replace(href, 'href="about:blank"')
+        return self._rewrite(html)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await self.behaviour.delay(self.rng)
+        path = request.path
+
+        for name in self.corpus.sections:
+            if path.rstrip("/") == f"/{name.lower()}":
+                return web.Response(text=self._section_page(name), content_type="text/html")
+
+        if path in self.corpus.pages:
+            html = self.corpus.read(self.corpus.pages[path]).decode("utf-8", "replace")
+            return web.Response(text=self._rewrite(html), content_type="text/html")
+
+        if path in self.corpus.files:
+            entry = self.corpus.files[path]
+            return web.Response(body=self.corpus.read(entry["path"]), content_type=entry["content_type"])
+
+        return web.Response(status=404)
+
+
+class FakeBotAPI(FakeServer):
+    """Minimal Bot API: answers sends with messages and long-polls an empty update queue"""
+
+    def __init__(self, behaviour: Behaviour = None, seed: int = 1):
+        super().__init__(behaviour, seed)
+        self.message_ids = itertools.count(1)
+        self.sent: List[Dict] = []  # {"method", "chat_id", "at"}
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.router.add_get("/bot{token}/{method}", self.handle)
+        return app
+
+    def _message(self, chat_id, text: str = "") -> Dict:
+        try:
+            chat_id = int(chat_id)
+        except (TypeError, ValueError):
+            pass
+        return {
+            "message_id": next(self.message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "channel", "title": "benchmark"},
+            "text": text
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        method = request.match_info["method"]
+        params = dict(await request.post()) if request.can_read_body else {}
+
+        if method == "getUpdates":
+            # Long polling with nothing to deliver
+            await asyncio.sleep(min(float(params.get("timeout", 0) or 0), 1.0))
+            return web.json_response({"ok": True, "result": []})
+
+        await self.behaviour.delay(self.rng)
+        if method.startswith(("send", "edit")) and self.behaviour.flooded(self.rng):
+            self.floods += 1
+            return web.json_response({
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.behaviour.retry_after}",
+                "parameters": {"retry_after": self.behaviour.retry_after}
+            }, status=429)
+
+        chat_id = params.get("chat_id", 0)
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Benchmark", "username": "benchmark_bot",
+                      "can_join_groups": False, "can_read_all_group_messages": False,
+                      "supports_inline_queries": False}
+        elif method == "sendMediaGroup":
+            media = json.loads(params.get("media", "[]"))
+            result = [self._message(chat_id) for _ in media]
+        elif method.startswith("send"):
+            result = self._message(chat_id, str(params.get("text", params.get("caption", ""))))
+        elif method.startswith("edit"):
+            result = self._message(chat_id)
+        else:
+            result = True
+
+        if method.startswith("send"):
+            self.sent.append({"method": method, "chat_id": chat_id, "at": time.monotonic()})
+        return web.json_response({"ok": True, "result": result})
+
+
+class FakeTelegraph(FakeServer):
+    """Minimal telegra.ph API and upload endpoint"""
+
+    def __init__(self, behaviour: Behaviour = None, seed: int = 1):
+        super().__init__(behaviour, seed)
+        self.pages: Dict[str, Dict] = {}
+        self.uploads = 0
+        self.tokens = itertools.count(1)
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_post("/upload", self.handle_upload)
+        app.router.add_post("/{method}", self.handle)
+        app.router.add_post("/{method}/{path}", self.handle)
+        return app
+
+    def _page(self, path: str) -> Dict:
+        page = self.pages[path]
+        return {"path": path, "url": f"https://telegra.ph/{path}", "title": page["title"], "views": 0}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await self.behaviour.delay(self.rng)
+        method = request.match_info["method"]
+        params = dict(await request.post())
+
+        if method in ("createPage", "editPage") and self.behaviour.flooded(self.rng):
+            self.floods += 1
+            return web.json_response({"ok": False, "error": f"FLOOD_WAIT_{self.behaviour.retry_after}"})
+
+        if method == "createAccount":
+            result = {"short_name": params.get("short_name", ""), "access_token": f"token{next(self.tokens)}"}
+        elif method == "getAccountInfo":
+            result = {"short_name": "benchmark", "page_count": len(self.pages)}
+        elif method == "createPage":
+            path = f"page-{len(self.pages) + 1}"
+            self.pages[path] = {"title": params.get("title", ""), "content": params.get("content", "")}
+            result = self._page(path)
+        elif method in ("editPage", "getPage"):
+            path = request.match_info.get("path", "")
+            if path not in self.pages:
+                return web.json_response({"ok": False, "error": "PAGE_NOT_FOUND"})
+            if method == "editPage":
+                self.pages[path] = {"title": params.get("title", ""), "content": params.get("content", "")}
+            result = self._page(path)
+        elif method == "getViews":
+            result = {"views": 0}
+        elif method == "getPageList":
+            result = {"total_count": len(self.pages), "pages": [self._page(path) for path in self.pages]}
+        else:
+            return web.json_response({"ok": False, "error": "METHOD_NOT_FOUND"})
+
+        return web.json_response({"ok": True, "result": result})
+
+    async def handle_upload(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await self.behaviour.delay(self.rng)
+        await request.read()
+        self.uploads += 1
+        return web.json_response([{"src": f"/file/{self.uploads}.jpg"}])
+
+
+async def _serve(conn, corpus_root: str, site: Behaviour, bot: Behaviour, telegraph: Behaviour):
+    """Run the fake servers and answer the parent's commands until it asks to stop"""
+    website = FakeWebsite(Corpus.load(corpus_root), site)
+    bot_api = FakeBotAPI(bot)
+    telegraph_api = FakeTelegraph(telegraph)
+    servers = (website, bot_api, telegraph_api)
+    for server in servers:
+        await server.start()
+    conn.send({"website": website.url, "bot_api": bot_api.url, "telegraph": telegraph_api.url})
+
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            command, argument = await loop.run_in_executor(None, conn.recv)
+            if command == "reveal":
+                website.reveal(argument)
+                conn.send(None)
+            elif command == "stats":
+                conn.send({
+                    "bot_api": {"requests": bot_api.requests, "sends": len(bot_api.sent), "floods": bot_api.floods},
+                    "telegraph": {"requests": telegraph_api.requests, "pages": len(telegraph_api.pages),
+                                  "uploads": telegraph_api.uploads, "floods": telegraph_api.floods},
+                    "website_requests": website.requests
+                })
+            else:
+                break
+    finally:
+        for server in servers:
+            await server.stop()
+
+
+def _serve_process(conn, corpus_root: str, site: Behaviour, bot: Behaviour, telegraph: Behaviour):
+    asyncio.run(_serve(conn, corpus_root, site, bot, telegraph))
+
+
+class FakeServerProcess:
+    """The fake website, Bot API and telegra.ph served from a child process"""
+
+    def __init__(self, corpus_root: str, site: Behaviour = None, bot: Behaviour = None,
+                 telegraph: Behaviour = None):
+        self.args = (corpus_root, site or Behaviour(), bot or Behaviour(), telegraph or Behaviour())
+        self.process = None
+        self.conn = None
+        self.urls: Dict[str, str] = {}  # "website", "bot_api", "telegraph" -> base URL
+
+    async def _call(self, command: str, argument=None):
+        # The pipe blocks, keep it off the bot's event loop
+        def call():
+            self.conn.send((command, argument))
+            return self.conn.recv()
+        return await asyncio.to_thread(call)
+
+    async def start(self, timeout: float = 30):
+        # Spawned rather than forked: the child gets a clean interpreter, not a copy of the bot's state
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_serve_process, args=(child_conn, *self.args), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+        ready = await asyncio.to_thread(self.conn.poll, timeout)
+        if not ready:
+            await self.stop()
+            raise RuntimeError(f"Fake servers did not start within {timeout} seconds")
+        self.urls = self.conn.recv()
+
+    async def reveal(self, count: int):
+        """List `count` more articles of every section of the website"""
+        await self._call("reveal", count)
+
+    async def stats(self) -> Dict:
+        """Request counters of the servers"""
+        return await self._call("stats")
+
+    async def stop(self, timeout: float = 10):
+        if not self.process:
+            return
+        if self.process.is_alive():
+            try:
+                self.conn.send(("stop", None))
+            except (BrokenPipeError, OSError):
+                pass
+            await asyncio.to_thread(self.process.join, timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                await asyncio.to_thread(self.process.join, timeout)
+        self.conn.close()
+        self.process = None
@@ -0,0 +1,233 @@
+"""
+Replay benchmark driver
+=======================
+
+Runs NewsBot monitoring cycles over a corpus served by the fake website,
+publishing through the fake Bot API and telegra.ph, then reports articles
+per minute, end-to-end latency percentiles and peak RSS. Each cycle
+reveals a few more articles per section, like a site posting new content.
+
+    python -m benchmark.replay --corpus benchmark/corpus --cycles 5 --per-cycle 4 \\
+        --bot-latency 0.05 --bot-flood-rate 0.02 --telegraph-latency 0.1 --json result.json
+
+Without a recorded corpus, --synthetic N generates one with N articles per
+section into a temporary directory. The bot runs on a temporary database
+and working directory, so the repository's data and bot.log are untouched.
+The fake servers run in a child process, so the bot's event loop, CPU time
+and peak RSS are measured without them.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmark.corpus import Corpus, synthetic_corpus
+from benchmark.fake_servers import Behaviour, FakeServerProcess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is in KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def bot_environment(args, workdir: str, corpus: Corpus, urls: Dict[str, str]) -> Dict[str, str]:
+    """Settings pointing the bot at the fake servers; --env entries override them"""
+    env = {
+        "BOT_TOKEN": "123456:benchmark",
+        "CHAT_ID": "-1001000000000",
+        "ADMIN_IDS": "[]",
+        "UPDATE_MODE": "polling",
+        "TELEGRAM_API_URL": urls["bot_api"],
+        "TELEGRAPH_API_URL": urls["telegraph"],
+        "TELEGRAPH_UPLOAD_URL": f"{urls['telegraph']}/upload",
+        "TELEGRAPH_TOKEN": "",
+        "WEBSITE_URL": urls["website"],
+        "WEBSITE_SECTIONS": json.dumps(list(corpus.sections), ensure_ascii=False),
+        "DATABASE_PATH": os.path.join(workdir, "benchmark.db"),
+        "AUTO_PUBLISH": "true",
+        "ENABLE_TEXT_SHORTENING": "true" if args.mode == "shortened" else "false",
+        "OUTBOX_RETRY_BASE_DELAY": "1",
+        "ENABLE_METRICS": "false",
+        "WORKER_MODE": "false",
+        "TRACE_BUFFER_SIZE": str(max(corpus.article_count * 2, 200)),
+    }
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+def published_urls(database_path: str) -> List[str]:
+    conn = sqlite3.connect(database_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT url FROM articles WHERE is_published = 1")]
+    finally:
+        conn.close()
+
+
+async def run(args) -> Dict:
+    corpus_dir = args.corpus
+    if args.synthetic:
+        corpus_dir = tempfile.mkdtemp(prefix="newsbot-corpus-")
+        synthetic_corpus(corpus_dir, ["news", "statements", "articles"], args.synthetic)
+    corpus = Corpus.load(os.path.abspath(corpus_dir))
+
+    servers = FakeServerProcess(
+        corpus.root,
+        site=Behaviour(args.site_latency, args.site_jitter),
+        bot=Behaviour(args.bot_latency, args.bot_jitter, args.bot_flood_rate, args.retry_after),
+        telegraph=Behaviour(args.telegraph_latency, args.telegraph_jitter, args.telegraph_flood_rate,
+                            args.retry_after)
+    )
+    await servers.start()
+
+    # Config reads the environment on import, so the bot modules are imported only now
+    workdir = tempfile.mkdtemp(prefix="newsbot-benchmark-")
+    os.environ.update(bot_environment(args, workdir, corpus, servers.urls))
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    from main import NewsBot
+    from tracing import tracer
+
+    logging.getLogger().setLevel(getattr(logging, args.log_level.upper()))
+
+    bot = NewsBot()
+    bot.db.init_database()
+    await bot.setup_initial_sections()
+    bot.running = True
+    bot.is_leader = True
+    bot_task = asyncio.create_task(bot.telegram_publisher.run_bot())
+    await asyncio.wait_for(bot.telegram_publisher.wait_until_ready(), timeout=30)
+
+    cycle_starts: Dict[str, float] = {}  # Article URL -> start of the cycle that revealed it
+    cycle_times = []
+    started = time.perf_counter()
+
+    for cycle in range(args.cycles):
+        await servers.reveal(args.per_cycle)
+        cycle_started = time.time()
+        cycle_timer = time.perf_counter()
+
+        await bot.pipeline.run_cycle()
+        await bot.telegram_publisher.process_due_outbox()
+
+        cycle_times.append(time.perf_counter() - cycle_timer)
+        for trace in tracer.recent(tracer.capacity):
+            cycle_starts.setdefault(trace.key, cycle_started)
+        print(f"Cycle {cycle + 1}/{args.cycles}: {cycle_times[-1]:.1f}s")
+
+    # Let flood-controlled publishes finish their retries
+    deadline = time.perf_counter() + args.drain_timeout
+    while bot.db.count_pending_outbox_items() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.5)
+        await bot.telegram_publisher.process_due_outbox()
+
+    elapsed = time.perf_counter() - started
+    published = published_urls(os.environ["DATABASE_PATH"])
+
+    # End to end: from the start of the cycle that revealed an article to the end of its publish
+    latencies = []
+    for url in published:
+        trace = tracer.get(url)
+        if not trace or url not in cycle_starts:
+            continue
+        ends = [span.started_at + span.duration for span in trace.spans
+                if span.name in ("publish", "send") and not span.error]
+        if ends:
+            latencies.append(max(ends) - cycle_starts[url])
+
+    await bot.telegram_publisher.stop_bot()
+    bot_task.cancel()
+    await asyncio.gather(bot_task, return_exceptions=True)
+    await bot.telegraph_manager.close()
+    server_stats = await servers.stats()
+    await servers.stop()
+
+    return {
+        "revision": git_revision(),
+        "mode": args.mode,
+        "cycles": args.cycles,
+        "articles_published": len(published),
+        "articles_pending": bot.db.count_pending_outbox_items(),
+        "elapsed_seconds": round(elapsed, 2),
+        "articles_per_minute": round(len(published) / elapsed * 60, 1) if elapsed else 0.0,
+        "cycle_seconds": [round(seconds, 2) for seconds in cycle_times],
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p90": round(percentile(latencies, 0.90), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(max(latencies), 2) if latencies else 0.0,
+            "mean": round(statistics.mean(latencies), 2) if latencies else 0.0
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        **server_stats
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Replay a corpus through NewsBot against fake servers")
+    parser.add_argument("--corpus", default=os.path.join(ROOT, "benchmark", "corpus"))
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="generate a corpus with N articles per section instead")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--per-cycle", type=int, default=4, help="new articles per section and cycle")
+    parser.add_argument("--mode", choices=("shortened", "full"), default="shortened")
+    parser.add_argument("--site-latency", type=float, default=0.02)
+    parser.add_argument("--site-jitter", type=float, default=0.02)
+    parser.add_argument("--bot-latency", type=float, default=0.05)
+    parser.add_argument("--bot-jitter", type=float, default=0.05)
+    parser.add_argument("--bot-flood-rate", type=float, default=0.0)
+    parser.add_argument("--telegraph-latency", type=float, default=0.1)
+    parser.add_argument("--telegraph-jitter", type=float, default=0.1)
+    parser.add_argument("--telegraph-flood-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1, help="seconds requested by flood errors")
+    parser.add_argument("--drain-timeout", type=float, default=60.0)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra bot setting, e.g. --env DIGEST_MODE=true")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
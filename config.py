@@ -1,9 +1,39 @@
 import os
-from dotenv import load_dotenv
-from typing import List, Dict, Optional
+import socket
+import importlib.util
+from dotenv import find_dotenv, dotenv_values
+from typing import List, Dict, Optional, Any, Tuple
 import json
 
-load_dotenv()
+# Variables of the process environment take precedence over .env, also on reload
+_PROCESS_ENV = dict(os.environ)
+ENV_FILE = find_dotenv()
+_env_file_keys = set()
+
+def load_env_file():
+    """Load .env into the environment, dropping variables removed from it since the last load"""
+    global _env_file_keys
+    values = {key: value for key, value in dotenv_values(ENV_FILE).items() if value is not None} if ENV_FILE else {}
+    
+    for key in _env_file_keys - set(values):
+        if key not in _PROCESS_ENV:
+            os.environ.pop(key, None)
+    for key, value in values.items():
+        if key not in _PROCESS_ENV:
+            os.environ[key] = value
+    _env_file_keys = set(values)
+
+load_env_file()
+
+# Settings read once at startup: changing them takes a restart
+RESTART_REQUIRED = frozenset({
+    "BOT_TOKEN", "UPDATE_MODE", "WEBHOOK_URL", "WEBHOOK_PATH", "WEBHOOK_LISTEN", "WEBHOOK_PORT",
+    "WEBHOOK_SECRET_TOKEN", "TELEGRAM_API_URL", "ENABLE_METRICS", "METRICS_LISTEN", "METRICS_PORT",
+    "METRICS_PATH", "LOOP_WATCHDOG_ENABLED", "WORKER_MODE", "WORKER_ID", "LEASE_DATABASE_URL", "LEASE_TTL",
+    "TELEGRAPH_TOKEN", "TELEGRAPH_API_URL", "TELEGRAPH_UPLOAD_URL", "TELEGRAPH_POOL_SIZE",
+    "TELEGRAPH_KEEPALIVE", "TELEGRAPH_TIMEOUT", "TELEGRAPH_UPLOAD_CONCURRENCY", "IMAGE_WORKERS",
+    "DATABASE_PATH"
+})
 
 class Config:
     """Configuration class for the website monitoring bot"""
@@ -26,22 +56,127 @@ class Config:
         except:
             ADMIN_IDS: List[int] = []
     
+    # Update delivery: "polling" or "webhook"
+    UPDATE_MODE: str = os.getenv("UPDATE_MODE", "polling").lower()
+    WEBHOOK_URL: str = os.getenv("WEBHOOK_URL", "")  # Public base URL behind the reverse proxy
+    WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/telegram")
+    WEBHOOK_LISTEN: str = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+    WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8443"))
+    WEBHOOK_SECRET_TOKEN: str = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+    
+    # Prometheus metrics endpoint
+    ENABLE_METRICS: bool = os.getenv("ENABLE_METRICS", "false").lower() == "true"
+    METRICS_LISTEN: str = os.getenv("METRICS_LISTEN", "0.0.0.0")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "8080"))
+    METRICS_PATH: str = os.getenv("METRICS_PATH", "/metrics")
+    
+    # Article traces kept for /trace, sampling profiler for /profile
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+    PROFILE_SAMPLE_INTERVAL: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))  # seconds
+    PROFILE_MAX_SECONDS: int = int(os.getenv("PROFILE_MAX_SECONDS", "60"))
+    
+    # Event loop lag watchdog
+    LOOP_WATCHDOG_ENABLED: bool = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+    LOOP_LAG_INTERVAL: float = float(os.getenv("LOOP_LAG_INTERVAL", "0.25"))  # seconds between timer ticks
+    LOOP_LAG_THRESHOLD: float = float(os.getenv("LOOP_LAG_THRESHOLD", "0.5"))  # seconds of lag that count as a stall
+    LOOP_STACK_DEPTH: int = int(os.getenv("LOOP_STACK_DEPTH", "12"))  # stack entries logged per stall
+    
+    # Alternative Bot API server (e.g. a local stand-in for testing)
+    TELEGRAM_API_URL: str = os.getenv("TELEGRAM_API_URL", "")
+    
     # Website Settings
     WEBSITE_URL: str = os.getenv("WEBSITE_URL", "https://www.ansarollah.com.ye")
     WEBSITE_SECTIONS: List[str] = json.loads(os.getenv("WEBSITE_SECTIONS", '["news", "statements", "articles"]'))
     CHECK_INTERVAL: int = int(os.getenv("CHECK_INTERVAL", os.getenv("MONITORING_INTERVAL", "120")))  # seconds
+    # Monitored sites: built-in profile names ("default", "ansarollah") or JSON profile files
+    SITE_PROFILES: List[str] = json.loads(os.getenv("SITE_PROFILES", '["default"]'))
+    
+    # Hot reload: seconds between checks of .env and the profile files for changes, 0 disables
+    CONFIG_WATCH_INTERVAL: int = int(os.getenv("CONFIG_WATCH_INTERVAL", "5"))
+    
+    # Worker mode: several processes share the sections through database leases
+    WORKER_MODE: bool = os.getenv("WORKER_MODE", "false").lower() == "true"
+    WORKER_ID: str = os.getenv("WORKER_ID", f"{socket.gethostname()}:{os.getpid()}")
+    LEASE_DATABASE_URL: str = os.getenv("LEASE_DATABASE_URL", "")  # postgresql://... or SQLite path, defaults to DATABASE_PATH
+    LEASE_TTL: int = int(os.getenv("LEASE_TTL", "60"))  # seconds
+    LEASE_HEARTBEAT_INTERVAL: int = int(os.getenv("LEASE_HEARTBEAT_INTERVAL", "15"))  # seconds
+    
+    # Article pipeline: queue capacity between stages and workers per stage
+    PIPELINE_QUEUE_SIZE: int = max(int(os.getenv("PIPELINE_QUEUE_SIZE", "20")), 1)
+    PIPELINE_DISCOVER_WORKERS: int = int(os.getenv("PIPELINE_DISCOVER_WORKERS", "2"))
+    PIPELINE_FETCH_WORKERS: int = int(os.getenv("PIPELINE_FETCH_WORKERS", "4"))
+    PIPELINE_EXTRACT_WORKERS: int = int(os.getenv("PIPELINE_EXTRACT_WORKERS", "2"))
+    PIPELINE_FILTER_WORKERS: int = int(os.getenv("PIPELINE_FILTER_WORKERS", "1"))
+    PIPELINE_PERSIST_WORKERS: int = int(os.getenv("PIPELINE_PERSIST_WORKERS", "1"))
+    PIPELINE_RENDER_WORKERS: int = int(os.getenv("PIPELINE_RENDER_WORKERS", "2"))
+    PIPELINE_PUBLISH_WORKERS: int = int(os.getenv("PIPELINE_PUBLISH_WORKERS", "1"))
     
     # Telegraph Settings
-    TELEGRAPH_TOKEN: str = os.getenv("TELEGRAPH_TOKEN", "")
+    TELEGRAPH_TOKEN: str = os.getenv("TELEGRAPH_TOKEN", "")  # Comma-separated for several accounts
+    TELEGRAPH_ACCOUNT_POOL_SIZE: int = max(int(os.getenv("TELEGRAPH_ACCOUNT_POOL_SIZE", "1")), 1)
+    TELEGRAPH_MAX_FLOOD_WAIT: int = int(os.getenv("TELEGRAPH_MAX_FLOOD_WAIT", "60"))  # seconds
     TELEGRAPH_AUTHOR: str = os.getenv("TELEGRAPH_AUTHOR", os.getenv("TELEGRAPH_AUTHOR_NAME", "الأنصار الله"))
     TELEGRAPH_AUTHOR_URL: str = os.getenv("TELEGRAPH_AUTHOR_URL", "https://www.ansarollah.com.ye")
+    TELEGRAPH_API_URL: str = os.getenv("TELEGRAPH_API_URL", "https://api.telegra.ph")
+    TELEGRAPH_UPLOAD_URL: str = os.getenv("TELEGRAPH_UPLOAD_URL", "https://telegra.ph/upload")
+    TELEGRAPH_POOL_SIZE: int = int(os.getenv("TELEGRAPH_POOL_SIZE", "10"))
+    TELEGRAPH_KEEPALIVE: int = int(os.getenv("TELEGRAPH_KEEPALIVE", "30"))  # seconds
+    TELEGRAPH_TIMEOUT: int = int(os.getenv("TELEGRAPH_TIMEOUT", "30"))  # seconds
+    TELEGRAPH_MAX_BODY_IMAGES: int = int(os.getenv("TELEGRAPH_MAX_BODY_IMAGES", "10"))  # Per article
+    TELEGRAPH_UPLOAD_CONCURRENCY: int = int(os.getenv("TELEGRAPH_UPLOAD_CONCURRENCY", "4"))
+    PAGE_VIEWS_INTERVAL: int = int(os.getenv("PAGE_VIEWS_INTERVAL", "3600"))  # seconds, 0 disables
+    PAGE_VIEWS_CONCURRENCY: int = int(os.getenv("PAGE_VIEWS_CONCURRENCY", "5"))
+    PAGE_VIEWS_RETENTION_DAYS: int = int(os.getenv("PAGE_VIEWS_RETENTION_DAYS", "90"))
+    PAGE_VIEWS_WINDOW_DAYS: int = int(os.getenv("PAGE_VIEWS_WINDOW_DAYS", "7"))  # Articles published since
+    TELEGRAPH_PAGE_MAX_BYTES: int = int(os.getenv("TELEGRAPH_PAGE_MAX_BYTES", "60000"))  # API limit is 64KB
+    
+    # Telegraph image upload cache
+    IMAGE_CACHE_TTL: int = int(os.getenv("IMAGE_CACHE_TTL", str(30 * 24 * 3600)))  # seconds
+    IMAGE_CACHE_MAX_ENTRIES: int = int(os.getenv("IMAGE_CACHE_MAX_ENTRIES", "5000"))
+    
+    # Image preprocessing
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", "2"))
+    IMAGE_MAX_BYTES: int = int(os.getenv("IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+    IMAGE_MAX_SIDE: int = int(os.getenv("IMAGE_MAX_SIDE", "2560"))
+    IMAGE_MAX_PIXELS: int = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
     
     # Publishing Settings
     AUTO_PUBLISH: bool = os.getenv("AUTO_PUBLISH", "true").lower() == "true"
     ENABLE_TEXT_SHORTENING: bool = os.getenv("ENABLE_TEXT_SHORTENING", "true").lower() == "true"
     MAX_MESSAGE_LENGTH: int = int(os.getenv("MAX_MESSAGE_LENGTH", "4096"))
+    MAX_CAPTION_LENGTH: int = int(os.getenv("MAX_CAPTION_LENGTH", "1024"))
     SHORT_DESCRIPTION_LENGTH: int = int(os.getenv("SHORT_DESCRIPTION_LENGTH", "200"))
     
+    # Publish outbox retries
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+    OUTBOX_RETRY_BASE_DELAY: int = int(os.getenv("OUTBOX_RETRY_BASE_DELAY", "60"))  # seconds
+    OUTBOX_RETRY_MAX_DELAY: int = int(os.getenv("OUTBOX_RETRY_MAX_DELAY", "3600"))  # seconds
+    # How long publishing waits for the Telegram bot to start
+    BOT_READY_TIMEOUT: int = int(os.getenv("BOT_READY_TIMEOUT", "120"))  # seconds
+    
+    # Digest mode: bursts of articles are grouped into one channel post
+    DIGEST_MODE: bool = os.getenv("DIGEST_MODE", "false").lower() == "true"
+    DIGEST_BURST_THRESHOLD: int = int(os.getenv("DIGEST_BURST_THRESHOLD", "5"))
+    DIGEST_WINDOW: int = int(os.getenv("DIGEST_WINDOW", "600"))  # seconds
+    DIGEST_MAX_ITEMS: int = int(os.getenv("DIGEST_MAX_ITEMS", "10"))
+    DIGEST_ALBUM: bool = os.getenv("DIGEST_ALBUM", "true").lower() == "true"
+    
+    # Source edit revalidation of recently published articles
+    REVALIDATE_INTERVAL: int = int(os.getenv("REVALIDATE_INTERVAL", "1800"))  # seconds, 0 disables
+    REVALIDATE_WINDOW_HOURS: int = int(os.getenv("REVALIDATE_WINDOW_HOURS", "48"))
+    REVALIDATE_BATCH_SIZE: int = int(os.getenv("REVALIDATE_BATCH_SIZE", "20"))
+    
+    # Maintenance jobs
+    CLEANUP_INTERVAL: int = int(os.getenv("CLEANUP_INTERVAL", "300"))  # seconds
+    STATISTICS_INTERVAL: int = int(os.getenv("STATISTICS_INTERVAL", "3600"))  # seconds
+    DAILY_REPORT_CRON: str = os.getenv("DAILY_REPORT_CRON", "0 0 * * *")  # local time
+    SCHEDULER_JITTER: int = int(os.getenv("SCHEDULER_JITTER", "30"))  # seconds added at random to interval jobs
+    
+    # Admin /pending browser
+    PENDING_PAGE_SIZE: int = min(max(int(os.getenv("PENDING_PAGE_SIZE", "5")), 1), 8)
+    # Render Telegraph pages and messages while articles wait for approval
+    PRERENDER_PENDING: bool = os.getenv("PRERENDER_PENDING", "true").lower() == "true"
+    
     # Content Settings
     CUSTOM_HEADER: str = os.getenv("CUSTOM_HEADER", "📰 موقع الأنصار الله")
     CUSTOM_FOOTER: str = os.getenv("CUSTOM_FOOTER", "🔗 تابعونا للمزيد من الأخبار")
@@ -56,6 +191,8 @@ class Config:
     # Filters
     EXCLUDE_KEYWORDS: List[str] = json.loads(os.getenv("EXCLUDE_KEYWORDS", '["إعلان", "ads", "advertisement"]'))
     INCLUDE_KEYWORDS: List[str] = json.loads(os.getenv("INCLUDE_KEYWORDS", "[]"))
+    # Articles of the default site matching these are never grouped into digests
+    IMPORTANT_KEYWORDS: List[str] = json.loads(os.getenv("IMPORTANT_KEYWORDS", "[]"))
     
     @classmethod
     def validate(cls) -> bool:
@@ -72,12 +209,61 @@ class Config:
             print(f"Missing required configuration: {', '.join(missing_fields)}")
             return False
         
+        if cls.UPDATE_MODE == "webhook" and not cls.WEBHOOK_URL:
+            print("Missing required configuration: WEBHOOK_URL (UPDATE_MODE=webhook)")
+            return False
+        
         # Check if at least one admin is configured
         if not cls.ADMIN_IDS:
             print("Warning: No admin IDs configured")
         
         return True
     
+    @classmethod
+    def settings(cls) -> Dict[str, Any]:
+        """Current value of every setting"""
+        return {name: value for name, value in vars(cls).items() if name.isupper() and not name.startswith('_')}
+    
+    @classmethod
+    def reload(cls) -> Dict[str, Tuple[Any, Any]]:
+        """Re-read .env and the environment and apply the changed settings.
+        
+        The new settings are parsed and validated as a whole before any is
+        applied, so a broken .env leaves the running configuration untouched.
+        Settings in RESTART_REQUIRED keep their running value. Returns
+        name -> (old, new) of every changed setting.
+        """
+        global _env_file_keys
+        saved_environ = dict(os.environ)
+        saved_env_file_keys = set(_env_file_keys)
+        
+        try:
+            load_env_file()
+            
+            # Evaluate this module again for a fresh copy of the class
+            spec = importlib.util.spec_from_file_location("_config_snapshot", __file__)
+            snapshot = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(snapshot)
+            if not snapshot.Config.validate():
+                raise ValueError("The new configuration is invalid")
+        except Exception:
+            # Settings read from the environment later (section settings) must not see the rejected values
+            os.environ.clear()
+            os.environ.update(saved_environ)
+            _env_file_keys = saved_env_file_keys
+            raise
+        
+        changes = {}
+        for name, value in snapshot.Config.settings().items():
+            old = getattr(cls, name, None)
+            if value != old:
+                changes[name] = (old, value)
+        
+        for name, (_, value) in changes.items():
+            if name not in RESTART_REQUIRED:
+                setattr(cls, name, value)
+        return changes
+    
     @classmethod
     def get_section_settings(cls, section: str) -> Dict:
         """Get settings for a specific section"""
@@ -92,6 +278,9 @@ class Config:
         print(f"  CHAT_ID: {'✅ Set' if cls.CHAT_ID else '❌ Missing'} ({cls.CHAT_ID})")
         print(f"  ADMIN_IDS: {'✅ Set' if cls.ADMIN_IDS else '❌ Missing'} ({cls.ADMIN_IDS})")
         print(f"  WEBSITE_URL: {cls.WEBSITE_URL}")
+        print(f"  SITE_PROFILES: {cls.SITE_PROFILES}")
+        print(f"  UPDATE_MODE: {cls.UPDATE_MODE}")
+        print(f"  WORKER_MODE: {cls.WORKER_MODE} ({cls.WORKER_ID})")
         print(f"  AUTO_PUBLISH: {cls.AUTO_PUBLISH}")
         print(f"  CHECK_INTERVAL: {cls.CHECK_INTERVAL}")
         print(f"  DATABASE_PATH: {cls.DATABASE_PATH}")
\ No newline at end of file
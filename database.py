@@ -26,6 +26,7 @@ class Article:
     needs_approval: bool = False
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    content_html: str = ""
     
     def __post_init__(self):
         if self.tags is None:
@@ -58,6 +59,42 @@ class Section:
         if self.custom_settings is None:
             self.custom_settings = {}
 
+# Publish outbox states
+OUTBOX_QUEUED = "queued"
+OUTBOX_TELEGRAPH_DONE = "telegraph_done"
+OUTBOX_SENDING = "sending"  # Telegram send started, the channel may already have the post
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
+
+@dataclass
+class OutboxItem:
+    """Publish outbox entry tracking the progress of one article"""
+    id: Optional[int] = None
+    article_id: int = 0
+    state: str = OUTBOX_QUEUED
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    telegraph_url: str = ""
+    message_id: Optional[int] = None
+    last_error: str = ""
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+@dataclass
+class ArticleRender:
+    """Message rendered ahead of approval, ready to be sent as-is"""
+    article_id: int = 0
+    mode: str = ""  # "shortened" or "full"
+    parts: List[str] = None
+    reply_markup: Optional[Dict] = None
+    media_url: str = ""
+    created_at: Optional[datetime] = None
+    fingerprint: str = ""  # Settings the render was made with
+    
+    def __post_init__(self):
+        if self.parts is None:
+            self.parts = []
+
 class Database:
     """Database manager for the bot"""
     
@@ -89,10 +126,17 @@ class Database:
                 is_published BOOLEAN DEFAULT 0,
                 needs_approval BOOLEAN DEFAULT 0,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                content_html TEXT
             )
         ''')
         
+        # Columns added after the first release
+        self._add_missing_columns(cursor, 'articles', {
+            'content_html': 'TEXT',
+            'approval_notice_pending': 'BOOLEAN DEFAULT 0'
+        })
+        
         # Sections table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS sections (
@@ -131,9 +175,113 @@ class Database:
             )
         ''')
         
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_articles_pending
+            ON articles (needs_approval, is_published, created_at)
+        ''')
+        
+        # Publish outbox table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS publish_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                article_id INTEGER UNIQUE NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER DEFAULT 0,
+                next_attempt_at DATETIME,
+                telegraph_url TEXT,
+                message_id INTEGER,
+                last_error TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_publish_outbox_state
+            ON publish_outbox (state, next_attempt_at)
+        ''')
+        
+        # Telegraph image upload cache
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS image_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_url TEXT UNIQUE NOT NULL,
+                content_hash TEXT NOT NULL,
+                telegraph_src TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                last_used_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_image_cache_hash ON image_cache (content_hash)
+        ''')
+        
+        # Telegraph page views time series
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS page_views (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                page_path TEXT NOT NULL,
+                article_id INTEGER,
+                views INTEGER DEFAULT 0,
+                collected_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                day TEXT,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_page_views_article ON page_views (article_id, collected_at)
+        ''')
+        
+        # One row per page and day, updated by every collection of that day
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_page_views_day ON page_views (page_path, day)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_articles_telegraph_url ON articles (telegraph_url)
+        ''')
+        
+        # Messages pre-rendered while articles wait for approval
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_renders (
+                article_id INTEGER PRIMARY KEY,
+                mode TEXT NOT NULL,
+                parts TEXT NOT NULL,
+                reply_markup TEXT,
+                media_url TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                fingerprint TEXT,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+        
+        # Source revalidation state of published articles
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_revisions (
+                article_id INTEGER PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                fingerprints TEXT,
+                checked_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+        
         conn.commit()
         conn.close()
     
+    def _add_missing_columns(self, cursor, table: str, columns: Dict[str, str]):
+        """Add columns that older databases are missing"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row[1] for row in cursor.fetchall()}
+        
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+    
     def add_article(self, article: Article) -> int:
         """Add a new article to the database"""
         conn = sqlite3.connect(self.db_path)
@@ -143,13 +291,14 @@ class Database:
             cursor.execute('''
                 INSERT INTO articles (url, title, content, summary, author, publish_date, 
                                     section, image_url, tags, hash, telegram_message_id, 
-                                    telegraph_url, is_published, needs_approval)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                    telegraph_url, is_published, needs_approval, content_html)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 article.url, article.title, article.content, article.summary,
                 article.author, article.publish_date, article.section, article.image_url,
                 json.dumps(article.tags), article.hash, article.telegram_message_id,
-                article.telegraph_url, article.is_published, article.needs_approval
+                article.telegraph_url, article.is_published, article.needs_approval,
+                article.content_html
             ))
             
             article_id = cursor.lastrowid
@@ -234,6 +383,105 @@ class Database:
         
         return [self._row_to_article(row) for row in rows]
     
+    def get_pending_article_cards(self, offset: int = 0, limit: int = 5) -> List[Article]:
+        """Get a page of pending articles with only the fields needed for listing"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, url, title, summary, section, created_at FROM articles 
+            WHERE needs_approval = 1 AND is_published = 0 
+            ORDER BY created_at DESC 
+            LIMIT ? OFFSET ?
+        ''', (limit, offset))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [
+            Article(
+                id=row[0], url=row[1], title=row[2], summary=row[3] or "", section=row[4] or "",
+                needs_approval=True,
+                created_at=datetime.fromisoformat(row[5]) if row[5] else None
+            )
+            for row in rows
+        ]
+    
+    def count_articles_pending_approval(self) -> int:
+        """Count articles pending admin approval"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT COUNT(*) FROM articles WHERE needs_approval = 1 AND is_published = 0
+        ''')
+        
+        count = cursor.fetchone()[0]
+        conn.close()
+        
+        return count
+    
+    def request_approval_notice(self, article_id: int):
+        """Record that the admins still have to be sent an article for approval"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE articles SET approval_notice_pending = 1 WHERE id = ?
+        ''', (article_id,))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_articles_owing_approval_notice(self, limit: int = 20) -> List[Article]:
+        """Articles awaiting approval that were not sent to the admins yet, oldest first"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT * FROM articles 
+            WHERE approval_notice_pending = 1 AND needs_approval = 1 AND is_published = 0 
+            ORDER BY created_at, id 
+            LIMIT ?
+        ''', (limit,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_article(row) for row in rows]
+    
+    def clear_approval_notice(self, article_id: int):
+        """Mark an article as sent to the admins for approval"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE articles SET approval_notice_pending = 0 WHERE id = ?
+        ''', (article_id,))
+        
+        conn.commit()
+        conn.close()
+    
+    def reject_articles(self, article_ids: List[int]) -> int:
+        """Remove articles from the approval queue without publishing them"""
+        if not article_ids:
+            return 0
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        placeholders = ','.join('?' * len(article_ids))
+        cursor.execute(f'''
+            UPDATE articles SET needs_approval = 0, updated_at = CURRENT_TIMESTAMP
+            WHERE id IN ({placeholders}) AND is_published = 0
+        ''', list(article_ids))
+        
+        count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        
+        return count
+    
     def update_article(self, article: Article) -> bool:
         """Update an existing article"""
         conn = sqlite3.connect(self.db_path)
@@ -244,14 +492,14 @@ class Database:
                 title = ?, content = ?, summary = ?, author = ?, 
                 publish_date = ?, section = ?, image_url = ?, tags = ?, 
                 telegram_message_id = ?, telegraph_url = ?, is_published = ?, 
-                needs_approval = ?, updated_at = CURRENT_TIMESTAMP
+                needs_approval = ?, content_html = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
         ''', (
             article.title, article.content, article.summary, article.author,
             article.publish_date, article.section, article.image_url,
             json.dumps(article.tags), article.telegram_message_id,
             article.telegraph_url, article.is_published, article.needs_approval,
-            article.id
+            article.content_html, article.id
         ))
         
         success = cursor.rowcount > 0
@@ -294,6 +542,32 @@ class Database:
         
         return [self._row_to_section(row) for row in rows]
     
+    def get_all_sections(self) -> List[Section]:
+        """Get all sections, inactive ones included"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM sections')
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_section(row) for row in rows]
+    
+    def update_section(self, section: Section):
+        """Update the URL, selector, state and settings of a section"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE sections SET url = ?, selector = ?, is_active = ?, custom_settings = ? WHERE id = ?
+        ''', (
+            section.url, section.selector, section.is_active,
+            json.dumps(section.custom_settings), section.id
+        ))
+        
+        conn.commit()
+        conn.close()
+    
     def update_section_last_check(self, section_id: int):
         """Update the last check time for a section"""
         conn = sqlite3.connect(self.db_path)
@@ -343,6 +617,471 @@ class Database:
         conn.commit()
         conn.close()
     
+    def save_article_render(self, render: ArticleRender):
+        """Store the pre-rendered message of an article"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO article_renders (article_id, mode, parts, reply_markup, media_url, fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            render.article_id, render.mode, json.dumps(render.parts),
+            json.dumps(render.reply_markup) if render.reply_markup else None, render.media_url,
+            render.fingerprint
+        ))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_article_render(self, article_id: int) -> Optional[ArticleRender]:
+        """Get the pre-rendered message of an article"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM article_renders WHERE article_id = ?', (article_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return self._row_to_render(row) if row else None
+    
+    def get_article_renders(self) -> List[ArticleRender]:
+        """Get every pre-rendered message"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM article_renders')
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_render(row) for row in rows]
+    
+    def delete_article_render(self, article_id: int):
+        """Delete the pre-rendered message of an article"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM article_renders WHERE article_id = ?', (article_id,))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_published_message_type(self, article_id: int, message_id: int) -> Optional[str]:
+        """Get the type of a published message"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT message_type FROM published_messages
+            WHERE article_id = ? AND message_id = ?
+            ORDER BY id DESC LIMIT 1
+        ''', (article_id, message_id))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row[0] if row else None
+    
+    def get_published_messages(self, article_id: int, first_message_id: int) -> List[Tuple[int, str]]:
+        """(message ID, type) of the messages of a post, from its first message in sending order"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT message_id, message_type FROM published_messages
+            WHERE article_id = ? AND message_type IN ('photo', 'text')
+            AND id >= (
+                SELECT MAX(id) FROM published_messages WHERE article_id = ? AND message_id = ?
+            )
+            ORDER BY id
+        ''', (article_id, article_id, first_message_id))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [(row[0], row[1]) for row in rows]
+    
+    def has_published_message(self, article_id: int, message_type: str) -> bool:
+        """Check whether a message of a type was already published for an article"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT 1 FROM published_messages WHERE article_id = ? AND message_type = ? LIMIT 1
+        ''', (article_id, message_type))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row is not None
+    
+    def get_revalidation_candidates(self, hours: int, limit: int = 20) -> List[Article]:
+        """Get recently published articles, least recently revalidated first"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT a.* FROM articles a
+            LEFT JOIN article_revisions r ON r.article_id = a.id
+            WHERE a.is_published = 1 AND a.telegram_message_id IS NOT NULL
+              AND a.created_at >= datetime('now', ?)
+            ORDER BY r.checked_at IS NOT NULL, r.checked_at ASC
+            LIMIT ?
+        ''', (f'-{int(hours)} hours', limit))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_article(row) for row in rows]
+    
+    def get_article_revision(self, article_id: int) -> Optional[Dict]:
+        """Get the stored validators and field fingerprints of an article"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'SELECT etag, last_modified, fingerprints FROM article_revisions WHERE article_id = ?',
+            (article_id,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        return {
+            'etag': row[0] or "",
+            'last_modified': row[1] or "",
+            'fingerprints': json.loads(row[2]) if row[2] else {}
+        }
+    
+    def save_article_revision(self, article_id: int, etag: str = None, last_modified: str = None,
+                              fingerprints: Dict[str, str] = None):
+        """Store revalidation state, keeping the previous values of omitted fields"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO article_revisions (article_id, etag, last_modified, fingerprints, checked_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (article_id) DO UPDATE SET
+                etag = COALESCE(excluded.etag, etag),
+                last_modified = COALESCE(excluded.last_modified, last_modified),
+                fingerprints = COALESCE(excluded.fingerprints, fingerprints),
+                checked_at = CURRENT_TIMESTAMP
+        ''', (
+            article_id, etag, last_modified,
+            json.dumps(fingerprints) if fingerprints is not None else None
+        ))
+        
+        conn.commit()
+        conn.close()
+    
+    def enqueue_publish(self, article_id: int) -> Optional[OutboxItem]:
+        """Add an article to the publish outbox (no-op if already queued)"""
+        if not article_id:
+            return None
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO publish_outbox (article_id, state, next_attempt_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        ''', (article_id, OUTBOX_QUEUED))
+        
+        cursor.execute('SELECT * FROM publish_outbox WHERE article_id = ?', (article_id,))
+        row = cursor.fetchone()
+        conn.commit()
+        conn.close()
+        
+        return self._row_to_outbox_item(row) if row else None
+    
+    def get_outbox_item(self, article_id: int) -> Optional[OutboxItem]:
+        """Get the outbox entry of an article"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM publish_outbox WHERE article_id = ?', (article_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row:
+            return self._row_to_outbox_item(row)
+        return None
+    
+    def get_pending_outbox_items(self, due_only: bool = True, limit: int = 50) -> List[OutboxItem]:
+        """Get outbox entries that still have to be published"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        query = '''
+            SELECT * FROM publish_outbox 
+            WHERE state IN (?, ?)
+        '''
+        if due_only:
+            query += " AND (next_attempt_at IS NULL OR next_attempt_at <= CURRENT_TIMESTAMP)"
+        query += " ORDER BY created_at ASC LIMIT ?"
+        
+        cursor.execute(query, (OUTBOX_QUEUED, OUTBOX_TELEGRAPH_DONE, limit))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_outbox_item(row) for row in rows]
+    
+    def count_pending_outbox_items(self) -> int:
+        """Count outbox entries that still have to be published"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT COUNT(*) FROM publish_outbox WHERE state IN (?, ?)
+        ''', (OUTBOX_QUEUED, OUTBOX_TELEGRAPH_DONE))
+        
+        count = cursor.fetchone()[0]
+        conn.close()
+        
+        return count
+    
+    def mark_outbox_telegraph_done(self, article_id: int, telegraph_url: str):
+        """Record that the Telegraph page of an article was created"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE publish_outbox SET state = ?, telegraph_url = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE article_id = ? AND state = ?
+        ''', (OUTBOX_TELEGRAPH_DONE, telegraph_url, article_id, OUTBOX_QUEUED))
+        
+        conn.commit()
+        conn.close()
+    
+    def mark_outbox_sending(self, article_id: int):
+        """Record that the Telegram send of an article is starting"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE publish_outbox SET state = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE article_id = ? AND state IN (?, ?)
+        ''', (OUTBOX_SENDING, article_id, OUTBOX_QUEUED, OUTBOX_TELEGRAPH_DONE))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_interrupted_outbox_items(self) -> List[OutboxItem]:
+        """Get outbox entries whose Telegram send was interrupted before it was recorded"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'SELECT * FROM publish_outbox WHERE state = ? ORDER BY created_at ASC', (OUTBOX_SENDING,)
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._row_to_outbox_item(row) for row in rows]
+    
+    def requeue_outbox_item(self, article_id: int):
+        """Queue an interrupted outbox entry again, keeping its Telegraph page"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE publish_outbox SET
+                state = CASE WHEN telegraph_url IS NOT NULL THEN ? ELSE ? END,
+                next_attempt_at = CURRENT_TIMESTAMP,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE article_id = ? AND state = ?
+        ''', (OUTBOX_TELEGRAPH_DONE, OUTBOX_QUEUED, article_id, OUTBOX_SENDING))
+        
+        conn.commit()
+        conn.close()
+    
+    def mark_outbox_sent(self, article_id: int, message_id: Optional[int]):
+        """Record that an article was sent to the channel"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE publish_outbox SET state = ?, message_id = ?, last_error = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE article_id = ?
+        ''', (OUTBOX_SENT, message_id, article_id))
+        
+        conn.commit()
+        conn.close()
+    
+    def record_outbox_failure(self, article_id: int, error: str, retry_delay: int, max_attempts: int):
+        """Record a failed publish attempt and schedule the next one"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # The state goes back to the last completed step unless attempts are exhausted
+        cursor.execute('''
+            UPDATE publish_outbox SET
+                attempts = attempts + 1,
+                last_error = ?,
+                next_attempt_at = datetime('now', ?),
+                state = CASE
+                    WHEN attempts + 1 >= ? THEN ?
+                    WHEN state = ? THEN CASE WHEN telegraph_url IS NOT NULL THEN ? ELSE ? END
+                    ELSE state
+                END,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE article_id = ? AND state != ?
+        ''', (error[:500], f'+{int(retry_delay)} seconds', max_attempts, OUTBOX_FAILED,
+              OUTBOX_SENDING, OUTBOX_TELEGRAPH_DONE, OUTBOX_QUEUED, article_id, OUTBOX_SENT))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_cached_image(self, source_url: str = None, content_hash: str = None,
+                         ttl: int = 0) -> Optional[str]:
+        """Get the telegra.ph src of an uploaded image by source URL or content hash"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        column, value = ('source_url', source_url) if source_url else ('content_hash', content_hash)
+        query = f'SELECT id, telegraph_src FROM image_cache WHERE {column} = ?'
+        params = [value]
+        if ttl:
+            query += " AND created_at >= datetime('now', ?)"
+            params.append(f'-{int(ttl)} seconds')
+        
+        cursor.execute(query + ' ORDER BY created_at DESC LIMIT 1', params)
+        row = cursor.fetchone()
+        
+        if row:
+            cursor.execute(
+                'UPDATE image_cache SET last_used_at = CURRENT_TIMESTAMP WHERE id = ?', (row[0],)
+            )
+            conn.commit()
+        conn.close()
+        
+        return row[1] if row else None
+    
+    def cache_image(self, source_url: str, content_hash: str, telegraph_src: str, max_entries: int = 0):
+        """Store an uploaded image and evict the least recently used entries"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO image_cache (source_url, content_hash, telegraph_src)
+            VALUES (?, ?, ?)
+        ''', (source_url, content_hash, telegraph_src))
+        
+        if max_entries:
+            cursor.execute('''
+                DELETE FROM image_cache WHERE id NOT IN (
+                    SELECT id FROM image_cache ORDER BY last_used_at DESC, id DESC LIMIT ?
+                )
+            ''', (max_entries,))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_page_view_articles(self, days: int) -> List[Tuple[int, str]]:
+        """Get (article ID, Telegraph URL) of the articles published in the last days"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, telegraph_url FROM articles
+            WHERE is_published = 1 AND telegraph_url IS NOT NULL AND telegraph_url != ''
+              AND created_at >= datetime('now', ?)
+        ''', (f'-{int(days)} days',))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return rows
+    
+    def add_page_views(self, samples: List[Tuple[str, int, int]]):
+        """Record view counts as (page path, article ID, views) samples, one row per page and day"""
+        if not samples:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO page_views (page_path, article_id, views, day)
+            VALUES (?, ?, ?, date('now'))
+            ON CONFLICT (page_path, day) DO UPDATE SET
+                article_id = excluded.article_id,
+                views = MAX(views, excluded.views),
+                collected_at = CURRENT_TIMESTAMP
+        ''', samples)
+        
+        conn.commit()
+        conn.close()
+    
+    def get_top_articles_by_views(self, days: int = 1, per_section: int = 3) -> Dict[str, List[Tuple[str, str, int]]]:
+        """Get the most viewed articles of each section as (title, URL, views)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT a.section, a.title, a.telegraph_url, MAX(v.views) AS views
+            FROM page_views v JOIN articles a ON a.id = v.article_id
+            WHERE v.collected_at >= datetime('now', ?)
+            GROUP BY a.id
+            ORDER BY views DESC
+        ''', (f'-{int(days)} days',))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        top = {}
+        for section, title, url, views in rows:
+            entries = top.setdefault(section or "", [])
+            if len(entries) < per_section:
+                entries.append((title, url, views))
+        
+        return top
+    
+    def delete_old_page_views(self, days: int) -> int:
+        """Delete view samples older than the retention period"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "DELETE FROM page_views WHERE collected_at < datetime('now', ?)", (f'-{int(days)} days',)
+        )
+        
+        count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        
+        return count
+    
+    def _row_to_render(self, row) -> ArticleRender:
+        """Convert database row to ArticleRender object"""
+        return ArticleRender(
+            article_id=row[0],
+            mode=row[1],
+            parts=json.loads(row[2]),
+            reply_markup=json.loads(row[3]) if row[3] else None,
+            media_url=row[4] or "",
+            created_at=datetime.fromisoformat(row[5]) if row[5] else None,
+            fingerprint=row[6] or ""
+        )
+    
+    def _row_to_outbox_item(self, row) -> OutboxItem:
+        """Convert database row to OutboxItem object"""
+        return OutboxItem(
+            id=row[0],
+            article_id=row[1],
+            state=row[2],
+            attempts=row[3] or 0,
+            next_attempt_at=datetime.fromisoformat(row[4]) if row[4] else None,
+            telegraph_url=row[5] or "",
+            message_id=row[6],
+            last_error=row[7] or "",
+            created_at=datetime.fromisoformat(row[8]) if row[8] else None,
+            updated_at=datetime.fromisoformat(row[9]) if row[9] else None
+        )
+    
     def _row_to_article(self, row) -> Article:
         """Convert database row to Article object"""
         return Article(
@@ -362,7 +1101,8 @@ class Database:
             is_published=bool(row[13]),
             needs_approval=bool(row[14]),
             created_at=datetime.fromisoformat(row[15]) if row[15] else None,
-            updated_at=datetime.fromisoformat(row[16]) if row[16] else None
+            updated_at=datetime.fromisoformat(row[16]) if row[16] else None,
+            content_html=(row[17] or "") if len(row) > 17 else ""
         )
     
     def _row_to_section(self, row) -> Section:
@@ -0,0 +1,333 @@
+"""
+HTML to Telegraph node conversion
+=================================
+
+Converts extracted article HTML (newspaper3k / readability) directly into
+Telegraph's node format in a single streaming pass, keeping links, emphasis,
+quotes, lists and inline images while dropping everything Telegraph rejects.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Union
+from urllib.parse import urljoin
+
+Node = Union[str, Dict]
+
+# Tags accepted by the Telegraph API
+ALLOWED_TAGS = {
+    'a', 'aside', 'b', 'blockquote', 'br', 'code', 'em', 'figcaption', 'figure',
+    'h3', 'h4', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'strong', 'u', 'ul'
+}
+
+# HTML tags mapped onto an allowed Telegraph tag
+TAG_ALIASES = {
+    'h1': 'h3', 'h2': 'h3', 'h5': 'h4', 'h6': 'h4',
+    'strike': 's', 'del': 's', 'ins': 'u',
+    'cite': 'i', 'dfn': 'i', 'var': 'i', 'q': 'em',
+    'kbd': 'code', 'samp': 'code', 'tt': 'code',
+    'dl': 'ul', 'dt': 'li', 'dd': 'li'
+}
+
+# Tags whose content is dropped entirely
+SKIP_TAGS = {
+    'script', 'style', 'noscript', 'iframe', 'video', 'audio', 'object', 'embed',
+    'form', 'button', 'select', 'textarea', 'svg', 'canvas', 'head', 'title', 'template'
+}
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr'
+}
+
+INLINE_TAGS = {'a', 'b', 'br', 'code', 'em', 'i', 'img', 's', 'strong', 'u'}
+
+# Tags that implicitly close an open <p>
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'div', 'dl', 'figure', 'footer',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'main', 'ol', 'p', 'pre',
+    'section', 'table', 'ul'
+}
+
+# List items close the previous item up to their list container
+LIST_ITEM_TAGS = {'li', 'dt', 'dd'}
+LIST_TAGS = {'ul', 'ol', 'dl'}
+
+# Telegraph has no tables: rows become lines and cells are separated by this
+TABLE_CELL_SEPARATOR = ' | '
+
+# Nodes that are meaningful without children
+EMPTY_ALLOWED = {'br', 'hr', 'img'}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Marks the edge of an unwrapped block (div, section, ...) between top-level inline runs
+_BLOCK_BREAK = {'tag': None}
+
+
+class _TelegraphNodeBuilder(HTMLParser):
+    """Streaming HTML parser that builds Telegraph nodes"""
+
+    def __init__(self, base_url: str = ""):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.root = {'tag': None, 'children': []}
+        # (html tag, telegraph node or None when the tag is unwrapped)
+        self.stack = [(None, self.root)]
+        self.skip_depth = 0
+        self.pre_depth = 0
+        # [rows, cells in the current row] of each open table
+        self.tables = []
+        self.after_separator = False  # Whitespace after a cell separator is dropped
+        self.pending_break = False  # An unwrapped block started or ended since the last content
+
+    def _current(self) -> Dict:
+        for _, node in reversed(self.stack):
+            if node is not None:
+                return node
+        return self.root
+
+    def _append(self, child: Node):
+        current = self._current()
+        children = current['children']
+        if self.pending_break:
+            # Keep the text before and after an unwrapped block apart
+            self.pending_break = False
+            if children and _is_inline(children[-1]):
+                self._strip_trailing_space()
+                children.append(_BLOCK_BREAK if current is self.root else {'tag': 'br'})
+        if isinstance(child, str) and children and isinstance(children[-1], str):
+            children[-1] += child
+        else:
+            children.append(child)
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_depth:
+            if tag in SKIP_TAGS:
+                self.skip_depth += 1
+            return
+        if tag in SKIP_TAGS:
+            self.skip_depth = 1
+            return
+
+        self._close_implied(tag)
+        attrs = dict(attrs)
+        name = TAG_ALIASES.get(tag, tag)
+
+        if tag == 'table':
+            self.tables.append([0, 0])
+        elif tag == 'tr' and self.tables:
+            table = self.tables[-1]
+            if table[0]:
+                self._strip_trailing_space()
+                self._append({'tag': 'br'})
+                self.after_separator = True
+            table[0] += 1
+            table[1] = 0
+        elif tag in ('td', 'th') and self.tables:
+            table = self.tables[-1]
+            if table[1]:
+                self._strip_trailing_space()
+                self._append(TABLE_CELL_SEPARATOR)
+                self.after_separator = True
+            table[1] += 1
+
+        if name == 'img':
+            src = attrs.get('src') or attrs.get('data-src')
+            if src and not src.startswith('data:'):
+                self._append({'tag': 'img', 'attrs': {'src': urljoin(self.base_url, src)}})
+            return
+
+        if name in ('br', 'hr'):
+            self._append({'tag': name})
+            return
+
+        if tag in VOID_TAGS:
+            return
+
+        node = None
+        if name == 'a':
+            href = attrs.get('href', '')
+            if href and not href.startswith('#'):
+                href = urljoin(self.base_url, href)
+                if href.startswith(('http://', 'https://', 'mailto:')):
+                    node = {'tag': 'a', 'attrs': {'href': href}, 'children': []}
+        elif name in ALLOWED_TAGS:
+            node = {'tag': name, 'children': []}
+
+        if node is not None:
+            self._append(node)
+        elif tag in BLOCK_TAGS:
+            self.pending_break = True
+        if name == 'pre':
+            self.pre_depth += 1
+        self.stack.append((tag, node))
+
+    def _strip_trailing_space(self):
+        children = self._current()['children']
+        if children and isinstance(children[-1], str):
+            children[-1] = children[-1].rstrip()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and not self.skip_depth:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.skip_depth:
+            if tag in SKIP_TAGS:
+                self.skip_depth -= 1
+            return
+
+        if tag == 'table' and self.tables:
+            self.tables.pop()
+
+        # Close up to the matching open tag, ignore stray end tags
+        for index in range(len(self.stack) - 1, 0, -1):
+            open_tag, node = self.stack[index]
+            if open_tag == tag:
+                if node is None and tag in BLOCK_TAGS:
+                    self.pending_break = True
+                self._pop_to(index)
+                return
+
+    def _pop_to(self, index: int):
+        for open_tag, _ in self.stack[index:]:
+            if TAG_ALIASES.get(open_tag, open_tag) == 'pre':
+                self.pre_depth -= 1
+        del self.stack[index:]
+
+    def _close_implied(self, tag: str):
+        """Apply HTML's implied end tags for <p> and list items"""
+        if tag in LIST_ITEM_TAGS:
+            closes, boundary = LIST_ITEM_TAGS, LIST_TAGS
+        elif tag in BLOCK_TAGS:
+            closes, boundary = {'p'}, BLOCK_TAGS - {'p'}
+        else:
+            return
+        for index in range(len(self.stack) - 1, 0, -1):
+            open_tag = self.stack[index][0]
+            if open_tag in closes:
+                self._pop_to(index)
+                return
+            if open_tag in boundary or open_tag in LIST_ITEM_TAGS:
+                return
+
+    def handle_data(self, data):
+        if self.skip_depth or not data:
+            return
+        if not self.pre_depth:
+            data = _WHITESPACE_RE.sub(' ', data)
+            if self.pending_break:
+                data = data.lstrip()
+                if not data:
+                    return
+        if self.after_separator:
+            data = data.lstrip()
+            if not data:
+                return
+            self.after_separator = False
+        self._append(data)
+
+
+def _is_inline(node: Node) -> bool:
+    return isinstance(node, str) or node.get('tag') in INLINE_TAGS
+
+
+def _clean(nodes: List[Node], preformatted: bool = False) -> List[Node]:
+    """Drop empty nodes and trim whitespace at block edges"""
+    cleaned = []
+    for node in nodes:
+        if isinstance(node, str):
+            if node:
+                cleaned.append(node)
+            continue
+        tag = node['tag']
+        if 'children' in node:
+            node['children'] = _clean(node['children'], preformatted or tag == 'pre')
+            if not node['children']:
+                if tag not in EMPTY_ALLOWED:
+                    continue
+                del node['children']
+        cleaned.append(node)
+
+    if not preformatted and cleaned:
+        if isinstance(cleaned[0], str):
+            cleaned[0] = cleaned[0].lstrip()
+        if isinstance(cleaned[-1], str):
+            cleaned[-1] = cleaned[-1].rstrip()
+        cleaned = [node for node in cleaned if node != '']
+    return cleaned
+
+
+def _wrap_top_level(nodes: List[Node]) -> List[Node]:
+    """Group stray inline content at the top level into paragraphs"""
+    result = []
+    run: List[Node] = []
+
+    def flush():
+        trimmed = _clean(run)
+        if trimmed:
+            result.append({'tag': 'p', 'children': trimmed})
+        run.clear()
+
+    for node in nodes:
+        if node is _BLOCK_BREAK:
+            flush()
+        elif _is_inline(node):
+            if isinstance(node, dict) and node.get('tag') == 'img':
+                flush()
+                result.append({'tag': 'figure', 'children': [node]})
+            else:
+                run.append(node)
+        else:
+            flush()
+            result.append(node)
+    flush()
+    return result
+
+
+def html_to_nodes(html: str, base_url: str = "") -> List[Node]:
+    """Convert an HTML fragment into a list of Telegraph nodes"""
+    if not html:
+        return []
+    builder = _TelegraphNodeBuilder(base_url)
+    builder.feed(html)
+    builder.close()
+    return _clean(_wrap_top_level(builder.root['children']))
+
+
+
+def nodes_to_text(nodes: List[Node]) -> str:
+    """Plain text of a node tree"""
+    parts = []
+    for node in nodes:
+        if isinstance(node, str):
+            parts.append(node)
+        else:
+            parts.append(nodes_to_text(node.get('children', [])))
+    return ''.join(parts)
+
+
+def iter_image_nodes(nodes: List[Node]):
+    """Yield every img node of a node tree in document order"""
+    for node in nodes:
+        if isinstance(node, dict):
+            if node.get('tag') == 'img':
+                yield node
+            yield from iter_image_nodes(node.get('children', []))
+
+
+def remove_nodes(nodes: List[Node], drop_ids: set) -> List[Node]:
+    """Remove nodes by id() and any element left empty by the removal"""
+    result = []
+    for node in nodes:
+        if isinstance(node, dict):
+            if id(node) in drop_ids:
+                continue
+            if node.get('children'):
+                node['children'] = remove_nodes(node['children'], drop_ids)
+                if not node['children'] and node.get('tag') not in EMPTY_ALLOWED:
+                    continue
+        result.append(node)
+    return result
@@ -0,0 +1,143 @@
+import asyncio
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+from config import Config
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Telegraph accepts up to 5MB; Telegram photos need width + height <= 10000
+TELEGRAPH_MAX_BYTES = 5 * 1024 * 1024
+TELEGRAM_MAX_DIMENSIONS_SUM = 10000
+
+JPEG_QUALITIES = (85, 75, 65, 55, 45)
+MIN_SIDE = 320
+
+# Upload file name and MIME type by Pillow format
+UPLOAD_TYPES = {
+    "JPEG": ("image.jpg", "image/jpeg"),
+    "PNG": ("image.png", "image/png"),
+    "GIF": ("image.gif", "image/gif"),
+}
+
+# Leading bytes of the formats kept as-is when they cannot be decoded
+MAGIC_NUMBERS = {
+    b"\xff\xd8\xff": "JPEG",
+    b"\x89PNG\r\n\x1a\n": "PNG",
+    b"GIF87a": "GIF",
+    b"GIF89a": "GIF",
+}
+
+@dataclass
+class PreparedImage:
+    """Image bytes ready for upload and their format"""
+    data: bytes
+    format: str = "JPEG"
+
+    @property
+    def filename(self) -> str:
+        return UPLOAD_TYPES.get(self.format, UPLOAD_TYPES["JPEG"])[0]
+
+    @property
+    def content_type(self) -> str:
+        return UPLOAD_TYPES.get(self.format, UPLOAD_TYPES["JPEG"])[1]
+
+def sniff_format(image_data: bytes) -> str:
+    """Format of image bytes from their leading bytes, JPEG when unknown"""
+    for magic, image_format in MAGIC_NUMBERS.items():
+        if image_data.startswith(magic):
+            return image_format
+    return "JPEG"
+
+class ImageProcessor:
+    """Image preprocessing that runs in a bounded worker pool"""
+
+    def __init__(self, max_workers: int = None):
+        # The pool size bounds how many decoded images are in memory at once
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.IMAGE_WORKERS,
+            thread_name_prefix="image"
+        )
+
+    async def prepare(self, image_data: bytes) -> Optional[PreparedImage]:
+        """Prepare an image for upload without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.prepare_sync, image_data)
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        self.executor.shutdown(wait=False)
+
+    @staticmethod
+    def prepare_sync(image_data: bytes, max_bytes: int = None, max_side: int = None) -> Optional[PreparedImage]:
+        """Downscale and re-encode an image until it fits Telegraph and Telegram limits.
+
+        Returns None when the image cannot be decoded within the pixel budget
+        or does not fit max_bytes even at MIN_SIDE and the lowest quality.
+        """
+        max_bytes = min(max_bytes or Config.IMAGE_MAX_BYTES, TELEGRAPH_MAX_BYTES)
+        max_side = min(max_side or Config.IMAGE_MAX_SIDE, TELEGRAM_MAX_DIMENSIONS_SUM // 2)
+
+        # Imported on the first image rather than at startup
+        from PIL import Image, ImageOps
+
+        try:
+            with Image.open(io.BytesIO(image_data)) as image:
+                width, height = image.size
+
+                # Small GIFs are kept as-is to preserve animation
+                if image.format == "GIF" and len(image_data) <= max_bytes and max(width, height) <= max_side:
+                    return PreparedImage(image_data, "GIF")
+
+                # Let the JPEG decoder scale down while decoding (1/2, 1/4, 1/8)
+                image.draft("RGB", (max_side, max_side))
+                decoded_width, decoded_height = image.size
+                if decoded_width * decoded_height > Config.IMAGE_MAX_PIXELS:
+                    logger.warning(f"Skipping image with {width}x{height} pixels")
+                    return None
+
+                image = ImageOps.exif_transpose(image)
+                image = ImageProcessor._to_rgb(image)
+                image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+                while True:
+                    for quality in JPEG_QUALITIES:
+                        output = io.BytesIO()
+                        # Saving without exif/icc drops the metadata
+                        image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+                        if output.tell() <= max_bytes:
+                            return PreparedImage(output.getvalue())
+
+                    if max(image.size) <= MIN_SIDE:
+                        logger.warning(f"Skipping image that stays over {max_bytes} bytes at {image.width}x{image.height}")
+                        return None
+
+                    # Still too large at the lowest quality: shrink and retry
+                    new_size = (max(1, int(image.width * 0.75)), max(1, int(image.height * 0.75)))
+                    image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+        except Exception as e:
+            logger.error(f"Error processing image: {e}")
+            if len(image_data) > max_bytes:
+                return None
+            return PreparedImage(image_data, sniff_format(image_data))
+
+    @staticmethod
+    def _to_rgb(image: "Image.Image") -> "Image.Image":
+        """Convert to RGB, flattening transparency onto white"""
+        from PIL import Image
+
+        if image.mode == "RGB":
+            return image
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            return background
+        return image.convert("RGB")
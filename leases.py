@@ -0,0 +1,153 @@
+"""
+Database leases
+===============
+
+Named, expiring leases kept in a shared table so several bot processes can
+split the sections between them and elect a single leader. Every lease is
+renewed by its owner's heartbeat and can be taken over once it expires, so
+a crashed worker's sections and leadership fail over automatically.
+
+The SQL is portable between SQLite and PostgreSQL; the manager only needs a
+DB-API connection factory, which also makes it easy to exercise against a
+local database.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = "leader"
+WORKER_PREFIX = "worker:"
+SECTION_PREFIX = "section:"
+
+
+class LeaseManager:
+    """Named leases with heartbeats and expiry in a shared database table"""
+
+    def __init__(self, connect: Callable[[], Any], owner: str, ttl: float,
+                 paramstyle: str = "qmark", clock: Callable[[], float] = time.time):
+        self.connect = connect
+        self.owner = owner
+        self.ttl = ttl
+        self.paramstyle = paramstyle
+        self.clock = clock
+        self.held_sections: Set[str] = set()
+
+    @classmethod
+    def from_url(cls, url: str, owner: str, ttl: float) -> "LeaseManager":
+        """Create a manager for a postgresql:// URL or an SQLite path"""
+        if url.startswith(("postgres://", "postgresql://")):
+            import psycopg2  # Only needed when the leases live in PostgreSQL
+            return cls(lambda: psycopg2.connect(url), owner, ttl, paramstyle="pyformat")
+
+        path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+        return cls(lambda: sqlite3.connect(path, timeout=30), owner, ttl)
+
+    def _execute(self, sql: str, params: tuple = (), fetch: bool = False) -> List[tuple]:
+        if self.paramstyle != "qmark":
+            sql = sql.replace("?", "%s")
+
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall() if fetch else []
+            conn.commit()
+            return rows
+        finally:
+            conn.close()
+
+    def init_table(self):
+        """Create the lease table"""
+        self._execute('''
+            CREATE TABLE IF NOT EXISTS leases (
+                name VARCHAR(200) PRIMARY KEY,
+                owner VARCHAR(200) NOT NULL,
+                expires_at DOUBLE PRECISION NOT NULL,
+                heartbeat_at DOUBLE PRECISION NOT NULL
+            )
+        ''')
+
+    def acquire(self, name: str) -> bool:
+        """Take or renew a lease, succeeding only if it is free, expired or already ours"""
+        now = self.clock()
+        self._execute('''
+            INSERT INTO leases (name, owner, expires_at, heartbeat_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                owner = excluded.owner,
+                expires_at = excluded.expires_at,
+                heartbeat_at = excluded.heartbeat_at
+            WHERE leases.owner = excluded.owner OR leases.expires_at < ?
+        ''', (name, self.owner, now + self.ttl, now, now))
+
+        return self.holder(name) == self.owner
+
+    def release(self, name: str):
+        """Give up a lease we hold"""
+        self._execute('DELETE FROM leases WHERE name = ? AND owner = ?', (name, self.owner))
+
+    def release_all(self):
+        """Give up every lease we hold, letting others take over at once"""
+        self._execute('DELETE FROM leases WHERE owner = ?', (self.owner,))
+        self.held_sections = set()
+
+    def holder(self, name: str) -> Optional[str]:
+        """Current owner of an unexpired lease"""
+        rows = self._execute(
+            'SELECT owner FROM leases WHERE name = ? AND expires_at >= ?', (name, self.clock()), fetch=True
+        )
+        return rows[0][0] if rows else None
+
+    def live_workers(self) -> List[str]:
+        """Workers whose heartbeat lease has not expired"""
+        rows = self._execute(
+            'SELECT owner FROM leases WHERE name LIKE ? AND expires_at >= ?',
+            (WORKER_PREFIX + "%", self.clock()), fetch=True
+        )
+        return sorted(row[0] for row in rows)
+
+    def leases(self) -> Dict[str, str]:
+        """Owner of every unexpired lease"""
+        rows = self._execute(
+            'SELECT name, owner FROM leases WHERE expires_at >= ?', (self.clock(),), fetch=True
+        )
+        return dict(rows)
+
+    @staticmethod
+    def _assignee(key: str, workers: List[str]) -> str:
+        # Rendezvous hashing moves only the sections of workers that join or leave
+        return max(workers, key=lambda worker: hashlib.sha1(f"{key}|{worker}".encode()).digest())
+
+    def rebalance(self, keys: Iterable[str]) -> Set[str]:
+        """Heartbeat this worker and lease the share of keys assigned to it.
+
+        A key assigned to us but still leased by another worker is picked up
+        once that worker releases it or its lease expires.
+        """
+        self.acquire(WORKER_PREFIX + self.owner)
+        workers = self.live_workers() or [self.owner]
+
+        keys = list(keys)
+        for key in self.held_sections - set(keys):
+            self.release(SECTION_PREFIX + key)
+
+        held = set()
+        for key in keys:
+            name = SECTION_PREFIX + key
+            if self._assignee(key, workers) == self.owner:
+                if self.acquire(name):
+                    held.add(key)
+            elif key in self.held_sections:
+                self.release(name)
+
+        self.held_sections = held
+        return held
+
+    def is_leader(self) -> bool:
+        """Take or renew the leader lease"""
+        return self.acquire(LEADER_LEASE)
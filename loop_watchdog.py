@@ -0,0 +1,115 @@
+"""
+Event loop watchdog
+===================
+
+Measures how late the event loop runs a periodic timer: that scheduling
+delay is time some callback held the loop without yielding, during which
+Telegram commands and every other coroutine wait. The lag is exported as
+a metric. When it passes a threshold, a watchdog thread captures the loop
+thread's stack while it is still blocked and logs the frame responsible,
+so blocking calls can be found and moved off the loop.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional, Tuple
+from config import Config
+from metrics import LOOP_LAG, LOOP_LAG_SECONDS, LOOP_STALLS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def describe_stack(frame, depth: int = 12) -> Tuple[str, str]:
+    """Locate the innermost project frame of a stack and format its last entries"""
+    stack = traceback.extract_stack(frame)
+    site = stack[-1]
+    for entry in reversed(stack):
+        path = os.path.abspath(entry.filename)
+        if path.startswith(PROJECT_DIR + os.sep) and "site-packages" not in path:
+            site = entry
+            break
+
+    where = f"{os.path.basename(site.filename)}:{site.lineno} in {site.name}"
+    return where, "".join(traceback.format_list(stack[-depth:]))
+
+
+class LoopWatchdog:
+    """Event loop lag monitor with stack capture of blocking calls"""
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id = None
+        self._tick = 0.0  # Monotonic time the loop last ran the timer
+        self._reported_tick = None
+        self._stall_site: Optional[str] = None
+
+    def start(self):
+        """Start measuring the running loop"""
+        self._loop_thread_id = threading.get_ident()
+        self._tick = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        """Stop the timer and the watchdog thread"""
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _measure(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._tick = now
+
+            lag = max(0.0, now - started - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.set(lag)
+            LOOP_LAG_SECONDS.observe(lag)
+
+            if lag >= self.threshold:
+                # Set by the watchdog thread if it caught the loop while blocked
+                site, self._stall_site = self._stall_site, None
+                LOOP_STALLS.inc(site=site or "unknown")
+                logger.warning(f"Event loop was blocked for {lag:.2f}s" + (f" at {site}" if site else ""))
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval / 2):
+            tick = self._tick
+            blocked = time.monotonic() - tick - self.interval
+            if blocked < self.threshold or self._reported_tick == tick:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+
+            # Report each stall once, while the offending call is still on the stack
+            self._reported_tick = tick
+            site, stack = describe_stack(frame, Config.LOOP_STACK_DEPTH)
+            self._stall_site = site
+            logger.warning(f"Event loop blocked for over {blocked:.2f}s at {site}\n{stack}")
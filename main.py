@@ -19,20 +19,36 @@ Features:
 
 import asyncio
 import logging
+import os
 import signal
 import sys
-from datetime import datetime
-from typing import List, Dict
-import schedule
 import time
-from concurrent.futures import ThreadPoolExecutor
-import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Set
 
-from config import Config
+# Startup timing begins before the project modules are imported
+STARTUP_STARTED = time.perf_counter()
+
+from config import Config, ENV_FILE, RESTART_REQUIRED
 from database import Database, Article, Section
-from website_monitor import WebsiteMonitor
+from website_monitor import WebsiteMonitor, preload_extractors
 from telegraph_manager import TelegraphManager
 from telegram_publisher import TelegramPublisher
+from pipeline import ArticlePipeline
+from scheduler import Scheduler
+from leases import LeaseManager
+from metrics import MetricsServer, QUEUE_DEPTH
+from loop_watchdog import LoopWatchdog
+from sites import BUILTIN_PROFILES, DEFAULT_SECTION_SELECTOR, local_section_name, site_registry
+from tracing import tracer, profiler
+
+IMPORTS_FINISHED = time.perf_counter()
+
+# Settings the maintenance jobs are registered with
+SCHEDULE_SETTINGS = {
+    "CLEANUP_INTERVAL", "STATISTICS_INTERVAL", "DAILY_REPORT_CRON", "SCHEDULER_JITTER",
+    "PAGE_VIEWS_INTERVAL", "REVALIDATE_INTERVAL"
+}
 
 # Setup logging
 logging.basicConfig(
@@ -52,22 +68,56 @@ class NewsBot:
         self.running = False
         self.monitor_task = None
         self.bot_task = None
-        self.schedule_thread = None
         self.shutdown_event = None
-        self._loop = None
+        self.loop = None
+        self.cycle_lock = None  # Held by a monitoring cycle, configuration reloads wait for it
+        self.check_wakeup = None  # Wakes the monitoring loop to apply a new check interval
+        self.config_watch_task = None
+        self.reload_task = None
+        self.startup_timings: Dict[str, float] = {"imports": IMPORTS_FINISHED - STARTUP_STARTED}
+        self._phase_started = IMPORTS_FINISHED
         
         # Initialize components
         self.db = Database()
-        self.telegraph_manager = TelegraphManager()
+        self.telegraph_manager = TelegraphManager(self.db)
         self.website_monitor = WebsiteMonitor(self.db)
         self.telegram_publisher = TelegramPublisher(self.db, self.telegraph_manager)
+        self.pipeline = ArticlePipeline(
+            self.db, self.website_monitor, self.telegram_publisher, self.process_new_articles
+        )
+        self.scheduler = Scheduler(self.db)
+        self.metrics_server = MetricsServer() if Config.ENABLE_METRICS else None
+        self.loop_watchdog = None
+        if Config.LOOP_WATCHDOG_ENABLED:
+            self.loop_watchdog = LoopWatchdog(Config.LOOP_LAG_INTERVAL, Config.LOOP_LAG_THRESHOLD)
+        
+        # Worker mode: sections are leased, only the elected leader publishes
+        self.leases = None
+        self.lease_task = None
+        self.is_leader = False
+        self.leased_sections = set()
+        self._leases_renewed_at = 0.0
+        if Config.WORKER_MODE:
+            self.leases = LeaseManager.from_url(
+                Config.LEASE_DATABASE_URL or Config.DATABASE_PATH, Config.WORKER_ID, Config.LEASE_TTL
+            )
         
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._reload_signal_handler)
+        self.telegram_publisher.reload_handler = self.reload_config
         
+        self._startup_phase("components")
         logger.info("Bot initialized successfully")
     
+    def _startup_phase(self, name: str):
+        """Record the time spent since the previous startup phase"""
+        now = time.perf_counter()
+        self.startup_timings[name] = now - self._phase_started
+        self._phase_started = now
+    
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
         logger.info(f"Received signal {signum}, shutting down...")
@@ -76,15 +126,28 @@ class NewsBot:
         if self.shutdown_event and not self.shutdown_event.is_set():
             self.shutdown_event.set()
     
+    def _reload_signal_handler(self, signum, frame):
+        """Reload the configuration on SIGHUP"""
+        logger.info(f"Received signal {signum}, reloading configuration...")
+        if self.loop and self.running:
+            self.loop.call_soon_threadsafe(self._start_reload, "SIGHUP")
+    
+    def _start_reload(self, source: str):
+        self.reload_task = asyncio.create_task(self.reload_config(source))
+    
     async def start(self):
         """Start the bot"""
         logger.info("Starting News Bot...")
         
-        # Store the event loop for thread-safe task scheduling
-        self._loop = asyncio.get_event_loop()
-        
         # Create shutdown event in the proper event loop context
         self.shutdown_event = asyncio.Event()
+        self.cycle_lock = asyncio.Lock()
+        self.check_wakeup = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        
+        # Watch for blocking calls from the start, startup included
+        if self.loop_watchdog:
+            self.loop_watchdog.start()
         
         # Print configuration for debugging
         Config.print_config()
@@ -93,32 +156,56 @@ class NewsBot:
         if not Config.validate():
             logger.error("Configuration validation failed")
             return False
+        self._startup_phase("config")
         
         # Initialize database
         self.db.init_database()
+        self._startup_phase("database")
         
         # Setup initial sections if configured
         await self.setup_initial_sections()
+        self._startup_phase("sections")
         
         # Start monitoring
         self.running = True
         
+        # Expose the Prometheus metrics
+        if self.metrics_server:
+            QUEUE_DEPTH.set_function(self.get_queue_depths)
+            try:
+                await self.metrics_server.start()
+            except Exception as e:
+                logger.error(f"Error starting metrics server: {e}")
+        
+        # Join the worker group, or lead alone in single-process mode
+        tasks = [asyncio.create_task(self.shutdown_event.wait())]
+        if Config.WORKER_MODE:
+            await asyncio.to_thread(self.leases.init_table)
+            await self.update_leases()
+            self.lease_task = asyncio.create_task(self.lease_loop())
+            tasks.append(self.lease_task)
+        else:
+            await self.start_leader_duties()
+        
         # Start background tasks
         self.monitor_task = asyncio.create_task(self.monitoring_loop())
-        self.bot_task = asyncio.create_task(self.telegram_publisher.run_bot())
-        
-        # Start scheduler in separate thread
-        self.schedule_thread = threading.Thread(target=self.run_scheduler, daemon=True)
-        self.schedule_thread.start()
+        tasks.append(self.monitor_task)
+        self.config_watch_task = asyncio.create_task(self.config_watch_loop())
         
+        self._startup_phase("services")
         logger.info("Bot started successfully")
+        logger.info(
+            "Startup timing: "
+            + ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.startup_timings.items())
+            + f", total {(time.perf_counter() - STARTUP_STARTED) * 1000:.0f}ms"
+        )
+        
+        # Import the parsing libraries in the background instead of on the first extraction
+        asyncio.create_task(asyncio.to_thread(preload_extractors))
         
         # Wait for shutdown signal or task completion
         try:
-            done, pending = await asyncio.wait(
-                [self.monitor_task, self.bot_task, asyncio.create_task(self.shutdown_event.wait())],
-                return_when=asyncio.FIRST_COMPLETED
-            )
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
             
             # Cancel pending tasks gracefully
             for task in pending:
@@ -163,6 +250,24 @@ class NewsBot:
             except Exception as e:
                 logger.warning(f"Error stopping monitor task: {e}")
         
+        if self.config_watch_task and not self.config_watch_task.done():
+            self.config_watch_task.cancel()
+        
+        # Stop the maintenance jobs, letting running ones finish
+        try:
+            await self.scheduler.stop(timeout=5.0)
+        except Exception as e:
+            logger.warning(f"Error stopping scheduler: {e}")
+        
+        # Hand sections and leadership over to the other workers right away
+        if self.leases:
+            if self.lease_task and not self.lease_task.done():
+                self.lease_task.cancel()
+            try:
+                await asyncio.to_thread(self.leases.release_all)
+            except Exception as e:
+                logger.warning(f"Error releasing leases: {e}")
+        
         # Stop telegram bot
         if self.telegram_publisher:
             try:
@@ -170,56 +275,349 @@ class NewsBot:
             except Exception as e:
                 logger.warning(f"Error stopping telegram bot: {e}")
         
+        # Close the pooled Telegraph session
+        try:
+            await self.telegraph_manager.close()
+        except Exception as e:
+            logger.warning(f"Error closing Telegraph session: {e}")
+        
+        # Stop the metrics endpoint
+        if self.metrics_server:
+            try:
+                await self.metrics_server.stop()
+            except Exception as e:
+                logger.warning(f"Error stopping metrics server: {e}")
+        
+        if self.loop_watchdog:
+            await self.loop_watchdog.stop()
+        
         logger.info("Bot stopped successfully")
     
     async def setup_initial_sections(self):
-        """Setup initial sections from configuration"""
+        """Setup the sections of every configured site profile.
+        
+        Also run after a configuration reload: sections a profile no longer
+        lists are deactivated and changed URLs and selectors are updated.
+        Sections added by the admins (without a site) are left alone.
+        """
         try:
-            for section_name in Config.WEBSITE_SECTIONS:
-                # Check if section already exists
-                existing_sections = self.db.get_active_sections()
-                if any(s.name == section_name for s in existing_sections):
+            existing_sections = self.db.get_all_sections()
+            sections_by_name = {s.name: s for s in existing_sections}
+            
+            # Site sections are keyed by their site and the name the profile gives them
+            site_sections = {}
+            for section in existing_sections:
+                site_name = section.custom_settings.get("site")
+                if site_name:
+                    site_sections[(site_name, local_section_name(site_name, section.name))] = section
+            listed = set()
+            
+            for site in site_registry.profiles.values():
+                for section_name, section_config in site.sections.items():
+                    listed.add((site.name, section_name))
+                    url = section_config["url"]
+                    selector = section_config.get("selector") or DEFAULT_SECTION_SELECTOR
+                    
+                    # Check if section already exists
+                    section = site_sections.get((site.name, section_name))
+                    if section:
+                        if section.is_active and (section.url, section.selector) == (url, selector):
+                            continue
+                        
+                        section.url, section.selector, section.is_active = url, selector, True
+                        self.db.update_section(section)
+                        logger.info(f"Updated section: {section.name} ({site.display_name})")
+                        continue
+                    
+                    name = site.section_name(section_name)
+                    section = sections_by_name.get(name)
+                    # Added before sections had a site
+                    if section and not section.custom_settings.get("site") and section.url == url:
+                        section.custom_settings["site"] = site.name
+                        section.selector, section.is_active = selector, True
+                        self.db.update_section(section)
+                        continue
+                    # Added by the admins under the same name
+                    if section:
+                        logger.warning(f"Section name {name} is already used, not adding it for {site.display_name}")
+                        continue
+                    
+                    # Add section, remembering its site
+                    section_id = self.website_monitor.add_section(
+                        name=name,
+                        url=url,
+                        selector=selector,
+                        custom_settings={"site": site.name}
+                    )
+                    
+                    if section_id > 0:
+                        logger.info(f"Added section: {name} ({site.display_name})")
+            
+            # Sections no profile lists any more, unless their profile just failed to load
+            for (site_name, section_name), section in site_sections.items():
+                if not section.is_active or (site_name, section_name) in listed:
                     continue
-                
-                # Create section URL (this would need to be configured per website)
-                section_url = f"{Config.WEBSITE_URL.rstrip('/')}/{section_name.lower()}/"
-                
-                # Add section
-                section_id = self.website_monitor.add_section(
-                    name=section_name,
-                    url=section_url,
-                    selector="article a, .post-title a, .entry-title a"  # Common selectors
-                )
-                
-                if section_id > 0:
-                    logger.info(f"Added section: {section_name}")
+                if site_name in site_registry.profiles or not site_registry.failed:
+                    section.is_active = False
+                    self.db.update_section(section)
+                    logger.info(f"Deactivated section: {section.name}")
                 
         except Exception as e:
             logger.error(f"Error setting up initial sections: {e}")
     
+    async def start_leader_duties(self):
+        """Run the Telegram bot, publishing and maintenance jobs in this process"""
+        self.is_leader = True
+        self.bot_task = asyncio.create_task(self.telegram_publisher.run_bot())
+        # Also started on failover, long after start() began waiting on its tasks
+        self.bot_task.add_done_callback(self._bot_task_done)
+        
+        # Start the maintenance jobs in the event loop
+        self.setup_jobs()
+        self.scheduler.start()
+        
+        if Config.WORKER_MODE:
+            logger.info(f"Worker {Config.WORKER_ID} elected leader")
+    
+    def _bot_task_done(self, task: asyncio.Task):
+        """Shut down when the Telegram bot stops on its own"""
+        if task.cancelled() or not self.running:
+            return
+        error = task.exception()
+        logger.error(f"Telegram bot stopped unexpectedly{f': {error}' if error else ''}, shutting down")
+        self.shutdown_event.set()
+    
+    async def lease_loop(self):
+        """Keep the section and leader leases alive"""
+        while self.running:
+            await asyncio.sleep(Config.LEASE_HEARTBEAT_INTERVAL)
+            await self.update_leases()
+    
+    async def update_leases(self):
+        """Renew our section share and run for leader"""
+        try:
+            sections = self.db.get_active_sections()
+            # The lease database may be remote, keep its round trips off the event loop
+            held = await asyncio.to_thread(self.leases.rebalance, [str(section.id) for section in sections])
+            self.leased_sections = {int(section_id) for section_id in held}
+            leader = await asyncio.to_thread(self.leases.is_leader)
+            self._leases_renewed_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"Error renewing leases: {e}")
+            # Until our leases expire nobody else can have taken over
+            if time.monotonic() - self._leases_renewed_at < Config.LEASE_TTL:
+                return
+            self.leased_sections = set()
+            leader = False
+        
+        if leader and not self.is_leader:
+            await self.start_leader_duties()
+        elif not leader and self.is_leader:
+            # Another worker took over: stop so a supervisor restarts us as a follower
+            logger.error(f"Worker {Config.WORKER_ID} lost leadership, shutting down")
+            self.shutdown_event.set()
+    
+    def get_queue_depths(self) -> Dict[str, int]:
+        """Items waiting in the pipeline stages, the publish outbox and the approval queue"""
+        depths = {}
+        if self.pipeline.pipeline:
+            depths.update(self.pipeline.pipeline.queue_depths())
+        depths["outbox"] = self.db.count_pending_outbox_items()
+        depths["approval"] = self.db.count_articles_pending_approval()
+        return depths
+    
+    def get_monitored_sections(self) -> List[Section]:
+        """Sections this process crawls: its leased share in worker mode"""
+        sections = self.db.get_active_sections()
+        if Config.WORKER_MODE:
+            sections = [section for section in sections if section.id in self.leased_sections]
+        return sections
+    
     async def monitoring_loop(self):
         """Main monitoring loop"""
         logger.info("Starting monitoring loop...")
         
+        outbox_recovered = False
         while self.running:
             try:
-                # Monitor all sections
-                new_articles = await self.website_monitor.monitor_all_sections()
+                # A configuration reload waits for the cycle, every stage sees one configuration
+                async with self.cycle_lock:
+                    if self.is_leader:
+                        # Resume publishes interrupted by a crash, a restart or a failed-over leader
+                        if not outbox_recovered:
+                            try:
+                                await self.telegram_publisher.recover_outbox()
+                                outbox_recovered = True
+                            except asyncio.TimeoutError:
+                                logger.warning("Telegram bot is not ready, publish outbox recovery postponed")
+                            except Exception as e:
+                                outbox_recovered = True
+                                logger.error(f"Error recovering publish outbox: {e}")
+                        
+                        # Retry failed publishes whose backoff has expired
+                        await self.telegram_publisher.process_due_outbox()
+                        
+                        # Approvals of articles stored by followers or before a crash
+                        await self.send_owed_approvals()
+                    
+                    # Discover, extract and publish new articles through the staged pipeline
+                    new_articles = await self.pipeline.run_cycle(
+                        self.get_monitored_sections(), publish=self.is_leader
+                    )
                 
                 if new_articles:
-                    logger.info(f"Found {len(new_articles)} new articles")
-                    
-                    # Process each article
-                    for article in new_articles:
-                        await self.process_new_article(article)
+                    logger.info(f"Found {new_articles} new articles")
                 
                 # Wait for next check
-                await asyncio.sleep(Config.CHECK_INTERVAL)
+                await self.wait_for_next_check(time.monotonic())
                 
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
                 await asyncio.sleep(60)  # Wait before retrying
     
+    async def wait_for_next_check(self, cycle_finished: float):
+        """Sleep CHECK_INTERVAL after a cycle, using the new interval when it is reloaded meanwhile"""
+        while self.running:
+            remaining = cycle_finished + Config.CHECK_INTERVAL - time.monotonic()
+            if remaining <= 0:
+                return
+            self.check_wakeup.clear()
+            try:
+                await asyncio.wait_for(self.check_wakeup.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+    
+    def _config_file_mtimes(self) -> Dict[str, Optional[float]]:
+        """Modification times of .env and the JSON site profiles"""
+        paths = [ENV_FILE] if ENV_FILE else []
+        paths += [entry for entry in Config.SITE_PROFILES if entry not in BUILTIN_PROFILES]
+        
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+    
+    async def config_watch_loop(self):
+        """Reload the configuration when .env or a site profile file changes"""
+        mtimes = self._config_file_mtimes()
+        while self.running:
+            await asyncio.sleep(Config.CONFIG_WATCH_INTERVAL if Config.CONFIG_WATCH_INTERVAL > 0 else 60)
+            if Config.CONFIG_WATCH_INTERVAL <= 0:
+                continue
+            
+            current = self._config_file_mtimes()
+            if current != mtimes:
+                await self.reload_config("file watcher")
+                # The profile list may have changed with the reload
+                mtimes = self._config_file_mtimes()
+    
+    async def reload_config(self, source: str) -> Optional[Dict[str, List[str]]]:
+        """Reload .env and the site profiles between monitoring cycles.
+        
+        Returns the names of the applied settings, the changed sites and the
+        changed settings that only take effect after a restart, or None when
+        the new configuration could not be loaded.
+        """
+        async with self.cycle_lock:
+            try:
+                changes = Config.reload()
+            except Exception as e:
+                logger.error(f"Error reloading configuration ({source}), keeping the current one: {e}")
+                return None
+            
+            try:
+                sites = site_registry.reload()
+            except Exception as e:
+                logger.error(f"Error reloading site profiles ({source}), keeping the current ones: {e}")
+                sites = []
+            
+            applied = sorted(name for name in changes if name not in RESTART_REQUIRED)
+            restart = sorted(name for name in changes if name in RESTART_REQUIRED)
+            await self.apply_config_changes(set(applied), sites)
+        
+        logger.info(
+            f"Configuration reloaded ({source}): "
+            f"{', '.join(applied + [f'site {name}' for name in sites]) or 'no changes'}"
+        )
+        if restart:
+            logger.warning(f"Changed settings that take effect after a restart: {', '.join(restart)}")
+        return {"applied": applied, "sites": sites, "restart": restart}
+    
+    async def apply_config_changes(self, applied: Set[str], sites: List[str]):
+        """Hand reloaded settings to the components that copied them at startup"""
+        if sites:
+            await self.setup_initial_sections()
+        
+        # Messages and pages pre-rendered with the old header, footer or limits
+        if applied or sites:
+            await self.telegram_publisher.refresh_stale_renders()
+        
+        if "TRACE_BUFFER_SIZE" in applied:
+            tracer.resize(Config.TRACE_BUFFER_SIZE)
+        if "PROFILE_SAMPLE_INTERVAL" in applied:
+            profiler.interval = Config.PROFILE_SAMPLE_INTERVAL
+        if self.loop_watchdog:
+            self.loop_watchdog.interval = Config.LOOP_LAG_INTERVAL
+            self.loop_watchdog.threshold = Config.LOOP_LAG_THRESHOLD
+        
+        if self.is_leader and applied & SCHEDULE_SETTINGS:
+            self.setup_jobs()
+        
+        # Let the monitoring loop pick up a new check interval
+        if "CHECK_INTERVAL" in applied:
+            self.check_wakeup.set()
+    
+    async def collect_page_views(self):
+        """Collect Telegraph page views"""
+        articles = self.db.get_page_view_articles(Config.PAGE_VIEWS_WINDOW_DAYS)
+        samples = await self.telegraph_manager.collect_page_views(articles)
+        self.db.add_page_views(samples)
+        logger.info(f"Collected views for {len(samples)} Telegraph pages")
+    
+    async def revalidate_published_articles(self) -> int:
+        """Revalidate a batch of recently published articles, return the number updated"""
+        await self.telegram_publisher.wait_until_ready()
+        articles = self.db.get_revalidation_candidates(
+            Config.REVALIDATE_WINDOW_HOURS, Config.REVALIDATE_BATCH_SIZE
+        )
+        updated = 0
+        
+        for article in articles:
+            change = await self.website_monitor.revalidate_article(article)
+            if not change:
+                continue
+            
+            logger.info(f"Source edit detected for {article.url}: {', '.join(change.changed_fields)}")
+            if await self.telegram_publisher.propagate_source_edit(article, change.fresh, change.changed_fields):
+                # Only remember the new revision once it has been pushed
+                self.db.save_article_revision(
+                    article.id, change.etag, change.last_modified, change.fingerprints
+                )
+                updated += 1
+        
+        if articles:
+            logger.info(f"Revalidated {len(articles)} published articles, {updated} updated")
+        return updated
+    
+    async def process_new_articles(self, articles: List[Article]):
+        """Process a batch of new articles"""
+        if not Config.AUTO_PUBLISH:
+            for article in articles:
+                # Prepare the publish while the admins review the article
+                self.telegram_publisher.schedule_prerender(article)
+                await self.process_new_article(article)
+            return
+        
+        try:
+            # Bursts may be grouped into digest posts
+            published = await self.telegram_publisher.publish_articles(articles)
+            logger.info(f"Published {published} of {len(articles)} new articles")
+        except Exception as e:
+            logger.error(f"Error publishing new articles: {e}")
+    
     async def process_new_article(self, article: Article):
         """Process a new article"""
         try:
@@ -235,46 +633,71 @@ class NewsBot:
                     logger.error(f"Failed to publish article: {article.title}")
             else:
                 # Send to admins for approval
-                await self.send_for_approval(article)
+                if await self.send_for_approval(article):
+                    self.db.clear_approval_notice(article.id)
                 logger.info(f"Sent article for approval: {article.title}")
                 
         except Exception as e:
             logger.error(f"Error processing article {article.title}: {e}")
     
-    async def send_for_approval(self, article: Article):
-        """Send article to admins for approval"""
+    async def send_for_approval(self, article: Article) -> bool:
+        """Send article to admins for approval, return whether any admin (or none configured) got it"""
+        delivered = not Config.ADMIN_IDS
         try:
             for admin_id in Config.ADMIN_IDS:
                 try:
                     await self.telegram_publisher.send_article_for_approval(admin_id, article)
+                    delivered = True
                 except Exception as e:
                     logger.error(f"Error sending article to admin {admin_id}: {e}")
                     
         except Exception as e:
             logger.error(f"Error sending article for approval: {e}")
+        return delivered
     
-    def run_scheduler(self):
-        """Run the scheduler in a separate thread"""
-        # Schedule periodic tasks
-        schedule.every(5).minutes.do(self.cleanup_old_data)
-        schedule.every().hour.do(self.update_statistics)
-        schedule.every().day.at("00:00").do(self.daily_report)
+    async def send_owed_approvals(self):
+        """Send the admins the stored articles they have not been asked to approve yet"""
+        if Config.AUTO_PUBLISH:
+            return
+        try:
+            for article in self.db.get_articles_owing_approval_notice():
+                if await self.send_for_approval(article):
+                    self.db.clear_approval_notice(article.id)
+                    logger.info(f"Sent article for approval: {article.title}")
+        except Exception as e:
+            logger.error(f"Error sending owed approvals: {e}")
+    
+    def setup_jobs(self):
+        """Register the periodic maintenance jobs"""
+        jitter = Config.SCHEDULER_JITTER
+        self.scheduler.add_interval_job("cleanup", self.cleanup_old_data, Config.CLEANUP_INTERVAL, jitter=jitter)
+        self.scheduler.add_interval_job("statistics", self.update_statistics, Config.STATISTICS_INTERVAL, jitter=jitter)
+        self.scheduler.add_cron_job("daily_report", self.daily_report, Config.DAILY_REPORT_CRON)
         
-        while self.running:
-            schedule.run_pending()
-            time.sleep(60)
+        if Config.PAGE_VIEWS_INTERVAL > 0:
+            self.scheduler.add_interval_job(
+                "page_views", self.collect_page_views, Config.PAGE_VIEWS_INTERVAL, jitter=jitter
+            )
+        else:
+            self.scheduler.remove_job("page_views")
+        if Config.REVALIDATE_INTERVAL > 0:
+            self.scheduler.add_interval_job(
+                "revalidation", self.revalidate_published_articles, Config.REVALIDATE_INTERVAL, jitter=jitter
+            )
+        else:
+            self.scheduler.remove_job("revalidation")
     
-    def cleanup_old_data(self):
+    async def cleanup_old_data(self):
         """Clean up old data"""
         try:
             logger.info("Running cleanup task...")
-            # Implement cleanup logic here
-            # For example, remove old published articles from database
-            pass
+            deleted = self.db.delete_old_page_views(Config.PAGE_VIEWS_RETENTION_DAYS)
+            if deleted:
+                logger.info(f"Deleted {deleted} old page view samples")
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
     
-    def update_statistics(self):
+    async def update_statistics(self):
         """Update statistics"""
         try:
             logger.info("Updating statistics...")
@@ -287,33 +710,38 @@ class NewsBot:
         except Exception as e:
             logger.error(f"Error updating statistics: {e}")
     
-    def daily_report(self):
+    async def daily_report(self):
         """Send daily report to admins"""
         try:
             logger.info("Generating daily report...")
             
             # Get statistics
             sections = self.db.get_active_sections()
-            pending_articles = self.db.get_articles_pending_approval()
+            pending_count = self.db.count_articles_pending_approval()
             unpublished_articles = self.db.get_unpublished_articles()
             
             report = f"""
 📊 التقرير اليومي - {datetime.now().strftime('%Y-%m-%d')}
 
 📰 الأقسام النشطة: {len(sections)}
-📝 المقالات المعلقة: {len(pending_articles)}
+📝 المقالات المعلقة: {pending_count}
 📋 المقالات غير المنشورة: {len(unpublished_articles)}
 
 🔄 حالة البوت: {'🟢 يعمل' if self.running else '🔴 متوقف'}
             """
             
-            # Use asyncio.run_coroutine_threadsafe to safely schedule the task
-            if self.running and hasattr(self, '_loop') and self._loop.is_running():
-                future = asyncio.run_coroutine_threadsafe(
-                    self.telegram_publisher.notify_admins(report), 
-                    self._loop
-                )
-                # Don't wait for the result to avoid blocking the scheduler thread
+            # Most viewed articles of each section
+            top_articles = self.db.get_top_articles_by_views(days=1, per_section=3)
+            if top_articles:
+                report += "\n👁️ الأكثر مشاهدة:\n"
+                for section, entries in top_articles.items():
+                    report += f"\n📂 {section or 'بدون قسم'}:\n"
+                    for title, url, views in entries:
+                        report += f"• {title} ({views}) {url}\n"
+            
+            if self.running:
+                await self.telegram_publisher.wait_until_ready()
+                await self.telegram_publisher.notify_admins(report)
             else:
                 logger.info(f"Daily report ready: {report}")
             
@@ -346,18 +774,19 @@ class NewsBot:
         """Get bot status"""
         try:
             sections = self.db.get_active_sections()
-            pending_articles = self.db.get_articles_pending_approval()
+            pending_count = self.db.count_articles_pending_approval()
             unpublished_articles = self.db.get_unpublished_articles()
             
             return {
                 'running': self.running,
                 'sections_count': len(sections),
-                'pending_articles': len(pending_articles),
+                'pending_articles': pending_count,
                 'unpublished_articles': len(unpublished_articles),
                 'auto_publish': Config.AUTO_PUBLISH,
                 'text_shortening': Config.ENABLE_TEXT_SHORTENING,
                 'check_interval': Config.CHECK_INTERVAL,
-                'telegraph_connected': self.telegraph_manager.account_info is not None
+                'telegraph_connected': self.telegraph_manager.get_status() != "error",
+                'telegraph_status': self.telegraph_manager.get_status()
             }
         except Exception as e:
             logger.error(f"Error getting bot status: {e}")
@@ -367,13 +796,8 @@ class NewsBot:
         """Manually trigger a check"""
         try:
             logger.info("Manual check triggered")
-            new_articles = await self.website_monitor.monitor_all_sections()
-            
-            if new_articles:
-                for article in new_articles:
-                    await self.process_new_article(article)
-            
-            return len(new_articles)
+            async with self.cycle_lock:
+                return await self.pipeline.run_cycle(self.get_monitored_sections(), publish=self.is_leader)
         except Exception as e:
             logger.error(f"Error in manual check: {e}")
             return 0
@@ -0,0 +1,155 @@
+"""
+Telegram message splitting
+==========================
+
+Telegram measures message and caption limits in UTF-16 code units, not in
+Python characters. This module splits long texts into parts that respect
+those limits while preferring paragraph, line and sentence boundaries
+(including Arabic punctuation) and never cutting through a Markdown entity.
+"""
+
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional
+
+# Break candidates, from the most preferred to the least preferred
+_BREAK_RE = re.compile(
+    r'(\n[ \t]*\n\s*)'          # paragraph
+    r'|(\n\s*)'                 # line
+    r'|([.!?؟؛…]+["\')»]*\s+)'  # sentence
+    r'|([،,:;]\s+)'             # clause
+    r'|(\s+)'                   # word
+)
+_PRIORITY_BY_GROUP = {1: 4, 2: 3, 3: 2, 4: 1, 5: 0}
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+
+def _break_priority(match: re.Match) -> int:
+    """Priority of a break candidate by the whitespace it ends with.
+
+    A sentence or word match can swallow a paragraph break (".\n\n" or " \n\n"),
+    the group alone would rank it below the paragraph it ends.
+    """
+    matched = match.group()
+    if '\n' in matched:
+        return 4 if _PARAGRAPH_RE.search(matched) else 3
+    return _PRIORITY_BY_GROUP[match.lastindex]
+
+# Markdown (v1) entities that must not be split
+_ENTITY_RE = re.compile(
+    r'```.*?```'
+    r'|`[^`\n]+`'
+    r'|\[[^\]\n]+\]\([^)\s]+\)'
+    r'|\*[^*\n]+\*'
+    r'|_[^_\n]+_',
+    re.DOTALL
+)
+
+
+def utf16_len(text: str) -> int:
+    """Length of text as counted by Telegram (UTF-16 code units)"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _entity_marker(entity: str) -> Optional[str]:
+    """Marker that can close and reopen an entity, None for links"""
+    if entity.startswith('```'):
+        return '```'
+    if entity[0] in '`*_':
+        return entity[0]
+    return None
+
+
+def split_message(text: str, max_length: int, first_max_length: Optional[int] = None) -> List[str]:
+    """Split text into parts that Telegram accepts.
+
+    ``first_max_length`` applies to the first part only, e.g. when it is sent
+    as a photo caption and the rest as regular messages.
+    """
+    # Leading whitespace would make a blank first part, handing the caption limit to nothing
+    text = text.strip()
+    limit = first_max_length or max_length
+    if utf16_len(text) <= limit:
+        return [text]
+
+    length = len(text)
+    offsets = list(accumulate((2 if ord(ch) > 0xFFFF else 1 for ch in text), initial=0))
+
+    # Index entity spans and break candidates once
+    entity_at = [None] * length
+    for match in _ENTITY_RE.finditer(text):
+        span = (match.start(), match.end(), _entity_marker(match.group()))
+        for i in range(match.start() + 1, match.end()):
+            entity_at[i] = span
+
+    breaks = []
+    for match in _BREAK_RE.finditer(text):
+        position = match.end()
+        if position < length and entity_at[position] is not None:
+            continue
+        if entity_at[match.start()] is not None:
+            continue
+        breaks.append((position, _break_priority(match)))
+
+    parts = []
+    start = 0
+    carry = ''
+    break_index = 0
+
+    while start < length:
+        budget = max(limit - utf16_len(carry), 1)
+        if offsets[length] - offsets[start] <= budget:
+            parts.append(carry + text[start:])
+            break
+
+        end = bisect_right(offsets, offsets[start] + budget, lo=start) - 1
+
+        while break_index < len(breaks) and breaks[break_index][0] <= start:
+            break_index += 1
+
+        furthest = {}
+        j = break_index
+        while j < len(breaks) and breaks[j][0] <= end:
+            position, priority = breaks[j]
+            furthest[priority] = position
+            j += 1
+
+        # Prefer the strongest boundary that still fills at least half the part
+        cut = None
+        min_fill = offsets[start] + budget // 2
+        for priority in sorted(furthest, reverse=True):
+            if offsets[furthest[priority]] >= min_fill:
+                cut = furthest[priority]
+                break
+        if cut is None and furthest:
+            cut = max(furthest.values())
+
+        next_carry = ''
+        part_suffix = ''
+        if cut is None:
+            cut = end
+            span = entity_at[cut] if cut < length else None
+            if span is not None:
+                span_start, _, marker = span
+                if span_start > start:
+                    # Move the whole entity to the next part
+                    cut = span_start
+                elif marker:
+                    # Entity is longer than a part: close it here and reopen it
+                    reserve = utf16_len(marker)
+                    cut = bisect_right(offsets, offsets[start] + budget - reserve, lo=start) - 1
+                    part_suffix = marker
+                    next_carry = marker
+        cut = max(cut, start + 1)
+
+        part = (carry + text[start:cut]).strip() + part_suffix
+        if part.strip():
+            parts.append(part)
+            # The first limit holds until a part is actually kept
+            limit = max_length
+
+        start = cut
+        carry = next_carry
+
+    return [part.strip() for part in parts if part.strip()]
@@ -0,0 +1,296 @@
+"""
+Prometheus metrics
+==================
+
+Counters, gauges and histograms kept in process memory and served in the
+Prometheus text format by an embedded /metrics endpoint. Recording a sample
+is a dictionary update under an uncontended lock, and gauges that would be
+costly to keep current (queue depths, table counts) are read by callbacks
+only when the endpoint is scraped, so an unscraped bot pays next to nothing.
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from aiohttp import web
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds, from a cache hit up to a slow Telegraph chain or flood wait
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Registry:
+    """Set of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics: Dict[str, "Metric"] = {}
+
+    def register(self, metric: "Metric"):
+        if metric.name in self.metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """Metric family with optional labels"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()  # Samples are also recorded from worker threads
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+    def _labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in values]
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}"
+        ] + self._samples()
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(Metric):
+    """Value that goes up and down, set directly or read from a callback at scrape time"""
+
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._callback: Optional[Callable[[], object]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def set_function(self, callback: Optional[Callable[[], object]]):
+        """Read the value on scrape: a number, or a dict from label value(s) to number"""
+        self._callback = callback
+
+    def _samples(self) -> List[str]:
+        if self._callback is None:
+            return super()._samples()
+
+        try:
+            result = self._callback()
+        except Exception as e:
+            logger.error(f"Error collecting metric {self.name}: {e}")
+            return []
+
+        if not isinstance(result, dict):
+            result = {(): result}
+        samples = []
+        for key, value in result.items():
+            key = key if isinstance(key, tuple) else (key,)
+            samples.append(f"{self.name}{self._labels(tuple(str(k) for k in key))} {_format_value(value)}")
+        return samples
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+
+        samples = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                samples.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+            samples.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            samples.append(f"{self.name}_count{self._labels(key)} {count}")
+        return samples
+
+
+# Hot-path latencies
+SECTION_FETCH_SECONDS = Histogram(
+    "newsbot_section_fetch_seconds", "Time to download a section page", ["section"]
+)
+EXTRACTION_SECONDS = Histogram(
+    "newsbot_extraction_seconds", "Article extraction time per extractor", ["extractor"]
+)
+TELEGRAPH_PAGE_SECONDS = Histogram(
+    "newsbot_telegraph_page_seconds", "Time to create the Telegraph page chain of an article"
+)
+TELEGRAPH_UPLOAD_SECONDS = Histogram(
+    "newsbot_telegraph_upload_seconds", "Time to upload an image to Telegraph"
+)
+TELEGRAM_REQUEST_SECONDS = Histogram(
+    "newsbot_telegram_request_seconds", "Bot API request latency", ["method"]
+)
+
+# Throughput and health
+PIPELINE_ITEMS = Counter(
+    "newsbot_pipeline_items_total", "Items passed on by each pipeline stage", ["stage"]
+)
+QUEUE_DEPTH = Gauge(
+    "newsbot_queue_depth", "Items waiting in each queue", ["queue"]
+)
+CACHE_LOOKUPS = Counter(
+    "newsbot_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+ERRORS = Counter(
+    "newsbot_errors_total", "Errors by component and exception type", ["component", "exception"]
+)
+
+# Event loop health
+LOOP_LAG = Gauge(
+    "newsbot_event_loop_lag_seconds", "Scheduling delay of the latest event loop timer tick"
+)
+LOOP_LAG_SECONDS = Histogram(
+    "newsbot_event_loop_lag_distribution_seconds", "Scheduling delay of event loop timer ticks",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+LOOP_STALLS = Counter(
+    "newsbot_event_loop_stalls_total", "Event loop stalls over the threshold by blocking call site", ["site"]
+)
+
+
+def record_error(component: str, error: BaseException):
+    """Count an error by its exception type"""
+    ERRORS.inc(component=component, exception=type(error).__name__)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a cache hit or miss"""
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+class MetricsServer:
+    """Embedded aiohttp server exposing /metrics"""
+
+    def __init__(self, registry: Registry = REGISTRY):
+        self.registry = registry
+        self.runner: Optional[web.AppRunner] = None
+
+    async def start(self):
+        """Start the HTTP endpoint"""
+        app = web.Application()
+        app.router.add_get(Config.METRICS_PATH, self.handle_metrics)
+
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, Config.METRICS_LISTEN, Config.METRICS_PORT)
+        await site.start()
+
+        logger.info(f"Metrics listening on {Config.METRICS_LISTEN}:{Config.METRICS_PORT}{Config.METRICS_PATH}")
+
+    async def stop(self):
+        """Stop the HTTP endpoint"""
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Render every metric"""
+        return web.Response(
+            text=self.registry.render(),
+            content_type="text/plain",
+            charset="utf-8"
+        )
@@ -0,0 +1,237 @@
+"""
+Article processing pipeline
+===========================
+
+Runs discovery, fetching, extraction, filtering, storage, rendering and
+publishing as separate stages joined by bounded asyncio queues. Every stage
+has its own worker count, a slow stage applies backpressure to the stages
+before it instead of stalling the whole cycle, and the first new article is
+published while later sections are still being discovered.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from config import Config
+from database import Database, Article, Section
+from metrics import PIPELINE_ITEMS, record_error
+from tracing import tracer
+from sites import site_registry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageStats:
+    """Counters of one pipeline stage"""
+    processed: int = 0
+    emitted: int = 0
+    errors: int = 0
+    busy_time: float = 0.0     # seconds spent in the handler
+    blocked_time: float = 0.0  # seconds waiting for room in the next queue
+    queue_peak: int = 0
+
+
+@dataclass
+class Stage:
+    """Pipeline stage: an async handler mapping an item to a list of output items"""
+    name: str
+    handler: Callable[[Any], Awaitable[Optional[List[Any]]]]
+    workers: int = 1
+    batch_size: int = 1  # Above 1 the handler receives a list of queued items
+
+
+class Pipeline:
+    """Stages joined by bounded queues"""
+
+    def __init__(self, stages: List[Stage], queue_size: int):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.stats: Dict[str, StageStats] = {}
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current number of items waiting in front of each stage"""
+        return {name: queue.qsize() for name, queue in self.queues.items()}
+
+    async def run(self, items: Iterable[Any]) -> Dict[str, StageStats]:
+        """Feed items to the first stage and wait until every stage is drained"""
+        self.queues = {stage.name: asyncio.Queue(maxsize=self.queue_size) for stage in self.stages}
+        self.stats = {stage.name: StageStats() for stage in self.stages}
+
+        workers = []
+        for index, stage in enumerate(self.stages):
+            inbox = self.queues[stage.name]
+            outbox = self.queues[self.stages[index + 1].name] if index + 1 < len(self.stages) else None
+            for _ in range(max(stage.workers, 1)):
+                workers.append(asyncio.create_task(
+                    self._worker(stage, inbox, outbox, self.stats[stage.name])
+                ))
+
+        try:
+            first = self.queues[self.stages[0].name]
+            for item in items:
+                await first.put(item)
+
+            # A stage only acknowledges an item after passing its outputs on,
+            # so draining the queues in order drains the whole pipeline
+            for stage in self.stages:
+                await self.queues[stage.name].join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return self.stats
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue],
+                      stats: StageStats):
+        while True:
+            items = [await inbox.get()]
+            while len(items) < stage.batch_size:
+                try:
+                    items.append(inbox.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            stats.queue_peak = max(stats.queue_peak, inbox.qsize() + len(items))
+
+            try:
+                started = time.monotonic()
+                try:
+                    outputs = await stage.handler(items if stage.batch_size > 1 else items[0])
+                finally:
+                    stats.busy_time += time.monotonic() - started
+                stats.processed += len(items)
+
+                for output in outputs or []:
+                    if outbox is not None:
+                        started = time.monotonic()
+                        await outbox.put(output)
+                        stats.blocked_time += time.monotonic() - started
+                    stats.emitted += 1
+                if outputs:
+                    PIPELINE_ITEMS.inc(len(outputs), stage=stage.name)
+
+            except Exception as e:
+                stats.errors += len(items)
+                record_error(f"pipeline.{stage.name}", e)
+                logger.error(f"Error in pipeline stage {stage.name}: {e}")
+            finally:
+                for _ in items:
+                    inbox.task_done()
+
+
+class ArticlePipeline:
+    """Monitoring cycle as a pipeline: discover → fetch → extract → filter → persist → render → publish"""
+
+    def __init__(self, db: Database, website_monitor, telegram_publisher,
+                 publish: Callable[[List[Article]], Awaitable[Any]]):
+        self.db = db
+        self.website_monitor = website_monitor
+        self.telegram_publisher = telegram_publisher
+        self.publish = publish
+        self.pipeline: Optional[Pipeline] = None
+        self.last_stats: Dict[str, StageStats] = {}
+        self._seen_urls = set()
+
+    def _build(self, publish: bool) -> Pipeline:
+        """Build the stages, reading the worker counts at the start of each cycle"""
+        stages = [
+            Stage("discover", self._discover, Config.PIPELINE_DISCOVER_WORKERS),
+            Stage("fetch", self._fetch, Config.PIPELINE_FETCH_WORKERS),
+            Stage("extract", self._extract, Config.PIPELINE_EXTRACT_WORKERS),
+            Stage("filter", self._filter, Config.PIPELINE_FILTER_WORKERS),
+            Stage("persist", self._persist, Config.PIPELINE_PERSIST_WORKERS),
+            Stage("render", self._render, Config.PIPELINE_RENDER_WORKERS)
+        ]
+        if publish:
+            stages.append(Stage(
+                "publish", self._publish, Config.PIPELINE_PUBLISH_WORKERS,
+                # Articles queued together can be grouped into a digest
+                batch_size=Config.DIGEST_MAX_ITEMS if Config.DIGEST_MODE else 1
+            ))
+        return Pipeline(stages, Config.PIPELINE_QUEUE_SIZE)
+
+    async def run_cycle(self, sections: List[Section] = None, publish: bool = True) -> int:
+        """Run one monitoring cycle, return the number of new articles.
+
+        Without the publish stage new articles are only stored (and queued in
+        the publish outbox when auto-publishing) for another process to send.
+        """
+        self._seen_urls = set()
+        self.pipeline = self._build(publish)
+
+        if sections is None:
+            sections = self.db.get_active_sections()
+        # Sites take turns, so discovery of every site starts early in the cycle
+        sections = site_registry.interleave(sections)
+
+        started = time.monotonic()
+        stats = await self.pipeline.run(sections)
+        self.last_stats = stats
+
+        for name, stage_stats in stats.items():
+            logger.debug(
+                f"Stage {name}: {stage_stats.processed} in, {stage_stats.emitted} out, "
+                f"{stage_stats.errors} errors, {stage_stats.busy_time:.1f}s busy, "
+                f"{stage_stats.blocked_time:.1f}s blocked, queue peak {stage_stats.queue_peak}"
+            )
+
+        new_articles = stats["persist"].emitted
+        if new_articles:
+            logger.info(f"Pipeline stored {new_articles} new articles in {time.monotonic() - started:.1f}s")
+        return new_articles
+
+    async def _discover(self, section: Section) -> List[tuple]:
+        logger.info(f"Checking section: {section.name}")
+        urls = await self.website_monitor.discover_article_urls(section)
+        self.db.update_section_last_check(section.id)
+
+        # The same article may be listed by several sections
+        new_urls = [url for url in urls if url not in self._seen_urls]
+        self._seen_urls.update(new_urls)
+        return [(section, url) for url in new_urls]
+
+    async def _fetch(self, item: tuple) -> List[tuple]:
+        section, url = item
+        with tracer.span(url, "fetch"):
+            page_html = await self.website_monitor.fetch_page(url)
+        return [(section, url, page_html)]
+
+    async def _extract(self, item: tuple) -> List[Article]:
+        section, url, page_html = item
+        with tracer.span(url, "extract"):
+            article = await self.website_monitor.extract_section_article(url, section, page_html)
+        if article:
+            tracer.set_title(url, article.title)
+        return [article] if article else []
+
+    async def _filter(self, article: Article) -> List[Article]:
+        with tracer.span(article.url, "filter"):
+            return [article] if self.website_monitor.should_include_article(article) else []
+
+    async def _persist(self, article: Article) -> List[Article]:
+        with tracer.span(article.url, "persist"):
+            return [article] if self.website_monitor.store_article(article) else []
+
+    async def _render(self, article: Article) -> List[Article]:
+        # Prepare the Telegraph page and message ahead of the send or the approval
+        if Config.AUTO_PUBLISH or Config.PRERENDER_PENDING:
+            with tracer.span(article.url, "render"):
+                await self.telegram_publisher.prerender_article(article)
+        return [article]
+
+    async def _publish(self, articles) -> None:
+        articles = articles if isinstance(articles, list) else [articles]
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self.publish(articles)
+        finally:
+            # The whole batch shares one span
+            for article in articles:
+                tracer.record(article.url, "publish", started_at, time.perf_counter() - started)
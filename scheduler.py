@@ -0,0 +1,289 @@
+"""
+In-loop job scheduler
+=====================
+
+Runs periodic maintenance jobs inside the bot's event loop instead of a
+polling thread. Supports interval and cron jobs, random jitter, catch-up of
+runs missed while the bot was down, skipping runs that would overlap a
+still running one, and per-job duration statistics.
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set
+
+from metrics import record_error
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# bot_settings key prefix storing the last run time of each job
+LAST_RUN_SETTING = "scheduler_last_run:"
+
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week"""
+
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 6))
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        self.expression = expression
+        values = {}
+        for part, (name, low, high) in zip(parts, self.FIELDS):
+            # 7 is accepted as Sunday like in crontab
+            values[name] = self._parse_field(part, low, 7 if name == "weekday" else high)
+        values["weekday"] = {day % 7 for day in values["weekday"]}
+
+        self.minutes = values["minute"]
+        self.hours = values["hour"]
+        self.days = values["day"]
+        self.months = values["month"]
+        self.weekdays = values["weekday"]
+        # With both day fields restricted, cron runs when either matches
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for item in field.split(","):
+            value_range, _, step = item.partition("/")
+            step = int(step) if step else 1
+            if value_range == "*":
+                start, end = low, high
+            elif "-" in value_range:
+                start, end = (int(value) for value in value_range.split("-", 1))
+            else:
+                start = end = int(value_range)
+                if step > 1:
+                    end = high
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = moment.day in self.days
+        in_weekdays = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return in_weekdays
+        if self.any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+@dataclass
+class JobStats:
+    """Run statistics of a job"""
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0  # Due while the previous run was still going
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    total_duration: float = 0.0
+    last_run_at: Optional[datetime] = None
+    last_error: str = ""
+
+
+class Job:
+    """Scheduled job"""
+
+    def __init__(self, name: str, func: Callable[[], Any], interval: float = 0,
+                 cron: Optional[CronSchedule] = None, jitter: float = 0, catch_up: bool = True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = cron
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.next_run = 0.0  # Wall-clock timestamp
+        self.task: Optional[asyncio.Task] = None
+        self.stats = JobStats()
+
+    def schedule_next(self, now: float):
+        """Compute the next run time after now"""
+        if self.cron:
+            next_run = self.cron.next_after(datetime.fromtimestamp(now)).timestamp()
+        else:
+            next_run = now + self.interval
+        self.next_run = next_run + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+class Scheduler:
+    """Job scheduler running in the event loop"""
+
+    def __init__(self, db=None):
+        self.db = db
+        self.jobs: Dict[str, Job] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def add_interval_job(self, name: str, func: Callable[[], Any], seconds: float,
+                         jitter: float = 0, run_immediately: bool = False, catch_up: bool = True) -> Job:
+        """Run func every `seconds` seconds"""
+        job = Job(name, func, interval=seconds, jitter=jitter, catch_up=catch_up)
+        self._add(job, run_immediately)
+        return job
+
+    def add_cron_job(self, name: str, func: Callable[[], Any], expression: str,
+                     jitter: float = 0, catch_up: bool = True) -> Job:
+        """Run func at the times matching a cron expression (local time)"""
+        job = Job(name, func, cron=CronSchedule(expression), jitter=jitter, catch_up=catch_up)
+        self._add(job, False)
+        return job
+
+    def _add(self, job: Job, run_immediately: bool):
+        now = time.time()
+        last_run = self._load_last_run(job.name) if job.catch_up else None
+
+        if run_immediately:
+            job.next_run = now
+        elif last_run is not None:
+            # A run that fell due while the bot was down is made up once
+            job.schedule_next(last_run)
+            if job.next_run <= now:
+                logger.info(f"Catching up missed run of job {job.name}")
+                job.next_run = now
+        else:
+            job.schedule_next(now)
+
+        # Replacing a job keeps its statistics and its running task, so runs still never overlap
+        previous = self.jobs.get(job.name)
+        if previous:
+            job.task = previous.task
+            job.stats = previous.stats
+
+        self.jobs[job.name] = job
+        if self._wakeup:
+            self._wakeup.set()
+
+    def remove_job(self, name: str):
+        """Stop scheduling a job, a run in progress finishes"""
+        self.jobs.pop(name, None)
+
+    def _load_last_run(self, name: str) -> Optional[float]:
+        if not self.db:
+            return None
+        try:
+            value = self.db.get_bot_setting(LAST_RUN_SETTING + name)
+            return datetime.fromisoformat(value).timestamp() if value else None
+        except Exception as e:
+            logger.error(f"Error loading last run of job {name}: {e}")
+            return None
+
+    def _save_last_run(self, name: str, started: datetime):
+        if not self.db:
+            return
+        try:
+            self.db.set_bot_setting(LAST_RUN_SETTING + name, started.isoformat(), f"Last run of job {name}")
+        except Exception as e:
+            logger.error(f"Error saving last run of job {name}: {e}")
+
+    def start(self):
+        """Start dispatching jobs in the running loop"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop dispatching and wait for running jobs, cancelling them after timeout"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        running = [job.task for job in self.jobs.values() if job.running]
+        if running:
+            done, pending = await asyncio.wait(running, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, JobStats]:
+        """Statistics of every job"""
+        return {name: job.stats for name, job in self.jobs.items()}
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+
+            for job in list(self.jobs.values()):
+                if job.next_run > now:
+                    continue
+                if job.running:
+                    # Never overlap runs of the same job
+                    job.stats.skipped += 1
+                    logger.warning(f"Skipping run of job {job.name}: previous run still in progress")
+                else:
+                    job.task = asyncio.create_task(self._execute(job), name=f"job:{job.name}")
+                # Runs missed while the loop was busy are coalesced into this one
+                job.schedule_next(now)
+
+            delay = min((job.next_run for job in self.jobs.values()), default=now + 60) - time.time()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: Job):
+        started_at = datetime.now()
+        started = time.monotonic()
+        try:
+            result = job.func()
+            if inspect.isawaitable(result):
+                await result
+            job.stats.last_error = ""
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.stats.failures += 1
+            job.stats.last_error = str(e)
+            record_error(f"job.{job.name}", e)
+            logger.error(f"Error in scheduled job {job.name}: {e}")
+        finally:
+            duration = time.monotonic() - started
+            job.stats.runs += 1
+            job.stats.last_duration = duration
+            job.stats.max_duration = max(job.stats.max_duration, duration)
+            job.stats.total_duration += duration
+            job.stats.last_run_at = started_at
+            logger.debug(f"Job {job.name} finished in {duration:.2f}s")
+
+        self._save_last_run(job.name, started_at)
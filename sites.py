@@ -0,0 +1,296 @@
+"""
+Site profiles
+=============
+
+A site profile bundles everything the bot needs to know about one source
+website: its sections and their link selectors, the content selectors used
+when automatic extraction fails, keyword filters, important keywords and
+message formatting. Several profiles run side by side in one bot, sharing
+the fetch session, the pipeline, the caches and the publisher; each section
+and article is matched to its profile by the section's "site" setting or
+by the article URL's host.
+
+SITE_PROFILES lists the enabled profiles, each either a built-in name or
+the path of a JSON file with the SiteProfile fields:
+
+    SITE_PROFILES=["ansarollah", "profiles/saba.json"]
+
+The "default" profile is built from WEBSITE_URL and WEBSITE_SECTIONS.
+
+Section names are unique in the database, so the sections of every other
+profile are stored as "site:name" (e.g. "ansarollah:news").
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from config import Config
+from database import Article, Section
+from ansarollah_config import AnsarallahConfig
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Link selector of sections that don't set their own
+DEFAULT_SECTION_SELECTOR = "article a, .post-title a, .entry-title a"
+
+# Listing, media and admin URLs that are never articles
+DEFAULT_SKIP_PATTERNS = [
+    '/category/', '/tag/', '/author/', '/page/', '/search/',
+    '.pdf', '.doc', '.zip', '.jpg', '.png', '.gif',
+    '/wp-admin/', '/wp-content/', '/feed/', '/rss/'
+]
+
+
+def _host(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def local_section_name(site_name: str, name: str) -> str:
+    """Name a site gives one of its sections, without the site prefix of the database name"""
+    prefix = f"{site_name}:"
+    return name[len(prefix):] if name.startswith(prefix) else name
+
+
+@lru_cache(maxsize=128)
+def _keyword_pattern(keywords: tuple) -> Optional["re.Pattern"]:
+    """Case-insensitive alternation of the keywords, compiled once per keyword set"""
+    keywords = [keyword for keyword in keywords if keyword]
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+
+@dataclass
+class SiteProfile:
+    """Sections, selectors, filters and formatting of one source website"""
+    name: str
+    website_url: str
+    display_name: str = ""
+    sections: Dict[str, Dict] = field(default_factory=dict)  # name -> {"url", "selector", "description"}
+    content_selectors: Dict[str, List[str]] = field(default_factory=dict)  # "title", "content", "image", ...
+    section_settings: Dict[str, Dict] = field(default_factory=dict)  # name -> custom_header, default_tags, emoji
+    include_keywords: List[str] = field(default_factory=list)  # Replace INCLUDE_KEYWORDS when set
+    exclude_keywords: List[str] = field(default_factory=list)  # Added to EXCLUDE_KEYWORDS
+    important_keywords: List[str] = field(default_factory=list)  # Never grouped into digests
+    skip_patterns: List[str] = field(default_factory=lambda: list(DEFAULT_SKIP_PATTERNS))
+    header: Optional[str] = None  # None uses CUSTOM_HEADER
+    footer: Optional[str] = None  # None uses CUSTOM_FOOTER
+    telegraph_author: Optional[str] = None  # None uses TELEGRAPH_AUTHOR
+    telegraph_author_url: Optional[str] = None  # None uses TELEGRAPH_AUTHOR_URL
+
+    def __post_init__(self):
+        self.website_url = self.website_url.rstrip("/")
+        self.display_name = self.display_name or self.name
+        self.host = _host(self.website_url)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SiteProfile":
+        known = set(cls.__dataclass_fields__)
+        unknown = set(data) - known
+        if unknown:
+            logger.warning(f"Ignoring unknown site profile fields: {', '.join(sorted(unknown))}")
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    @classmethod
+    def from_file(cls, path: str) -> "SiteProfile":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_config_class(cls, name: str, config) -> "SiteProfile":
+        """Profile of a site configuration class such as AnsarallahConfig"""
+        telegraph = getattr(config, "TELEGRAPH_CONFIG", {})
+        return cls(
+            name=name,
+            website_url=config.WEBSITE_URL,
+            display_name=getattr(config, "WEBSITE_NAME", ""),
+            sections=dict(config.SECTIONS),
+            content_selectors=dict(getattr(config, "CONTENT_SELECTORS", {})),
+            section_settings=dict(getattr(config, "SECTION_SETTINGS", {})),
+            exclude_keywords=list(getattr(config, "EXCLUDE_KEYWORDS", [])),
+            important_keywords=list(getattr(config, "IMPORTANT_KEYWORDS", [])),
+            telegraph_author=telegraph.get("author"),
+            telegraph_author_url=telegraph.get("author_url")
+        )
+
+    @classmethod
+    def from_config(cls) -> "SiteProfile":
+        """The single site configured through WEBSITE_URL and WEBSITE_SECTIONS"""
+        website_url = Config.WEBSITE_URL.rstrip("/")
+        return cls(
+            name="default",
+            website_url=website_url,
+            sections={
+                name: {"url": f"{website_url}/{name.lower()}/", "selector": DEFAULT_SECTION_SELECTOR}
+                for name in Config.WEBSITE_SECTIONS
+            },
+            section_settings={name: Config.get_section_settings(name) for name in Config.WEBSITE_SECTIONS},
+            important_keywords=list(Config.IMPORTANT_KEYWORDS)
+        )
+
+    def owns(self, url: str) -> bool:
+        """Whether a URL is on this site"""
+        return bool(url) and _host(url) == self.host
+
+    def is_article_url(self, url: str) -> bool:
+        """Check if URL is an article of this site"""
+        if not self.owns(url):
+            return False
+        lowered = url.lower()
+        return not any(pattern in lowered for pattern in self.skip_patterns)
+
+    def section_name(self, name: str) -> str:
+        """Database name of one of the site's sections"""
+        return name if self.name == "default" else f"{self.name}:{name}"
+
+    def get_section_settings(self, section_name: str) -> Dict:
+        return self.section_settings.get(local_section_name(self.name, section_name)) or {}
+
+    def selectors(self, kind: str) -> List[str]:
+        """Content selectors of one kind, most specific first"""
+        return list(self.content_selectors.get(kind) or [])
+
+    def should_include(self, article: Article) -> bool:
+        """Apply the global and the site's keyword filters"""
+        text = f"{article.title} {article.content}"
+
+        exclude = _keyword_pattern(tuple(Config.EXCLUDE_KEYWORDS) + tuple(self.exclude_keywords))
+        if exclude and exclude.search(text):
+            return False
+
+        # Include keywords: if specified, at least one must match
+        include = _keyword_pattern(tuple(self.include_keywords or Config.INCLUDE_KEYWORDS))
+        if include:
+            return bool(include.search(text))
+
+        return True
+
+    def is_important(self, article: Article) -> bool:
+        pattern = _keyword_pattern(tuple(self.important_keywords))
+        return bool(pattern and pattern.search(f"{article.title} {article.summary}"))
+
+    @property
+    def message_header(self) -> str:
+        return Config.CUSTOM_HEADER if self.header is None else self.header
+
+    @property
+    def message_footer(self) -> str:
+        return Config.CUSTOM_FOOTER if self.footer is None else self.footer
+
+    @property
+    def author(self) -> str:
+        return self.telegraph_author or Config.TELEGRAPH_AUTHOR
+
+    @property
+    def author_url(self) -> str:
+        return self.telegraph_author_url or Config.TELEGRAPH_AUTHOR_URL
+
+
+# Built-in profiles by name
+BUILTIN_PROFILES = {
+    "default": SiteProfile.from_config,
+    "ansarollah": lambda: SiteProfile.from_config_class("ansarollah", AnsarallahConfig)
+}
+
+
+def load_profile(entry: str) -> SiteProfile:
+    """Built-in profile by name, or a profile from a JSON file"""
+    if entry in BUILTIN_PROFILES:
+        return BUILTIN_PROFILES[entry]()
+    return SiteProfile.from_file(entry)
+
+
+class SiteRegistry:
+    """Enabled site profiles, looked up by name, URL or section"""
+
+    def __init__(self, profiles: List[SiteProfile], failed: List[str] = None):
+        self.failed = failed or []  # SITE_PROFILES entries that could not be loaded
+        self.profiles: Dict[str, SiteProfile] = {}
+        for profile in profiles:
+            if profile.name in self.profiles:
+                logger.warning(f"Duplicate site profile {profile.name}, keeping the first")
+                continue
+            self.profiles[profile.name] = profile
+
+    @classmethod
+    def from_config(cls, strict: bool = False) -> "SiteRegistry":
+        """Load the SITE_PROFILES, skipping broken ones unless strict"""
+        profiles = []
+        failed = []
+        for entry in Config.SITE_PROFILES:
+            try:
+                profiles.append(load_profile(entry))
+            except Exception as e:
+                if strict:
+                    raise ValueError(f"Error loading site profile {entry}: {e}") from e
+                logger.error(f"Error loading site profile {entry}: {e}")
+                failed.append(entry)
+        if not profiles:
+            profiles.append(SiteProfile.from_config())
+        return cls(profiles, failed)
+
+    def reload(self) -> List[str]:
+        """Reload the profiles from the configuration, return the names of those added, changed or removed.
+
+        Unchanged profiles are kept as they are. A profile that fails to load
+        aborts the reload and the current profiles stay in use.
+        """
+        fresh = SiteRegistry.from_config(strict=True).profiles
+        changed = [name for name, profile in fresh.items() if self.profiles.get(name) != profile]
+        changed += [name for name in self.profiles if name not in fresh]
+
+        # Swapped in one assignment, lookups never see a partial registry
+        self.failed = []
+        self.profiles = {
+            name: profile if name in changed else self.profiles[name]
+            for name, profile in fresh.items()
+        }
+        return changed
+
+    @property
+    def default(self) -> SiteProfile:
+        return next(iter(self.profiles.values()))
+
+    def get(self, name: str) -> Optional[SiteProfile]:
+        return self.profiles.get(name)
+
+    def find(self, url: str) -> Optional[SiteProfile]:
+        """Profile of the site a URL is on, if any"""
+        return next((profile for profile in self.profiles.values() if profile.owns(url)), None)
+
+    def for_url(self, url: str) -> SiteProfile:
+        return self.find(url) or self.default
+
+    def for_article(self, article: Article) -> SiteProfile:
+        return self.for_url(article.url)
+
+    def for_section(self, section: Section) -> SiteProfile:
+        site = self.get(section.custom_settings.get("site", ""))
+        return site or self.for_url(section.url)
+
+    def is_article_url(self, url: str) -> bool:
+        site = self.find(url)
+        return bool(site) and site.is_article_url(url)
+
+    def interleave(self, sections: List[Section]) -> List[Section]:
+        """Alternate sections between sites so one large site doesn't hold up the others"""
+        by_site: Dict[str, List[Section]] = {}
+        for section in sections:
+            by_site.setdefault(self.for_section(section).name, []).append(section)
+
+        ordered = []
+        queues = list(by_site.values())
+        while queues:
+            ordered.extend(queue.pop(0) for queue in queues)
+            queues = [queue for queue in queues if queue]
+        return ordered
+
+
+site_registry = SiteRegistry.from_config()
@@ -1,22 +1,68 @@
 import asyncio
+import hashlib
+import html
+import json
 import logging
-from typing import List, Dict, Optional, Tuple
+import secrets
+import time
+from collections import deque, OrderedDict
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
 import re
 from datetime import datetime
-from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile
+from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile, InputMediaPhoto
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
 from telegram.constants import ParseMode
-from telegram.error import TelegramError
-import io
-import requests
-from PIL import Image
+from telegram.error import TelegramError, BadRequest
+from telegram.request import HTTPXRequest
 from config import Config
-from database import Database, Article
+from database import Database, Article, ArticleRender, OutboxItem, OUTBOX_SENDING, OUTBOX_SENT
 from telegraph_manager import TelegraphManager
+from message_splitter import split_message, utf16_len
+from webhook_server import WebhookServer
+from metrics import TELEGRAM_REQUEST_SECONDS, record_cache_lookup, record_error
+from tracing import tracer, profiler
+from sites import site_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Random bytes of a pending page token: "pnd_a_<page>_" plus twice this many hex
+# digits stays far below Telegram's 64-byte callback data limit for any page number
+PENDING_TOKEN_BYTES = 4
+
+# Rendered pages of the pending browser whose bulk actions stay usable
+PENDING_PAGES_KEPT = 64
+
+# /status text of the Telegraph account pool states
+TELEGRAPH_STATUS_LABELS = {
+    "ready": "🟢 متصل",
+    "lazy": "🟢 جاهز (يُنشأ الحساب مع أول صفحة)",
+    "flood_wait": "🟡 مقيد مؤقتاً",
+    "error": "🔴 تعذر إنشاء الحساب"
+}
+
+@lru_cache(maxsize=256)
+def _render_pending_card(title: str, section: str, summary: str, created_at: str) -> str:
+    """Render one article card of the /pending browser"""
+    card = f"📰 {title}\n"
+    card += f"📂 {section or '-'} | 🕐 {created_at}\n"
+    if summary:
+        card += summary[:150] + ("..." if len(summary) > 150 else "") + "\n"
+    return card
+
+class TimedRequest(HTTPXRequest):
+    """Bot API transport recording the latency and errors of every call"""
+    
+    async def post(self, url: str, *args, **kwargs):
+        method = url.rsplit('/', 1)[-1]
+        try:
+            with TELEGRAM_REQUEST_SECONDS.time(method=method):
+                return await super().post(url, *args, **kwargs)
+        except Exception as e:
+            record_error("telegram", e)
+            raise
+
 class TelegramPublisher:
     """Telegram bot for publishing articles"""
     
@@ -25,13 +71,28 @@ class TelegramPublisher:
         self.telegraph_manager = telegraph_manager
         self.application = None
         self.bot = None
+        self.webhook_server = None
+        self._stopped = asyncio.Event()
+        self._ready = asyncio.Event()
+        self._publishing = set()  # Article IDs currently being published
+        self._recent_publishes = deque()  # Publish times used for burst detection
+        self._prerenders: Dict[int, asyncio.Task] = {}  # Article ID -> running pre-render
+        self._pending_pages: "OrderedDict[str, List[int]]" = OrderedDict()  # Page token -> article IDs shown
+        # Set by the bot: reloads the configuration, returns the applied changes or None on failure
+        self.reload_handler: Optional[Callable[[str], Awaitable[Optional[Dict[str, List[str]]]]]] = None
+        self._reload_task: Optional[asyncio.Task] = None
         self.setup_handlers()
     
     def setup_handlers(self):
         """Setup bot handlers"""
         # Only create application if it doesn't exist
         if not self.application:
-            self.application = Application.builder().token(Config.BOT_TOKEN).build()
+            # Updates are long-polled on a separate connection and stay out of the latency metric
+            builder = Application.builder().token(Config.BOT_TOKEN).request(TimedRequest(connection_pool_size=256))
+            if Config.TELEGRAM_API_URL:
+                api_url = Config.TELEGRAM_API_URL.rstrip('/')
+                builder = builder.base_url(f"{api_url}/bot").base_file_url(f"{api_url}/file/bot")
+            self.application = builder.build()
             
             # Get the bot instance from the application
             self.bot = self.application.bot
@@ -44,6 +105,9 @@ class TelegramPublisher:
             self.application.add_handler(CommandHandler("settings", self.settings_command))
             self.application.add_handler(CommandHandler("sections", self.sections_command))
             self.application.add_handler(CommandHandler("test", self.test_command))
+            self.application.add_handler(CommandHandler("trace", self.trace_command))
+            self.application.add_handler(CommandHandler("profile", self.profile_command))
+            self.application.add_handler(CommandHandler("reload", self.reload_command))
             
             # Callback handlers
             self.application.add_handler(CallbackQueryHandler(self.handle_callback))
@@ -69,6 +133,9 @@ class TelegramPublisher:
 /settings - إعدادات البوت
 /sections - إدارة الأقسام
 /test - اختبار النظام
+/trace - توقيت مراحل آخر المقالات
+/profile - تحليل أداء البوت
+/reload - إعادة تحميل الإعدادات
 
 البوت يعمل على مراقبة المواقع المحددة وينشر المقالات الجديدة تلقائياً.
         """
@@ -91,6 +158,9 @@ class TelegramPublisher:
 /settings - تعديل إعدادات البوت
 /sections - إدارة أقسام الموقع
 /test - اختبار النظام
+/trace [عدد] - أبطأ المقالات الأخيرة مع توقيت كل مرحلة
+/profile [ثوانٍ] - أخذ عينات من الأداء وعرض أكثر الدوال استهلاكاً
+/reload - إعادة تحميل ملف .env وملفات المواقع دون إعادة التشغيل
 
 🎛️ الميزات:
 • مراقبة المواقع كل دقيقة
@@ -114,7 +184,7 @@ class TelegramPublisher:
         
         # Get statistics
         sections = self.db.get_active_sections()
-        pending_articles = self.db.get_articles_pending_approval()
+        pending_count = self.db.count_articles_pending_approval()
         unpublished_articles = self.db.get_unpublished_articles()
         
         status_text = f"""
@@ -125,10 +195,10 @@ class TelegramPublisher:
 ⏰ فترة المراقبة: {Config.CHECK_INTERVAL} ثانية
 
 📰 الأقسام النشطة: {len(sections)}
-📝 المقالات المعلقة: {len(pending_articles)}
+📝 المقالات المعلقة: {pending_count}
 📋 المقالات غير المنشورة: {len(unpublished_articles)}
 
-🔗 Telegraph: {'🟢 متصل' if self.telegraph_manager.account_info else '🔴 غير متصل'}
+🔗 Telegraph: {TELEGRAPH_STATUS_LABELS[self.telegraph_manager.get_status()]}
         """
         
         keyboard = [
@@ -144,14 +214,93 @@ class TelegramPublisher:
         if update.effective_user.id not in Config.ADMIN_IDS:
             return
         
-        pending_articles = self.db.get_articles_pending_approval(limit=10)
+        text, reply_markup = self.render_pending_page(0)
+        await update.message.reply_text(text, reply_markup=reply_markup)
+    
+    def render_pending_page(self, page: int, notice: str = "") -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """Render one page of the pending articles browser"""
+        total = self.db.count_articles_pending_approval()
         
-        if not pending_articles:
-            await update.message.reply_text("لا توجد مقالات معلقة للموافقة.")
-            return
+        if not total:
+            return notice + "لا توجد مقالات معلقة للموافقة.", None
+        
+        page_size = Config.PENDING_PAGE_SIZE
+        pages = (total + page_size - 1) // page_size
+        page = min(max(page, 0), pages - 1)
+        articles = self.db.get_pending_article_cards(offset=page * page_size, limit=page_size)
+        
+        text = notice + f"📝 المقالات المعلقة: {total}\n\n"
+        for i, article in enumerate(articles, start=page * page_size + 1):
+            created_at = article.created_at.strftime("%Y-%m-%d %H:%M") if article.created_at else ""
+            card = _render_pending_card(article.title, article.section, article.summary, created_at)
+            text += f"{i}. {card}\n"
         
-        for article in pending_articles:
-            await self.send_article_for_approval(update.message.chat_id, article)
+        # Navigation row
+        navigation = []
+        if page > 0:
+            navigation.append(InlineKeyboardButton("◀️ السابق", callback_data=f"pnd_p_{page - 1}"))
+        navigation.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data=f"pnd_p_{page}"))
+        if page < pages - 1:
+            navigation.append(InlineKeyboardButton("التالي ▶️", callback_data=f"pnd_p_{page + 1}"))
+        
+        # Bulk actions only affect what the admin saw: the IDs stay here and the buttons carry a token,
+        # a list of IDs would not fit in the callback data
+        token = secrets.token_hex(PENDING_TOKEN_BYTES)
+        self._pending_pages[token] = [article.id for article in articles]
+        while len(self._pending_pages) > PENDING_PAGES_KEPT:
+            self._pending_pages.popitem(last=False)
+        
+        keyboard = [
+            navigation,
+            [
+                InlineKeyboardButton("✅ نشر الصفحة", callback_data=f"pnd_a_{page}_{token}"),
+                InlineKeyboardButton("❌ رفض الصفحة", callback_data=f"pnd_r_{page}_{token}")
+            ]
+        ]
+        
+        return text, InlineKeyboardMarkup(keyboard)
+    
+    async def handle_pending_callback(self, query):
+        """Handle navigation and bulk actions of the pending articles browser"""
+        try:
+            _, action, rest = query.data.split("_", 2)
+            notice = ""
+            
+            if action == "p":
+                page = int(rest)
+            else:
+                page_str, token = rest.split("_", 1)
+                page = int(page_str)
+                article_ids = self._pending_pages.pop(token, None)
+                
+                if article_ids is None:
+                    # Page rendered before a restart or pushed out by newer pages
+                    notice = "⚠️ انتهت صلاحية هذه الصفحة، راجع المقالات المعروضة الآن.\n\n"
+                elif action == "a":
+                    for article_id in article_ids:
+                        await self.wait_for_prerender(article_id)
+                    articles = [self.db.get_article_by_id(article_id) for article_id in article_ids]
+                    articles = [article for article in articles if article and not article.is_published]
+                    published = await self.publish_articles(articles)
+                    notice = f"✅ تم نشر {published} من {len(article_ids)} مقالات\n\n"
+                elif action == "r":
+                    # A running pre-render would write the article back as pending
+                    for article_id in article_ids:
+                        await self.wait_for_prerender(article_id)
+                    rejected = self.db.reject_articles(article_ids)
+                    notice = f"❌ تم رفض {rejected} مقالات\n\n"
+                    for article_id in article_ids:
+                        await self.discard_prerender(article_id)
+            
+            text, reply_markup = self.render_pending_page(page, notice)
+            await query.edit_message_text(text, reply_markup=reply_markup)
+        
+        except BadRequest as e:
+            # Pressing the current page button leaves the message unchanged
+            if "not modified" not in str(e).lower():
+                logger.error(f"Error updating pending browser: {e}")
+        except Exception as e:
+            logger.error(f"Error handling pending browser: {e}")
     
     async def settings_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /settings command"""
@@ -184,6 +333,8 @@ class TelegramPublisher:
         for section in sections:
             last_check = section.last_check.strftime("%Y-%m-%d %H:%M") if section.last_check else "لم يتم فحصه"
             sections_text += f"• {section.name}\n"
+            if len(site_registry.profiles) > 1:
+                sections_text += f"  🌐 الموقع: {site_registry.for_section(section).display_name}\n"
             sections_text += f"  📄 المقالات: {section.articles_count}\n"
             sections_text += f"  🕐 آخر فحص: {last_check}\n\n"
         
@@ -212,12 +363,118 @@ class TelegramPublisher:
         
         await self.send_article_for_approval(update.message.chat_id, test_article)
     
+    async def trace_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /trace command: timelines of the slowest recent articles"""
+        if update.effective_user.id not in Config.ADMIN_IDS:
+            return
+        
+        try:
+            limit = max(1, min(int(context.args[0]), 10)) if context.args else 3
+        except ValueError:
+            limit = 3
+        
+        traces = tracer.slowest(limit)
+        if not traces:
+            await update.message.reply_text("لا توجد مقالات متتبعة بعد.")
+            return
+        
+        text = "🧭 أبطأ المقالات الأخيرة:\n"
+        for trace in traces:
+            text += f"\n📰 {trace.title or trace.key} ({trace.duration:.1f} ث)\n{trace.format_timeline()}\n"
+        
+        for part in split_message(text, Config.MAX_MESSAGE_LENGTH):
+            await update.message.reply_text(part)
+    
+    async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /profile command: sample the running bot for N seconds"""
+        if update.effective_user.id not in Config.ADMIN_IDS:
+            return
+        
+        if profiler.running:
+            await update.message.reply_text("⏳ يوجد تحليل أداء قيد التنفيذ بالفعل.")
+            return
+        
+        try:
+            seconds = max(1, min(int(context.args[0]), Config.PROFILE_MAX_SECONDS)) if context.args else 10
+        except ValueError:
+            seconds = 10
+        
+        await update.message.reply_text(f"⏳ جاري تحليل الأداء لمدة {seconds} ثانية...")
+        
+        try:
+            # Sample from a thread so the loop keeps running the code being profiled
+            result = await asyncio.to_thread(profiler.run, seconds)
+        except Exception as e:
+            logger.error(f"Error profiling: {e}")
+            await update.message.reply_text(f"❌ فشل تحليل الأداء: {e}")
+            return
+        
+        busy = result.samples / max(result.samples + result.idle_samples, 1)
+        text = f"📈 أكثر الدوال استهلاكاً خلال {result.duration:.0f} ثانية ({result.samples} عينة، انشغال {busy:.0%}):\n\n"
+        text += "ذاتي  شامل  الدالة\n"
+        for (filename, function, line), self_share, total_share in result.top(15):
+            text += f"{self_share:5.1%} {total_share:5.1%}  {function} ({filename}:{line})\n"
+        if not result.samples:
+            text += "البوت كان خاملاً طوال فترة التحليل.\n"
+        
+        await update.message.reply_text(text)
+    
+    async def reload_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /reload command: apply the edited .env and site profiles"""
+        if update.effective_user.id not in Config.ADMIN_IDS:
+            return
+        
+        if not self.reload_handler:
+            await update.message.reply_text("❌ إعادة التحميل غير متاحة.")
+            return
+        
+        if self._reload_task and not self._reload_task.done():
+            await update.message.reply_text("⏳ إعادة التحميل جارية بالفعل.")
+            return
+        
+        # The reload waits for the running check cycle, updates are handled one at a time
+        # and every other command would wait with it
+        await update.message.reply_text("⏳ جاري إعادة تحميل الإعدادات بعد انتهاء دورة الفحص الحالية...")
+        self._reload_task = asyncio.create_task(self._run_reload(update.message))
+    
+    async def _run_reload(self, message):
+        """Reload the configuration and report the outcome to the admin who asked for it"""
+        try:
+            result = await self.reload_handler("/reload")
+        except Exception as e:
+            logger.error(f"Error reloading configuration: {e}")
+            result = None
+        
+        if result is None:
+            await message.reply_text("❌ فشلت إعادة التحميل، الإعدادات الحالية ما زالت مستخدمة. راجع السجل.")
+            return
+        
+        if not any(result.values()):
+            await message.reply_text("ℹ️ لا توجد تغييرات في الإعدادات.")
+            return
+        
+        text = "✅ تمت إعادة تحميل الإعدادات.\n"
+        if result["applied"]:
+            text += "\n🔄 الإعدادات المحدثة:\n" + "\n".join(f"• {name}" for name in result["applied"]) + "\n"
+        if result["sites"]:
+            text += "\n🌐 المواقع المحدثة:\n" + "\n".join(f"• {name}" for name in result["sites"]) + "\n"
+        if result["restart"]:
+            text += "\n⚠️ تتطلب إعادة التشغيل:\n" + "\n".join(f"• {name}" for name in result["restart"]) + "\n"
+        
+        await message.reply_text(text)
+    
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle callback queries"""
         query = update.callback_query
         await query.answer()
         
-        if query.data.startswith("approve_"):
+        if query.data.startswith("pnd_"):
+            await self.handle_pending_callback(query)
+        
+        elif query.data.startswith("obx_"):
+            await self.handle_outbox_callback(query)
+        
+        elif query.data.startswith("approve_"):
             article_id = int(query.data.split("_")[1])
             await self.approve_article(query, article_id)
         
@@ -248,24 +505,326 @@ class TelegramPublisher:
         pass
     
     async def publish_article(self, article: Article) -> bool:
-        """Publish article to Telegram channel"""
+        """Publish article to Telegram channel through the publish outbox"""
         try:
-            if Config.ENABLE_TEXT_SHORTENING:
-                # Publish shortened version with Telegraph link
-                return await self.publish_shortened_article(article)
+            if article.id is None:
+                return await self._publish_now(article)
+            
+            item = self.db.enqueue_publish(article.id)
+            return await self.process_outbox_item(item, article)
+        
+        except Exception as e:
+            logger.error(f"Error publishing article: {e}")
+            return False
+    
+    async def publish_articles(self, articles: List[Article]) -> int:
+        """Publish a batch of new articles, grouping bursts into digests"""
+        now = time.monotonic()
+        while self._recent_publishes and now - self._recent_publishes[0] > Config.DIGEST_WINDOW:
+            self._recent_publishes.popleft()
+        
+        # Important articles always go out individually
+        important = []
+        regular = []
+        for article in articles:
+            if site_registry.for_article(article).is_important(article):
+                important.append(article)
             else:
-                # Publish full article
-                return await self.publish_full_article(article)
+                regular.append(article)
+        
+        burst = len(self._recent_publishes) + len(articles) > Config.DIGEST_BURST_THRESHOLD
+        if not Config.DIGEST_MODE or not burst or len(regular) < 2:
+            important, regular = articles, []
+        
+        published = 0
+        for article in important:
+            if await self.publish_article(article):
+                published += 1
+                self._recent_publishes.append(time.monotonic())
+        
+        for i in range(0, len(regular), Config.DIGEST_MAX_ITEMS):
+            chunk = regular[i:i + Config.DIGEST_MAX_ITEMS]
+            count = await self.publish_digest(chunk)
+            published += count
+            self._recent_publishes.extend([time.monotonic()] * count)
+        
+        return published
+    
+    async def publish_digest(self, articles: List[Article]) -> int:
+        """Publish several articles as one digest post (optionally with an album)"""
+        try:
+            entries = []
+            for article in articles:
+                if article.id is not None:
+                    item = self.db.enqueue_publish(article.id)
+                    if item and item.state == OUTBOX_SENT:
+                        continue
+                    # Left to the admin confirming the interrupted send, like single publishes
+                    if item and item.state == OUTBOX_SENDING:
+                        logger.info(f"Article {article.id} has an interrupted send awaiting confirmation")
+                        continue
+                    if article.id in self._publishing:
+                        logger.info(f"Article {article.id} is already being published")
+                        continue
+                    if item and item.telegraph_url and not article.telegraph_url:
+                        article.telegraph_url = item.telegraph_url
+                
+                link = article.url
+                if Config.ENABLE_TEXT_SHORTENING:
+                    if not article.telegraph_url:
+                        article.telegraph_url = await self.telegraph_manager.create_article_page(article) or ""
+                        if article.telegraph_url:
+                            self.db.update_article(article)
+                            self.db.mark_outbox_telegraph_done(article.id, article.telegraph_url)
+                    link = article.telegraph_url or article.url
+                
+                entries.append((article, link))
+            
+            if not entries:
+                return 0
+            
+            # Album of the available images, skipping those a failed attempt already sent
+            if Config.DIGEST_ALBUM:
+                pictured = []
+                for article, _ in entries:
+                    if article.id is not None and self.db.has_published_message(article.id, "digest_album"):
+                        continue
+                    # The processed copy made while the article awaited approval
+                    render = self._get_render(article)
+                    media_url = (render.media_url if render else "") or article.image_url
+                    if media_url:
+                        pictured.append((article, media_url))
+                pictured = pictured[:10]
+                if len(pictured) >= 2:
+                    try:
+                        album = await self.bot.send_media_group(
+                            chat_id=Config.CHAT_ID,
+                            media=[InputMediaPhoto(media=media_url) for _, media_url in pictured]
+                        )
+                        for (article, _), message in zip(pictured, album):
+                            self.db.add_published_message(article.id, message.message_id, Config.CHAT_ID, "digest_album")
+                    except Exception as e:
+                        logger.error(f"Error sending digest album: {e}")
+            
+            # Digest text with one link per article, sent as HTML so titles need no Markdown escaping
+            lines = [(None, f"🗞️ موجز الأخبار ({len(entries)})")]
+            for article, link in entries:
+                lines.append((article, f'• <a href="{html.escape(link)}">{html.escape(article.title)}</a>'))
+            if Config.CUSTOM_FOOTER:
+                lines.append((None, html.escape(Config.CUSTOM_FOOTER)))
+            
+            # Articles are marked sent with the part carrying their link, a failed part
+            # leaves only its own articles and the ones after it to be retried
+            published = 0
+            for part_articles, part in self._pack_digest_lines(lines):
+                for article in part_articles:
+                    self._mark_sending(article)
+                try:
+                    message = await self.bot.send_message(
+                        chat_id=Config.CHAT_ID,
+                        text=part,
+                        parse_mode=ParseMode.HTML,
+                        disable_web_page_preview=True
+                    )
+                except Exception as e:
+                    logger.error(f"Error sending digest part, {len(entries) - published} articles left queued: {e}")
+                    for article in part_articles:
+                        if article.id is not None:
+                            self.db.requeue_outbox_item(article.id)
+                    break
+                for article in part_articles:
+                    article.telegram_message_id = message.message_id
+                    article.is_published = True
+                    self.db.update_article(article)
+                    if article.id is not None:
+                        self.db.mark_outbox_sent(article.id, message.message_id)
+                        self.db.add_published_message(article.id, message.message_id, Config.CHAT_ID, "digest")
+                        self.db.delete_article_render(article.id)
+                    published += 1
+            
+            logger.info(f"Published digest of {published} articles")
+            return published
+        
+        except Exception as e:
+            logger.error(f"Error publishing digest: {e}")
+            return 0
+    
+    def _pack_digest_lines(self, lines: List[Tuple[Optional[Article], str]]) -> List[Tuple[List[Article], str]]:
+        """Pack digest lines into messages without splitting a line, with the articles each one links"""
+        parts = []
+        articles, text = [], ""
+        for article, line in lines:
+            candidate = f"{text}\n\n{line}" if text else line
+            if text and utf16_len(candidate) > Config.MAX_MESSAGE_LENGTH:
+                parts.append((articles, text))
+                articles, candidate = [], line
+            text = candidate
+            if article is not None:
+                articles.append(article)
+        if text:
+            parts.append((articles, text))
+        return parts
+    
+    async def process_outbox_item(self, item: OutboxItem, article: Article = None) -> bool:
+        """Publish an outbox entry, resuming from its last completed step"""
+        if item.state == OUTBOX_SENT:
+            return True
+        
+        if item.article_id in self._publishing:
+            logger.info(f"Article {item.article_id} is already being published")
+            return False
+        
+        article = article or self.db.get_article_by_id(item.article_id)
+        if not article:
+            self.db.record_outbox_failure(item.article_id, "Article not found", 0, 0)
+            return False
+        
+        # Sent before the outbox was updated
+        if article.is_published:
+            self.db.mark_outbox_sent(article.id, article.telegram_message_id)
+            return True
+        
+        # The channel may already have it, an admin decides whether to send it again
+        if item.state == OUTBOX_SENDING:
+            logger.info(f"Article {article.id} has an interrupted send awaiting confirmation")
+            return False
+        
+        # Reuse the Telegraph page from a previous attempt
+        if item.telegraph_url and not article.telegraph_url:
+            article.telegraph_url = item.telegraph_url
+        
+        self._publishing.add(article.id)
+        try:
+            success = await self._publish_now(article)
+        finally:
+            self._publishing.discard(article.id)
+        
+        if not success:
+            if Config.ENABLE_TEXT_SHORTENING and not article.telegraph_url:
+                error = "Telegraph page creation failed"
+            else:
+                error = "Telegram send failed"
+            
+            delay = min(
+                Config.OUTBOX_RETRY_BASE_DELAY * (2 ** item.attempts),
+                Config.OUTBOX_RETRY_MAX_DELAY
+            )
+            self.db.record_outbox_failure(article.id, error, delay, Config.OUTBOX_MAX_ATTEMPTS)
+            logger.warning(f"{error} for article {article.id} (attempt {item.attempts + 1}), retrying in {delay}s")
+        
+        return success
+    
+    async def process_due_outbox(self, due_only: bool = True) -> int:
+        """Publish queued outbox entries whose retry time has come"""
+        try:
+            await self.wait_until_ready()
+        except asyncio.TimeoutError:
+            logger.warning("Telegram bot is not ready, publish outbox left for the next cycle")
+            return 0
+        
+        published = 0
+        for item in self.db.get_pending_outbox_items(due_only=due_only):
+            try:
+                if await self.process_outbox_item(item):
+                    published += 1
+            except Exception as e:
+                logger.error(f"Error processing outbox item {item.id}: {e}")
+        
+        return published
+    
+    async def wait_until_ready(self, timeout: float = None):
+        """Wait until the bot is initialized and able to send, raise asyncio.TimeoutError if it doesn't start"""
+        await asyncio.wait_for(self._ready.wait(), timeout or Config.BOT_READY_TIMEOUT)
+    
+    async def recover_outbox(self) -> int:
+        """Resume every unfinished outbox entry after a restart"""
+        await self.wait_until_ready()
+        
+        # A crash between the send and its record leaves no way to tell whether the post
+        # went out (bots cannot read the channel history), the admins decide instead
+        for item in self.db.get_interrupted_outbox_items():
+            await self.notify_interrupted_publish(item)
+        
+        published = await self.process_due_outbox(due_only=False)
+        if published:
+            logger.info(f"Recovered {published} articles from the publish outbox")
+        return published
+    
+    async def notify_interrupted_publish(self, item: OutboxItem):
+        """Ask the admins whether an interrupted send reached the channel"""
+        article = self.db.get_article_by_id(item.article_id)
+        if not article:
+            return
+        
+        started_at = item.updated_at.strftime("%Y-%m-%d %H:%M") if item.updated_at else ""
+        message = (
+            f"⚠️ توقف البوت أثناء نشر هذا المقال ({started_at}) وقد يكون قد نُشر في القناة:\n\n"
+            f"📰 {article.title}\n🔗 {article.url}\n\n"
+            "تحقق من القناة ثم اختر:"
+        )
+        keyboard = [[
+            InlineKeyboardButton("✅ منشور بالفعل", callback_data=f"obx_s_{article.id}"),
+            InlineKeyboardButton("🔁 إعادة النشر", callback_data=f"obx_r_{article.id}")
+        ]]
+        await self.notify_admins(message, InlineKeyboardMarkup(keyboard))
+    
+    async def handle_outbox_callback(self, query):
+        """Handle the admins' answer about an interrupted send"""
+        try:
+            if query.from_user.id not in Config.ADMIN_IDS:
+                return
+            
+            _, action, article_id = query.data.split("_", 2)
+            article_id = int(article_id)
+            item = self.db.get_outbox_item(article_id)
+            if not item or item.state != OUTBOX_SENDING:
+                await query.edit_message_text("ℹ️ تمت معالجة هذا المقال بالفعل.")
+                return
+            
+            if action == "s":
+                article = self.db.get_article_by_id(article_id)
+                if article:
+                    article.is_published = True
+                    self.db.update_article(article)
+                self.db.mark_outbox_sent(article_id, None)
+                self.db.delete_article_render(article_id)
+                await query.edit_message_text("✅ تم تسجيل المقال كمنشور.")
+            elif action == "r":
+                self.db.requeue_outbox_item(article_id)
+                published = await self.process_due_outbox()
+                await query.edit_message_text(
+                    "🔁 تمت إعادة نشر المقال." if published else "🔁 أعيد المقال إلى قائمة النشر."
+                )
         
         except Exception as e:
+            logger.error(f"Error handling outbox callback: {e}")
+    
+    def _mark_sending(self, article: Article):
+        """Record that the Telegram send of an article is starting"""
+        if article.id is not None:
+            self.db.mark_outbox_sending(article.id)
+    
+    async def _publish_now(self, article: Article) -> bool:
+        """Publish article using the configured publishing mode"""
+        try:
+            with tracer.span(article.url, "send"):
+                if Config.ENABLE_TEXT_SHORTENING:
+                    # Publish shortened version with Telegraph link
+                    return await self.publish_shortened_article(article)
+                else:
+                    # Publish full article
+                    return await self.publish_full_article(article)
+        
+        except Exception as e:
+            record_error("publish", e)
             logger.error(f"Error publishing article: {e}")
             return False
     
     async def publish_shortened_article(self, article: Article) -> bool:
         """Publish shortened article with Telegraph link"""
         try:
-            # Create Telegraph page
-            telegraph_url = await self.telegraph_manager.create_article_page(article)
+            # Create Telegraph page unless a previous attempt already did
+            telegraph_url = article.telegraph_url or await self.telegraph_manager.create_article_page(article)
             
             if not telegraph_url:
                 logger.error("Failed to create Telegraph page")
@@ -274,38 +833,26 @@ class TelegramPublisher:
             # Update article with Telegraph URL
             article.telegraph_url = telegraph_url
             self.db.update_article(article)
+            self.db.mark_outbox_telegraph_done(article.id, telegraph_url)
             
-            # Prepare message
-            message_text = f"📰 {article.title}\n\n"
-            
-            if article.summary:
-                message_text += f"{article.summary}\n\n"
-            
-            message_text += "...تكملة المقال 👈"
-            
-            # Add footer
-            if Config.CUSTOM_FOOTER:
-                message_text += f"\n\n{Config.CUSTOM_FOOTER}"
-            
-            # Create keyboard
-            keyboard = [
-                [InlineKeyboardButton("📖 تكملة المقال", url=telegraph_url)],
-                [InlineKeyboardButton("🔗 المصدر الأصلي", url=article.url)]
-            ]
-            
-            if article.tags:
-                share_text = f"{article.title}\n\n{article.summary}\n\n{article.url}"
-                share_url = f"https://t.me/share/url?url={article.url}&text={share_text}"
-                keyboard.append([InlineKeyboardButton("📤 مشاركة", url=share_url)])
+            # Prepare message, reusing the one rendered while awaiting approval
+            render = self._get_render(article, "shortened")
+            if render:
+                message_text = render.parts[0]
+                reply_markup = InlineKeyboardMarkup.de_json(render.reply_markup, self.bot)
+                photo = render.media_url or article.image_url
+            else:
+                message_text, reply_markup = self._build_shortened_message(article)
+                photo = article.image_url
             
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            self._mark_sending(article)
             
-            # Send image if available
-            if article.image_url:
+            # Send image if available and the text fits in a caption
+            if photo and self.fits_caption(message_text):
                 try:
                     message = await self.bot.send_photo(
                         chat_id=Config.CHAT_ID,
-                        photo=article.image_url,
+                        photo=photo,
                         caption=message_text,
                         reply_markup=reply_markup,
                         parse_mode=ParseMode.MARKDOWN
@@ -337,6 +884,9 @@ class TelegramPublisher:
             article.telegram_message_id = message.message_id
             article.is_published = True
             self.db.update_article(article)
+            self.db.mark_outbox_sent(article.id, message.message_id)
+            if render:
+                self.db.delete_article_render(article.id)
             
             logger.info(f"Published shortened article: {article.title}")
             return True
@@ -345,39 +895,82 @@ class TelegramPublisher:
             logger.error(f"Error publishing shortened article: {e}")
             return False
     
+    def _build_shortened_message(self, article: Article) -> Tuple[str, InlineKeyboardMarkup]:
+        """Build the text and keyboard of a shortened article message"""
+        site = site_registry.for_article(article)
+        emoji = site.get_section_settings(article.section).get("emoji", "📰")
+        message_text = f"{emoji} {article.title}\n\n"
+        
+        if article.summary:
+            message_text += f"{article.summary}\n\n"
+        
+        message_text += "...تكملة المقال 👈"
+        
+        # Add footer
+        if site.message_footer:
+            message_text += f"\n\n{site.message_footer}"
+        
+        # Create keyboard
+        keyboard = [
+            [InlineKeyboardButton("📖 تكملة المقال", url=article.telegraph_url)],
+            [InlineKeyboardButton("🔗 المصدر الأصلي", url=article.url)]
+        ]
+        
+        if article.tags:
+            share_text = f"{article.title}\n\n{article.summary}\n\n{article.url}"
+            share_url = f"https://t.me/share/url?url={article.url}&text={share_text}"
+            keyboard.append([InlineKeyboardButton("📤 مشاركة", url=share_url)])
+        
+        return message_text, InlineKeyboardMarkup(keyboard)
+    
+    def _build_full_message_parts(self, article: Article) -> List[str]:
+        """Build the message parts of a full article"""
+        content = article.content
+        site = site_registry.for_article(article)
+        
+        # Add header
+        if site.message_header:
+            content = f"{site.message_header}\n\n{content}"
+        
+        # Add footer
+        if site.message_footer:
+            content = f"{content}\n\n{site.message_footer}"
+        
+        # Add source link
+        content += f"\n\n🔗 المصدر: {article.url}"
+        
+        # Split content if too long, the first part becomes the photo caption
+        first_max_length = Config.MAX_CAPTION_LENGTH if article.image_url else None
+        return self.split_long_message(content, first_max_length=first_max_length)
+    
     async def publish_full_article(self, article: Article) -> bool:
         """Publish full article to Telegram"""
         try:
-            # Prepare content
-            content = article.content
-            
-            # Add header
-            if Config.CUSTOM_HEADER:
-                content = f"{Config.CUSTOM_HEADER}\n\n{content}"
-            
-            # Add footer
-            if Config.CUSTOM_FOOTER:
-                content = f"{content}\n\n{Config.CUSTOM_FOOTER}"
-            
-            # Add source link
-            content += f"\n\n🔗 المصدر: {article.url}"
-            
-            # Split content if too long
-            message_parts = self.split_long_message(content)
+            # Prepare content, reusing the parts rendered while awaiting approval
+            render = self._get_render(article, "full")
+            if render:
+                message_parts = render.parts
+                photo = render.media_url or article.image_url
+            else:
+                message_parts = self._build_full_message_parts(article)
+                photo = article.image_url
             
             message_ids = []
+            message_types = []
             
+            self._mark_sending(article)
             for i, part in enumerate(message_parts):
-                if i == 0 and article.image_url:
+                if i == 0 and photo:
                     # Send first part with image
                     try:
                         message = await self.bot.send_photo(
                             chat_id=Config.CHAT_ID,
-                            photo=article.image_url,
+                            photo=photo,
                             caption=part,
                             parse_mode=ParseMode.MARKDOWN
                         )
                         message_ids.append(message.message_id)
+                        message_types.append("photo")
                     except Exception as e:
                         logger.error(f"Error sending photo: {e}")
                         message = await self.bot.send_message(
@@ -386,6 +979,7 @@ class TelegramPublisher:
                             parse_mode=ParseMode.MARKDOWN
                         )
                         message_ids.append(message.message_id)
+                        message_types.append("text")
                 else:
                     # Send text parts
                     message = await self.bot.send_message(
@@ -395,16 +989,20 @@ class TelegramPublisher:
                         reply_to_message_id=message_ids[0] if message_ids else None
                     )
                     message_ids.append(message.message_id)
+                    message_types.append("text")
             
             # Update article status
             article.telegram_message_id = message_ids[0] if message_ids else None
             article.is_published = True
             self.db.update_article(article)
+            self.db.mark_outbox_sent(article.id, article.telegram_message_id)
+            if render:
+                self.db.delete_article_render(article.id)
             
             # Record all published messages
-            for msg_id in message_ids:
+            for msg_id, message_type in zip(message_ids, message_types):
                 self.db.add_published_message(
-                    article.id, msg_id, Config.CHAT_ID, "text"
+                    article.id, msg_id, Config.CHAT_ID, message_type
                 )
             
             logger.info(f"Published full article: {article.title}")
@@ -414,46 +1012,249 @@ class TelegramPublisher:
             logger.error(f"Error publishing full article: {e}")
             return False
     
-    def split_long_message(self, text: str, max_length: int = None) -> List[str]:
-        """Split long message into parts"""
-        if max_length is None:
-            max_length = Config.MAX_MESSAGE_LENGTH
+    def _get_render(self, article: Article, mode: str = None) -> Optional[ArticleRender]:
+        """Get the pre-rendered message of an article if it matches the publishing mode and settings"""
+        if article.id is None:
+            return None
+        render = self.db.get_article_render(article.id)
+        hit = bool(
+            render and render.parts and (mode is None or render.mode == mode)
+            and render.fingerprint == self._render_fingerprint(article)
+        )
+        record_cache_lookup("article_render", hit)
+        return render if hit else None
+    
+    def _render_fingerprint(self, article: Article) -> str:
+        """Hash of the settings a pre-rendered message and its Telegraph page are built from"""
+        site = site_registry.for_article(article)
+        settings = [
+            site.name, site.message_header, site.message_footer, site.author, site.author_url,
+            site.get_section_settings(article.section), Config.ENABLE_TEXT_SHORTENING,
+            Config.MAX_MESSAGE_LENGTH, Config.MAX_CAPTION_LENGTH, Config.TELEGRAPH_PAGE_MAX_BYTES
+        ]
+        encoded = json.dumps(settings, ensure_ascii=False, sort_keys=True, default=str).encode()
+        return hashlib.sha1(encoded).hexdigest()[:16]
+    
+    async def refresh_stale_renders(self) -> int:
+        """Render again the articles awaiting approval whose settings changed, return their number"""
+        refreshed = 0
+        for render in self.db.get_article_renders():
+            article = self.db.get_article_by_id(render.article_id)
+            if not article or article.is_published or not article.needs_approval:
+                self.db.delete_article_render(render.article_id)
+                continue
+            if render.fingerprint == self._render_fingerprint(article):
+                continue
+            
+            # The page carries the old header, footer and author too
+            await self.discard_prerender(article.id)
+            article.telegraph_url = ""
+            self.schedule_prerender(article)
+            refreshed += 1
         
-        if len(text) <= max_length:
-            return [text]
+        if refreshed:
+            logger.info(f"Rendering {refreshed} articles awaiting approval again after a configuration change")
+        return refreshed
+    
+    def schedule_prerender(self, article: Article):
+        """Pre-render an article awaiting approval in the background"""
+        if not Config.PRERENDER_PENDING or article.id is None or article.id in self._prerenders:
+            return
+        if self.db.get_article_render(article.id):
+            return
         
-        parts = []
-        current_part = ""
+        task = asyncio.create_task(self.prerender_article(article))
+        self._prerenders[article.id] = task
+        task.add_done_callback(lambda _: self._prerenders.pop(article.id, None))
+    
+    async def wait_for_prerender(self, article_id: int):
+        """Wait until a running pre-render of the article has finished"""
+        task = self._prerenders.get(article_id)
+        if task:
+            try:
+                await task
+            except Exception as e:
+                logger.error(f"Error waiting for pre-render of article {article_id}: {e}")
+    
+    async def prerender_article(self, article: Article) -> bool:
+        """Create the Telegraph page, message and media so approval is a single send"""
+        try:
+            if Config.ENABLE_TEXT_SHORTENING:
+                if not article.telegraph_url:
+                    telegraph_url = await self.telegraph_manager.create_article_page(article)
+                    if not telegraph_url:
+                        return False
+                    article.telegraph_url = telegraph_url
+                    self.db.update_article(article)
+                
+                message_text, reply_markup = self._build_shortened_message(article)
+                render = ArticleRender(
+                    article_id=article.id,
+                    mode="shortened",
+                    parts=[message_text],
+                    reply_markup=reply_markup.to_dict()
+                )
+            else:
+                render = ArticleRender(
+                    article_id=article.id,
+                    mode="full",
+                    parts=self._build_full_message_parts(article)
+                )
+            
+            # Processed copy of the image, hosted on Telegraph
+            if article.image_url:
+                render.media_url = await self.telegraph_manager.prepare_media(article.image_url) or ""
+            
+            render.fingerprint = self._render_fingerprint(article)
+            self.db.save_article_render(render)
+            logger.info(f"Pre-rendered article awaiting approval: {article.title}")
+            return True
         
-        # Split by paragraphs first
-        paragraphs = text.split('\n\n')
+        except Exception as e:
+            logger.error(f"Error pre-rendering article {article.id}: {e}")
+            return False
+    
+    async def discard_prerender(self, article_id: int):
+        """Clean up the speculative page and message of a rejected article"""
+        try:
+            await self.wait_for_prerender(article_id)
+            self.db.delete_article_render(article_id)
+            
+            article = self.db.get_article_by_id(article_id)
+            if article and article.telegraph_url and not article.is_published:
+                await self.telegraph_manager.discard_page(article.telegraph_url)
+                article.telegraph_url = ""
+                self.db.update_article(article)
         
-        for paragraph in paragraphs:
-            if len(current_part) + len(paragraph) + 2 <= max_length:
-                if current_part:
-                    current_part += '\n\n'
-                current_part += paragraph
+        except Exception as e:
+            logger.error(f"Error discarding pre-render of article {article_id}: {e}")
+    
+    async def propagate_source_edit(self, article: Article, fresh: Article, changed_fields: List[str]) -> bool:
+        """Push the fields that changed on the source site to Telegraph and Telegram"""
+        try:
+            changed = set(changed_fields)
+            for field in changed:
+                setattr(article, field, getattr(fresh, field))
+            if "content" in changed:
+                article.content_html = fresh.content_html
+            
+            # Shortened posts link a Telegraph page, full posts carry the content
+            if article.telegraph_url:
+                message_fields = {"title", "summary", "image_url"}
+                if changed & {"title", "content", "image_url"}:
+                    telegraph_url = await self.telegraph_manager.update_article_page(article)
+                    if not telegraph_url:
+                        logger.error(f"Failed to update Telegraph page of {article.url}")
+                        return False
+                    if telegraph_url != article.telegraph_url:
+                        # A recreated page chain must be relinked from the message
+                        article.telegraph_url = telegraph_url
+                        changed.add("telegraph_url")
+                message_fields.add("telegraph_url")
             else:
-                if current_part:
-                    parts.append(current_part)
-                    current_part = paragraph
+                message_fields = {"title", "content", "image_url"}
+            
+            if changed & message_fields:
+                await self._edit_published_message(article, changed)
+            
+            self.db.update_article(article)
+            logger.info(f"Propagated source edit of {article.title}: {', '.join(sorted(changed))}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error propagating source edit of {article.url}: {e}")
+            return False
+    
+    async def _edit_published_message(self, article: Article, changed: set):
+        """Edit the published message of an article in place"""
+        message_type = self.db.get_published_message_type(article.id, article.telegram_message_id)
+        if message_type == "digest":
+            # Digest entries only link the Telegraph page
+            return
+        if message_type != "photo" and changed <= {"image_url"}:
+            # Text messages do not show the image
+            return
+        
+        if article.telegraph_url:
+            text, reply_markup = self._build_shortened_message(article)
+            await self._edit_message(article, article.telegram_message_id, message_type, text, reply_markup, changed)
+            return
+        
+        # A full post may have been split into several messages, every one of them is edited
+        parts = self._build_full_message_parts(article)
+        messages = self.db.get_published_messages(article.id, article.telegram_message_id)
+        messages = messages or [(article.telegram_message_id, message_type)]
+        if len(parts) != len(messages):
+            # The parts no longer line up with the messages, point readers to the source instead
+            message = await self.bot.send_message(
+                chat_id=Config.CHAT_ID,
+                text=f"✏️ تم تعديل هذا الخبر في المصدر: {article.url}",
+                reply_to_message_id=article.telegram_message_id,
+                disable_web_page_preview=True
+            )
+            self.db.add_published_message(article.id, message.message_id, Config.CHAT_ID, "correction")
+            return
+        
+        for part, (message_id, part_type) in zip(parts, messages):
+            await self._edit_message(article, message_id, part_type, part, None, changed)
+    
+    async def _edit_message(self, article: Article, message_id: int, message_type: Optional[str],
+                            text: str, reply_markup: Optional[InlineKeyboardMarkup], changed: set):
+        """Edit the text or caption (and the photo when it changed) of one published message"""
+        try:
+            if message_type == "photo":
+                if not self.fits_caption(text):
+                    text = self.split_long_message(text, is_caption=True)[0]
+                if "image_url" in changed and article.image_url:
+                    await self.bot.edit_message_media(
+                        chat_id=Config.CHAT_ID,
+                        message_id=message_id,
+                        media=InputMediaPhoto(
+                            media=article.image_url, caption=text, parse_mode=ParseMode.MARKDOWN
+                        ),
+                        reply_markup=reply_markup
+                    )
                 else:
-                    # Paragraph is too long, split by sentences
-                    sentences = paragraph.split('. ')
-                    for sentence in sentences:
-                        if len(current_part) + len(sentence) + 2 <= max_length:
-                            if current_part:
-                                current_part += '. '
-                            current_part += sentence
-                        else:
-                            if current_part:
-                                parts.append(current_part)
-                            current_part = sentence
-        
-        if current_part:
-            parts.append(current_part)
+                    await self.bot.edit_message_caption(
+                        chat_id=Config.CHAT_ID,
+                        message_id=message_id,
+                        caption=text,
+                        reply_markup=reply_markup,
+                        parse_mode=ParseMode.MARKDOWN
+                    )
+            else:
+                await self.bot.edit_message_text(
+                    chat_id=Config.CHAT_ID,
+                    message_id=message_id,
+                    text=text,
+                    reply_markup=reply_markup,
+                    parse_mode=ParseMode.MARKDOWN
+                )
+        except BadRequest as e:
+            error = str(e).lower()
+            if "no text in the message" in error:
+                # Older full posts recorded their photo message as text
+                await self.bot.edit_message_caption(
+                    chat_id=Config.CHAT_ID,
+                    message_id=message_id,
+                    caption=text if self.fits_caption(text) else self.split_long_message(text, is_caption=True)[0],
+                    reply_markup=reply_markup,
+                    parse_mode=ParseMode.MARKDOWN
+                )
+            elif "not modified" not in error:
+                raise
+    
+    def split_long_message(self, text: str, max_length: int = None, is_caption: bool = False,
+                           first_max_length: int = None) -> List[str]:
+        """Split long message into parts within Telegram's UTF-16 limits"""
+        if max_length is None:
+            max_length = Config.MAX_CAPTION_LENGTH if is_caption else Config.MAX_MESSAGE_LENGTH
         
-        return parts
+        return split_message(text, max_length, first_max_length)
+    
+    def fits_caption(self, text: str) -> bool:
+        """Check whether text can be sent as a photo caption"""
+        return utf16_len(text) <= Config.MAX_CAPTION_LENGTH
     
     async def send_article_for_approval(self, chat_id: int, article: Article):
         """Send article to admin for approval"""
@@ -481,8 +1282,8 @@ class TelegramPublisher:
             
             reply_markup = InlineKeyboardMarkup(keyboard)
             
-            # Send with image if available
-            if article.image_url:
+            # Send with image if available and the preview fits in a caption
+            if article.image_url and self.fits_caption(preview_text):
                 try:
                     await self.bot.send_photo(
                         chat_id=chat_id,
@@ -512,7 +1313,8 @@ class TelegramPublisher:
     async def approve_article(self, query, article_id: int):
         """Approve article for publishing"""
         try:
-            # Get article from database
+            # Get article from database once its pre-render is ready
+            await self.wait_for_prerender(article_id)
             article = self.db.get_article_by_id(article_id)
             
             if not article:
@@ -534,8 +1336,11 @@ class TelegramPublisher:
     async def reject_article(self, query, article_id: int):
         """Reject article"""
         try:
-            # Mark article as rejected (you can implement this in the database)
+            # Remove the article from the approval queue
+            await self.wait_for_prerender(article_id)
+            self.db.reject_articles([article_id])
             await query.edit_message_text("❌ تم رفض المقال.")
+            await self.discard_prerender(article_id)
             
         except Exception as e:
             logger.error(f"Error rejecting article: {e}")
@@ -561,11 +1366,11 @@ class TelegramPublisher:
         # Implementation for section management
         await query.edit_message_text("📂 إدارة الأقسام قيد التطوير.")
     
-    async def notify_admins(self, message: str):
+    async def notify_admins(self, message: str, reply_markup: InlineKeyboardMarkup = None):
         """Notify all admins"""
         for admin_id in Config.ADMIN_IDS:
             try:
-                await self.bot.send_message(chat_id=admin_id, text=message)
+                await self.bot.send_message(chat_id=admin_id, text=message, reply_markup=reply_markup)
             except Exception as e:
                 logger.error(f"Error notifying admin {admin_id}: {e}")
     
@@ -581,15 +1386,21 @@ class TelegramPublisher:
             # Initialize the application
             await self.application.initialize()
             
-            # Start polling
             await self.application.start()
-            self.application.updater.start_polling(drop_pending_updates=True)
             
-            logger.info("Telegram bot started successfully")
+            if Config.UPDATE_MODE == "webhook":
+                # Receive updates through the embedded webhook endpoint
+                self.webhook_server = WebhookServer(self.application)
+                await self.webhook_server.start()
+            else:
+                # Start polling
+                await self.application.updater.start_polling(drop_pending_updates=True)
+            
+            logger.info(f"Telegram bot started successfully ({Config.UPDATE_MODE})")
+            self._ready.set()
             
             # Keep the bot running until stopped
-            while self.application.running:
-                await asyncio.sleep(1)
+            await self._stopped.wait()
                 
         except asyncio.CancelledError:
             logger.info("Bot polling was cancelled")
@@ -611,12 +1422,20 @@ class TelegramPublisher:
         try:
             if self.application:
                 logger.info("Stopping Telegram bot...")
+                self._stopped.set()
+                
+                # Stop the webhook endpoint if it is running
+                if self.webhook_server:
+                    try:
+                        await self.webhook_server.stop()
+                    except Exception as e:
+                        logger.warning(f"Error stopping webhook server: {e}")
                 
                 # Stop the updater if it exists and is running
                 if hasattr(self.application, 'updater') and self.application.updater:
                     try:
                         if self.application.updater.running:
-                            self.application.updater.stop()
+                            await self.application.updater.stop()
                     except Exception as e:
                         logger.warning(f"Error stopping updater: {e}")
                 
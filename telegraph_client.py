@@ -0,0 +1,170 @@
+import asyncio
+import aiohttp
+import json
+import logging
+from typing import Dict, List, Optional, Any
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TelegraphError(Exception):
+    """Error returned by the Telegraph API"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        # Telegraph reports flood control as FLOOD_WAIT_<seconds>
+        self.retry_after = 0
+        if message.startswith("FLOOD_WAIT_"):
+            try:
+                self.retry_after = int(message.rsplit("_", 1)[1])
+            except ValueError:
+                pass
+
+class AsyncTelegraph:
+    """Asynchronous Telegraph API client sharing one pooled HTTP session"""
+
+    def __init__(self, access_token: str = ""):
+        self.access_token = access_token
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it inside the running loop on first use"""
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    connector = aiohttp.TCPConnector(
+                        limit=Config.TELEGRAPH_POOL_SIZE,
+                        keepalive_timeout=Config.TELEGRAPH_KEEPALIVE,
+                        ttl_dns_cache=300
+                    )
+                    self._session = aiohttp.ClientSession(
+                        connector=connector,
+                        timeout=aiohttp.ClientTimeout(
+                            total=Config.TELEGRAPH_TIMEOUT,
+                            connect=min(10, Config.TELEGRAPH_TIMEOUT)
+                        )
+                    )
+        return self._session
+
+    async def close(self):
+        """Close the shared session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def method(self, name: str, values: Dict = None, path: str = "") -> Any:
+        """Call a Telegraph API method and return its result"""
+        values = {k: v for k, v in (values or {}).items() if v is not None}
+        if self.access_token and "access_token" not in values:
+            values["access_token"] = self.access_token
+        if "content" in values and not isinstance(values["content"], str):
+            values["content"] = json.dumps(values["content"], ensure_ascii=False, separators=(",", ":"))
+
+        session = await self.get_session()
+        url = f"{Config.TELEGRAPH_API_URL.rstrip('/')}/{name}"
+        if path:
+            url += f"/{path}"
+
+        async with session.post(url, data=values) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+
+        if not data.get("ok"):
+            raise TelegraphError(data.get("error", "Unknown Telegraph error"))
+
+        return data["result"]
+
+    async def create_account(self, short_name: str, author_name: str = None,
+                             author_url: str = None, replace_token: bool = True) -> Dict:
+        """Create a new Telegraph account"""
+        result = await self.method("createAccount", {
+            "short_name": short_name,
+            "author_name": author_name,
+            "author_url": author_url
+        })
+        if replace_token:
+            self.access_token = result.get("access_token", self.access_token)
+        return result
+
+    async def get_account_info(self, fields: List[str] = None, access_token: str = None) -> Dict:
+        """Get information about the current account"""
+        return await self.method("getAccountInfo", {
+            "access_token": access_token,
+            "fields": json.dumps(fields) if fields else None
+        })
+
+    async def create_page(self, title: str, content: List[Dict], author_name: str = None,
+                          author_url: str = None, return_content: bool = False,
+                          access_token: str = None) -> Dict:
+        """Create a new page"""
+        return await self.method("createPage", {
+            "access_token": access_token,
+            "title": title,
+            "content": content,
+            "author_name": author_name,
+            "author_url": author_url,
+            "return_content": "true" if return_content else "false"
+        })
+
+    async def edit_page(self, path: str, title: str, content: List[Dict], author_name: str = None,
+                        author_url: str = None, return_content: bool = False,
+                        access_token: str = None) -> Dict:
+        """Edit an existing page"""
+        return await self.method("editPage", {
+            "access_token": access_token,
+            "title": title,
+            "content": content,
+            "author_name": author_name,
+            "author_url": author_url,
+            "return_content": "true" if return_content else "false"
+        }, path=path)
+
+    async def get_page(self, path: str, return_content: bool = False) -> Dict:
+        """Get a page"""
+        return await self.method("getPage", {
+            "return_content": "true" if return_content else "false"
+        }, path=path)
+
+    async def get_page_list(self, offset: int = 0, limit: int = 50, access_token: str = None) -> Dict:
+        """Get the pages of the current account"""
+        return await self.method("getPageList", {
+            "access_token": access_token, "offset": offset, "limit": limit
+        })
+
+    async def get_views(self, path: str, year: int = None, month: int = None,
+                        day: int = None, hour: int = None) -> int:
+        """Get the number of views of a page"""
+        result = await self.method("getViews", {
+            "year": year, "month": month, "day": day, "hour": hour
+        }, path=path)
+        return result.get("views", 0)
+
+    async def upload_file(self, data: bytes, filename: str = "image.jpg",
+                          content_type: str = "image/jpeg") -> str:
+        """Upload a file and return its telegra.ph URL"""
+        form = aiohttp.FormData()
+        form.add_field("file", data, filename=filename, content_type=content_type)
+
+        session = await self.get_session()
+        async with session.post(Config.TELEGRAPH_UPLOAD_URL, data=form) as response:
+            response.raise_for_status()
+            result = await response.json(content_type=None)
+
+        if isinstance(result, dict) and "error" in result:
+            raise TelegraphError(result["error"])
+
+        src = result[0]["src"]
+        if src.startswith("/"):
+            base = Config.TELEGRAPH_UPLOAD_URL.rsplit("/upload", 1)[0]
+            return base + src
+        return src
+
+    async def download(self, url: str) -> Optional[bytes]:
+        """Download a file through the shared session"""
+        session = await self.get_session()
+        async with session.get(url) as response:
+            if response.status != 200:
+                return None
+            return await response.read()
@@ -1,113 +1,406 @@
 import asyncio
-import aiohttp
-import requests
-from telegraph import Telegraph
-from typing import Dict, List, Optional, Any
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
 import json
 import re
 from datetime import datetime
-from PIL import Image
-import io
 import logging
 from urllib.parse import urljoin, urlparse
 from config import Config
-from database import Article
+from database import Database, Article
+from telegraph_client import AsyncTelegraph, TelegraphError
+from image_processor import ImageProcessor
+from metrics import TELEGRAPH_PAGE_SECONDS, TELEGRAPH_UPLOAD_SECONDS, record_cache_lookup, record_error
+from tracing import tracer
+from sites import site_registry
+from html_to_telegraph import html_to_nodes, nodes_to_text, iter_image_nodes, remove_nodes
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# bot_settings key holding the account pool tokens
+TOKENS_SETTING = "telegraph_tokens"
+
+# Attempts at adding the navigation to a chained page
+NAVIGATION_EDIT_ATTEMPTS = 3
+
+# Navigation link to the next page of a chain, followed to find the whole chain
+NEXT_PAGE_LABEL = 'الصفحة التالية ▶️'
+MAX_CHAIN_PAGES = 100
+
+# Entries of the in-memory page maps, least recently used dropped first. A dropped
+# owner costs an extra edit attempt, a dropped chain is walked again.
+PAGE_OWNERS_KEPT = 10000
+CHAINS_KEPT = 2000
+
+# Content of a page that will not be published
+DISCARDED_TITLE = "محذوف"
+DISCARDED_CONTENT = [{'tag': 'p', 'children': ['تمت إزالة هذه الصفحة.']}]
+
+@dataclass
+class TelegraphAccount:
+    """Telegraph account in the pool"""
+    access_token: str
+    blocked_until: float = 0.0  # Flood control, monotonic time
+
 class TelegraphManager:
     """Telegraph page creation and management"""
     
-    def __init__(self):
-        self.telegraph = Telegraph()
+    def __init__(self, db: Database = None):
+        self.db = db
+        self.client = AsyncTelegraph()
+        self.image_processor = ImageProcessor()
+        self.accounts: List[TelegraphAccount] = []
         self.account_info = None
+        self._next_account = 0
+        self._accounts_lock = asyncio.Lock()
+        self._page_owners: "OrderedDict[str, str]" = OrderedDict()  # Page path -> access token
+        self._account_error: Optional[str] = None  # Last failure creating a pool account
+        self._chains: "OrderedDict[str, List[str]]" = OrderedDict()  # First page path -> paths of the whole chain
+        self._upload_semaphore = asyncio.Semaphore(Config.TELEGRAPH_UPLOAD_CONCURRENCY)
         self.init_account()
     
     def init_account(self):
-        """Initialize Telegraph account"""
+        """Load the account pool from the configured and persisted tokens (no network call)"""
         try:
-            if Config.TELEGRAPH_TOKEN:
-                # Use existing token
-                self.telegraph.create_account(
-                    short_name=Config.TELEGRAPH_AUTHOR,
-                    author_name=Config.TELEGRAPH_AUTHOR,
-                    author_url=Config.TELEGRAPH_AUTHOR_URL
-                )
-                self.account_info = self.telegraph.get_account_info()
-            else:
-                # Create new account
-                self.account_info = self.telegraph.create_account(
-                    short_name=Config.TELEGRAPH_AUTHOR,
-                    author_name=Config.TELEGRAPH_AUTHOR,
-                    author_url=Config.TELEGRAPH_AUTHOR_URL
-                )
-                logger.info(f"Created new Telegraph account: {self.account_info}")
+            tokens = [token.strip() for token in Config.TELEGRAPH_TOKEN.split(',') if token.strip()]
+            
+            if self.db:
+                stored = self.db.get_bot_setting(TOKENS_SETTING)
+                if stored:
+                    tokens += [token for token in json.loads(stored) if token not in tokens]
+            
+            self.accounts = [TelegraphAccount(access_token=token) for token in tokens]
+            self._update_account_info()
             
         except Exception as e:
             logger.error(f"Error initializing Telegraph account: {e}")
             self.account_info = None
     
+    async def ensure_accounts(self) -> bool:
+        """Create missing pool accounts on first use and persist their tokens"""
+        if len(self.accounts) >= Config.TELEGRAPH_ACCOUNT_POOL_SIZE:
+            return True
+        
+        async with self._accounts_lock:
+            created = False
+            while len(self.accounts) < Config.TELEGRAPH_ACCOUNT_POOL_SIZE:
+                try:
+                    result = await self.client.create_account(
+                        short_name=Config.TELEGRAPH_AUTHOR[:32],
+                        author_name=Config.TELEGRAPH_AUTHOR,
+                        author_url=Config.TELEGRAPH_AUTHOR_URL,
+                        replace_token=False
+                    )
+                except Exception as e:
+                    logger.error(f"Error creating Telegraph account: {e}")
+                    self._account_error = str(e)
+                    break
+                
+                self._account_error = None
+                self.accounts.append(TelegraphAccount(access_token=result['access_token']))
+                created = True
+                logger.info(f"Created Telegraph account {len(self.accounts)}/{Config.TELEGRAPH_ACCOUNT_POOL_SIZE}")
+            
+            if created:
+                if self.db:
+                    self.db.set_bot_setting(
+                        TOKENS_SETTING,
+                        json.dumps([account.access_token for account in self.accounts]),
+                        "Telegraph account pool tokens"
+                    )
+                self._update_account_info()
+        
+        return bool(self.accounts)
+    
+    def _update_account_info(self):
+        """Summarize the account pool"""
+        if not self.accounts:
+            self.account_info = None
+            return
+        
+        self.account_info = {
+            'short_name': Config.TELEGRAPH_AUTHOR[:32],
+            'author_name': Config.TELEGRAPH_AUTHOR,
+            'author_url': Config.TELEGRAPH_AUTHOR_URL,
+            'accounts': len(self.accounts)
+        }
+    
+    async def _acquire_account(self) -> TelegraphAccount:
+        """Pick the next account round-robin, skipping accounts under flood control"""
+        while True:
+            now = time.monotonic()
+            for _ in range(len(self.accounts)):
+                account = self.accounts[self._next_account % len(self.accounts)]
+                self._next_account += 1
+                if account.blocked_until <= now:
+                    return account
+            
+            wait = min(account.blocked_until for account in self.accounts) - now
+            if wait > Config.TELEGRAPH_MAX_FLOOD_WAIT:
+                raise TelegraphError(f"FLOOD_WAIT_{int(wait)}")
+            await asyncio.sleep(wait)
+    
+    async def _call(self, func, *args, account: TelegraphAccount = None, **kwargs) -> Tuple[TelegraphAccount, Any]:
+        """Call an API method with a pool account, moving to another account on flood control"""
+        attempts = 1 if account else max(len(self.accounts), 1)
+        
+        for attempt in range(attempts):
+            current = account or await self._acquire_account()
+            try:
+                return current, await func(*args, access_token=current.access_token, **kwargs)
+            except TelegraphError as e:
+                if not e.retry_after or attempt == attempts - 1:
+                    raise
+                current.blocked_until = time.monotonic() + e.retry_after
+                logger.warning(f"Telegraph account under flood control for {e.retry_after}s")
+    
+    async def close(self):
+        """Close the pooled HTTP session and the image worker pool"""
+        await self.client.close()
+        self.image_processor.shutdown()
+    
     async def create_article_page(self, article: Article) -> Optional[str]:
-        """Create a Telegraph page for an article"""
+        """Create a Telegraph page for an article, chaining pages for long articles"""
         try:
-            if not self.account_info:
+            if not await self.ensure_accounts():
                 logger.error("Telegraph account not initialized")
                 return None
             
-            # Prepare content for Telegraph
+            started_at = time.time()
+            started = time.perf_counter()
+            
+            # Prepare content for Telegraph and split it within the page size budget
             content = await self._prepare_telegraph_content(article)
+            pages = self._split_into_pages(content)
             
-            # Create the page
-            response = self.telegraph.create_page(
-                title=article.title,
-                content=content,
-                author_name=article.author or Config.TELEGRAPH_AUTHOR,
-                author_url=Config.TELEGRAPH_AUTHOR_URL,
-                return_content=True
-            )
+            author_name, author_url = self._page_author(article)
+            titles = self._page_titles(article, len(pages))
             
-            if response and 'url' in response:
-                telegraph_url = response['url']
-                logger.info(f"Created Telegraph page: {telegraph_url}")
-                return telegraph_url
+            # Create all pages in parallel, spread over the account pool
+            results = await asyncio.gather(*[
+                self._call(
+                    self.client.create_page,
+                    title=titles[i],
+                    content=page,
+                    author_name=author_name,
+                    author_url=author_url
+                )
+                for i, page in enumerate(pages)
+            ], return_exceptions=True)
             
-            return None
+            created = [
+                result for result in results
+                if not isinstance(result, BaseException) and result[1] and 'url' in result[1]
+            ]
+            for account, response in created:
+                self._remember(self._page_owners, response['path'], account.access_token, PAGE_OWNERS_KEPT)
+            
+            # A chain with a missing page is never published, blank the pages already created
+            if len(created) < len(pages):
+                errors = [result for result in results if isinstance(result, BaseException)]
+                logger.error(f"Created {len(created)} of {len(pages)} Telegraph pages: {errors[:1]}")
+                await self._discard_paths([response['path'] for _, response in created])
+                return None
+            
+            accounts = [account for account, _ in results]
+            responses = [response for _, response in results]
+            
+            # Link the pages once their paths are known, each with its owning account
+            if len(pages) > 1:
+                linked = await self._link_pages(pages, titles, responses, accounts, author_name, author_url)
+                if not linked:
+                    await self._discard_paths([response['path'] for response in responses])
+                    return None
+            self._remember(self._chains, responses[0]['path'], [response['path'] for response in responses], CHAINS_KEPT)
+            
+            telegraph_url = responses[0]['url']
+            duration = time.perf_counter() - started
+            TELEGRAPH_PAGE_SECONDS.observe(duration)
+            tracer.record(article.url, "telegraph.page", started_at, duration)
+            logger.info(f"Created Telegraph page: {telegraph_url} ({len(pages)} pages)")
+            return telegraph_url
             
         except Exception as e:
+            record_error("telegraph", e)
             logger.error(f"Error creating Telegraph page: {e}")
             return None
     
+    def _page_author(self, article: Article) -> Tuple[str, str]:
+        """Author name and URL the pages of an article are signed with"""
+        site = site_registry.for_article(article)
+        return article.author or site.author, site.author_url
+    
+    def _page_titles(self, article: Article, page_count: int) -> List[str]:
+        title = article.title[:200]
+        return [title] + [f"{title} ({i}/{page_count})" for i in range(2, page_count + 1)]
+    
+    async def _link_pages(self, pages: List[List[Dict]], titles: List[str], responses: List[Dict],
+                          accounts: List[TelegraphAccount], author_name: str, author_url: str) -> bool:
+        """Add the previous/next navigation to every page of a chain, retrying failed edits"""
+        pending = list(range(len(pages)))
+        
+        for attempt in range(1, NAVIGATION_EDIT_ATTEMPTS + 1):
+            results = await asyncio.gather(*[
+                self._call(
+                    self.client.edit_page,
+                    path=responses[i]['path'],
+                    title=titles[i],
+                    content=pages[i] + self._create_page_navigation(responses, i),
+                    author_name=author_name,
+                    author_url=author_url,
+                    account=accounts[i]
+                )
+                for i in pending
+            ], return_exceptions=True)
+            
+            failed = []
+            for i, result in zip(pending, results):
+                if isinstance(result, BaseException) or not (result[1] and 'url' in result[1]):
+                    logger.warning(
+                        f"Error linking Telegraph page {responses[i]['path']} "
+                        f"(attempt {attempt}/{NAVIGATION_EDIT_ATTEMPTS}): {result}"
+                    )
+                    failed.append(i)
+            
+            if not failed:
+                return True
+            pending = failed
+            if attempt < NAVIGATION_EDIT_ATTEMPTS:
+                await asyncio.sleep(2 ** attempt)
+        
+        logger.error(f"Could not link {len(pending)} of {len(pages)} Telegraph pages")
+        return False
+    
+    async def _discard_paths(self, page_paths: List[str]) -> bool:
+        """Blank out pages in parallel"""
+        results = await asyncio.gather(*[
+            self.update_page(page_path, DISCARDED_TITLE, DISCARDED_CONTENT)
+            for page_path in page_paths
+        ])
+        return all(url is not None for url in results)
+    
+    def _node_size(self, node: Any) -> int:
+        """Serialized size of a node as sent to the API"""
+        return len(json.dumps(node, ensure_ascii=False, separators=(',', ':')).encode('utf-8')) + 1
+    
+    def _split_into_pages(self, content: List[Dict]) -> List[List[Dict]]:
+        """Split content into pages that stay under the Telegraph size limit"""
+        budget = Config.TELEGRAPH_PAGE_MAX_BYTES
+        pages = [[]]
+        page_size = 2
+        
+        for node in content:
+            node_size = self._node_size(node)
+            
+            # A single node larger than a page is broken into plain paragraphs
+            parts = [node] if node_size <= budget else self._split_oversized_node(node, budget)
+            
+            for part in parts:
+                part_size = self._node_size(part)
+                if pages[-1] and page_size + part_size > budget:
+                    pages.append([])
+                    page_size = 2
+                pages[-1].append(part)
+                page_size += part_size
+        
+        return pages
+    
+    def _split_oversized_node(self, node: Any, budget: int) -> List[Dict]:
+        """Break a node that does not fit in one page into paragraphs of plain text"""
+        text = node if isinstance(node, str) else nodes_to_text(node.get('children', []))
+        limit = budget // 2
+        
+        parts = []
+        chunk = []
+        chunk_size = 0
+        for word in text.split(' '):
+            word_size = len(word.encode('utf-8')) + 1
+            if chunk and chunk_size + word_size > limit:
+                parts.append({'tag': 'p', 'children': [' '.join(chunk)]})
+                chunk = []
+                chunk_size = 0
+            chunk.append(word)
+            chunk_size += word_size
+        
+        if chunk:
+            parts.append({'tag': 'p', 'children': [' '.join(chunk)]})
+        
+        return parts
+    
+    def _create_page_navigation(self, responses: List[Dict], index: int) -> List[Dict]:
+        """Create previous/next links between chained pages"""
+        links = []
+        
+        if index > 0:
+            links.append({
+                'tag': 'a',
+                'attrs': {'href': responses[index - 1]['url']},
+                'children': ['◀️ الصفحة السابقة']
+            })
+        
+        if index < len(responses) - 1:
+            if links:
+                links.append(' | ')
+            links.append({
+                'tag': 'a',
+                'attrs': {'href': responses[index + 1]['url']},
+                'children': [NEXT_PAGE_LABEL]
+            })
+        
+        return [
+            {'tag': 'hr'},
+            {'tag': 'p', 'children': [
+                {'tag': 'strong', 'children': [f'الصفحة {index + 1} من {len(responses)}']},
+                ' ', *links
+            ]}
+        ]
+    
     async def _prepare_telegraph_content(self, article: Article) -> List[Dict]:
         """Prepare article content for Telegraph format"""
         content = []
+        site = site_registry.for_article(article)
         
         # Add custom header if configured
-        if Config.CUSTOM_HEADER:
+        if site.message_header:
             content.append({
                 'tag': 'p',
-                'children': [Config.CUSTOM_HEADER]
+                'children': [site.message_header]
             })
         
         # Add article metadata
         metadata = self._create_metadata_section(article)
         content.extend(metadata)
         
-        # Add main image if available
+        # Convert the extracted HTML directly, older articles only have markdown
+        if article.content_html:
+            article_content = html_to_nodes(article.content_html, article.url)
+        else:
+            article_content = self._convert_markdown_to_telegraph(article.content)
+        
+        # Upload the main image and the body images concurrently
+        body_images = self._upload_body_images(article_content, skip_url=article.image_url)
         if article.image_url:
-            image_element = await self._create_image_element(article.image_url)
-            if image_element:
-                content.append(image_element)
+            image_element, article_content = await asyncio.gather(
+                self._create_image_element(article.image_url), body_images
+            )
+        else:
+            image_element, article_content = None, await body_images
+        
+        # Add main image if available
+        if image_element:
+            content.append(image_element)
         
-        # Convert markdown content to Telegraph format
-        article_content = self._convert_markdown_to_telegraph(article.content)
         content.extend(article_content)
         
         # Add custom footer if configured
-        if Config.CUSTOM_FOOTER:
+        if site.message_footer:
             content.append({
                 'tag': 'p',
-                'children': [Config.CUSTOM_FOOTER]
+                'children': [site.message_footer]
             })
         
         # Add source and sharing links
@@ -192,61 +485,89 @@ class TelegraphManager:
             logger.error(f"Error creating image element: {e}")
             return None
     
+    async def _upload_body_images(self, nodes: List[Dict], skip_url: str = "") -> List[Dict]:
+        """Upload the images of the article body in place, dropping those that fail"""
+        image_nodes = list(iter_image_nodes(nodes))
+        if not image_nodes:
+            return nodes
+        
+        # Unique sources in document order, the featured image is already shown above
+        sources = []
+        for node in image_nodes:
+            src = node['attrs']['src']
+            if src != skip_url and src not in sources:
+                sources.append(src)
+        sources = sources[:Config.TELEGRAPH_MAX_BODY_IMAGES]
+        
+        uploaded = await asyncio.gather(*[self._upload_image_to_telegraph(src) for src in sources])
+        uploaded = dict(zip(sources, uploaded))
+        
+        drop_ids = set()
+        for node in image_nodes:
+            telegraph_src = uploaded.get(node['attrs']['src'])
+            if telegraph_src:
+                node['attrs']['src'] = telegraph_src
+            else:
+                drop_ids.add(id(node))
+        
+        if drop_ids:
+            nodes = remove_nodes(nodes, drop_ids)
+        
+        logger.info(f"Uploaded {len(image_nodes) - len(drop_ids)} of {len(image_nodes)} body images")
+        return nodes
+    
     async def _upload_image_to_telegraph(self, image_url: str) -> Optional[str]:
         """Upload image to Telegraph"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_url) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        
-                        # Resize image if too large
-                        image_data = self._resize_image_if_needed(image_data)
-                        
-                        # Upload to Telegraph
-                        files = {'file': ('image.jpg', image_data, 'image/jpeg')}
-                        upload_response = requests.post(
-                            'https://telegra.ph/upload',
-                            files=files
+            # Known source URL: skip both download and upload
+            if self.db:
+                cached_src = await asyncio.to_thread(
+                    self.db.get_cached_image, source_url=image_url, ttl=Config.IMAGE_CACHE_TTL
+                )
+                record_cache_lookup("image_url", bool(cached_src))
+                if cached_src:
+                    return cached_src
+            
+            # Bound concurrent downloads and uploads across all articles
+            async with self._upload_semaphore:
+                image_data = await self.client.download(image_url)
+                if not image_data:
+                    return None
+                
+                # Same bytes under another URL: skip the upload
+                content_hash = hashlib.sha256(image_data).hexdigest()
+                if self.db:
+                    cached_src = await asyncio.to_thread(
+                        self.db.get_cached_image, content_hash=content_hash, ttl=Config.IMAGE_CACHE_TTL
+                    )
+                    record_cache_lookup("image_hash", bool(cached_src))
+                    if cached_src:
+                        await asyncio.to_thread(
+                            self.db.cache_image, image_url, content_hash, cached_src, Config.IMAGE_CACHE_MAX_ENTRIES
                         )
-                        
-                        if upload_response.status_code == 200:
-                            result = upload_response.json()
-                            if result and len(result) > 0:
-                                return 'https://telegra.ph' + result[0]['src']
+                        return cached_src
+                
+                # Downscale and re-encode in the worker pool
+                image = await self.image_processor.prepare(image_data)
+                if not image:
+                    return None
+                
+                # Upload to Telegraph, GIFs kept as-is go up as GIFs
+                with TELEGRAPH_UPLOAD_SECONDS.time():
+                    telegraph_src = await self.client.upload_file(image.data, image.filename, image.content_type)
             
-            return None
+            if self.db and telegraph_src:
+                await asyncio.to_thread(
+                    self.db.cache_image, image_url, content_hash, telegraph_src, Config.IMAGE_CACHE_MAX_ENTRIES
+                )
+            
+            return telegraph_src
             
         except Exception as e:
+            record_error("telegraph_upload", e)
             logger.error(f"Error uploading image to Telegraph: {e}")
             return None
     
-    def _resize_image_if_needed(self, image_data: bytes, max_size: int = 5 * 1024 * 1024) -> bytes:
-        """Resize image if it's too large"""
-        try:
-            if len(image_data) <= max_size:
-                return image_data
-            
-            # Open image and resize
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Calculate new size while maintaining aspect ratio
-            ratio = (max_size / len(image_data)) ** 0.5
-            new_width = int(image.width * ratio)
-            new_height = int(image.height * ratio)
-            
-            # Resize image
-            resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Save to bytes
-            output = io.BytesIO()
-            resized_image.save(output, format='JPEG', quality=85)
-            return output.getvalue()
-            
-        except Exception as e:
-            logger.error(f"Error resizing image: {e}")
-            return image_data
-    
     def _convert_markdown_to_telegraph(self, markdown_text: str) -> List[Dict]:
         """Convert markdown text to Telegraph format"""
         content = []
@@ -374,41 +695,202 @@ class TelegraphManager:
         
         return footer
     
-    def get_page_views(self, page_path: str) -> int:
+    async def get_page_views(self, page_path: str) -> int:
         """Get page views for a Telegraph page"""
         try:
-            page_info = self.telegraph.get_page(page_path, return_content=False)
-            return page_info.get('views', 0)
+            return await self.client.get_views(page_path)
         except Exception:
             return 0
     
-    def update_page(self, page_path: str, title: str, content: List[Dict]) -> Optional[str]:
-        """Update an existing Telegraph page"""
+    async def get_page(self, page_path: str, return_content: bool = False) -> Optional[Dict]:
+        """Get a Telegraph page"""
         try:
-            response = self.telegraph.edit_page(
-                path=page_path,
-                title=title,
-                content=content
-            )
+            return await self.client.get_page(page_path, return_content=return_content)
+        except Exception as e:
+            logger.error(f"Error getting Telegraph page: {e}")
+            return None
+    
+    async def update_page(self, page_path: str, title: str, content: List[Dict],
+                          author_name: str = None, author_url: str = None) -> Optional[str]:
+        """Update an existing Telegraph page, signed with the configured author unless given"""
+        try:
+            # Only the account that created a page can edit it
+            owner = self._page_owners.get(page_path)
+            candidates = [account for account in self.accounts if account.access_token == owner]
+            candidates += [account for account in self.accounts if account.access_token != owner]
             
-            if response and 'url' in response:
-                return response['url']
+            for account in candidates:
+                try:
+                    _, response = await self._call(
+                        self.client.edit_page,
+                        path=page_path,
+                        title=title,
+                        content=content,
+                        author_name=author_name or Config.TELEGRAPH_AUTHOR,
+                        author_url=author_url or Config.TELEGRAPH_AUTHOR_URL,
+                        account=account
+                    )
+                except TelegraphError as e:
+                    if 'ACCESS_DENIED' in str(e):
+                        continue
+                    raise
+                
+                self._remember(self._page_owners, page_path, account.access_token, PAGE_OWNERS_KEPT)
+                if response and 'url' in response:
+                    return response['url']
+                return None
             
             return None
-            
+        
         except Exception as e:
             logger.error(f"Error updating Telegraph page: {e}")
             return None
     
+    async def update_article_page(self, article: Article) -> Optional[str]:
+        """Re-render an article into its existing Telegraph page chain.
+        
+        The chain is edited in place when the new content needs no more pages
+        than it has, and the pages it no longer needs are blanked. Longer
+        content gets a new chain and the old one is blanked.
+        """
+        try:
+            if not await self.ensure_accounts():
+                logger.error("Telegraph account not initialized")
+                return None
+            
+            content = await self._prepare_telegraph_content(article)
+            pages = self._split_into_pages(content)
+            old_paths = await self._chain_paths(urlparse(article.telegraph_url).path.strip('/'))
+            
+            if len(pages) > len(old_paths):
+                telegraph_url = await self.create_article_page(article)
+                if telegraph_url:
+                    self._chains.pop(old_paths[0], None)
+                    await self._discard_paths(old_paths)
+                return telegraph_url
+            
+            author_name, author_url = self._page_author(article)
+            titles = self._page_titles(article, len(pages))
+            kept = [{'path': path, 'url': f"https://telegra.ph/{path}"} for path in old_paths[:len(pages)]]
+            results = await asyncio.gather(*[
+                self.update_page(
+                    kept[i]['path'], titles[i],
+                    page + (self._create_page_navigation(kept, i) if len(pages) > 1 else []),
+                    author_name, author_url
+                )
+                for i, page in enumerate(pages)
+            ])
+            if any(url is None for url in results):
+                return None
+            
+            # The last kept page no longer links the pages after it
+            self._remember(self._chains, old_paths[0], [page['path'] for page in kept], CHAINS_KEPT)
+            if len(old_paths) > len(pages):
+                await self._discard_paths(old_paths[len(pages):])
+            return results[0]
+        
+        except Exception as e:
+            logger.error(f"Error updating Telegraph article page: {e}")
+            return None
+    
+    async def discard_page(self, telegraph_url: str) -> bool:
+        """Blank out a page and the pages chained after it, Telegraph cannot delete pages"""
+        page_paths = await self._chain_paths(urlparse(telegraph_url).path.strip('/'))
+        return await self._discard_paths(page_paths)
+    
+    async def _chain_paths(self, page_path: str) -> List[str]:
+        """Paths of a page and of the pages chained after it, following the navigation links"""
+        if page_path in self._chains:
+            self._chains.move_to_end(page_path)
+            return self._chains[page_path]
+        
+        page_paths = [page_path]
+        while len(page_paths) < MAX_CHAIN_PAGES:
+            page = await self.get_page(page_paths[-1], return_content=True)
+            if not page:
+                # Unknown end of the chain, walk it again next time
+                return page_paths
+            next_url = self._find_next_page_url(page.get('content') or [])
+            next_path = urlparse(next_url).path.strip('/') if next_url else ""
+            if not next_path or next_path in page_paths:
+                break
+            page_paths.append(next_path)
+        
+        self._remember(self._chains, page_path, page_paths, CHAINS_KEPT)
+        return page_paths
+    
+    @staticmethod
+    def _remember(cache: OrderedDict, key: str, value: Any, limit: int):
+        """Store a value in a bounded map, dropping the least recently used entries"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+    
+    def _find_next_page_url(self, nodes: List[Any]) -> Optional[str]:
+        """URL of the next page link in a page's content"""
+        for node in nodes:
+            if not isinstance(node, dict):
+                continue
+            if node.get('tag') == 'a' and NEXT_PAGE_LABEL in node.get('children', []):
+                return (node.get('attrs') or {}).get('href')
+            url = self._find_next_page_url(node.get('children', []))
+            if url:
+                return url
+        return None
+    
+    async def prepare_media(self, image_url: str) -> Optional[str]:
+        """Get a processed copy of an image hosted on Telegraph, shared with the upload cache"""
+        return await self._upload_image_to_telegraph(image_url)
+    
+    async def collect_page_views(self, articles: List[Tuple[int, str]]) -> List[Tuple[str, int, int]]:
+        """Collect (page path, article ID, views) for every page of the articles' Telegraph chains"""
+        semaphore = asyncio.Semaphore(Config.PAGE_VIEWS_CONCURRENCY)
+        
+        async def chain_pages(article_id: int, telegraph_url: str) -> List[Tuple[str, int]]:
+            async with semaphore:
+                page_paths = await self._chain_paths(urlparse(telegraph_url).path.strip('/'))
+            return [(page_path, article_id) for page_path in page_paths]
+        
+        async def page_views(page_path: str, article_id: int) -> Tuple[str, int, int]:
+            async with semaphore:
+                return page_path, article_id, await self.get_page_views(page_path)
+        
+        chains = await asyncio.gather(*[chain_pages(article_id, url) for article_id, url in articles])
+        pages = [page for chain in chains for page in chain]
+        
+        return await asyncio.gather(*[page_views(page_path, article_id) for page_path, article_id in pages])
+    
     def get_account_info(self) -> Optional[Dict]:
         """Get Telegraph account information"""
         return self.account_info
     
-    def get_page_list(self, offset: int = 0, limit: int = 50) -> List[Dict]:
-        """Get list of pages created by the account"""
+    def get_status(self) -> str:
+        """State of the account pool.
+        
+        "ready": accounts are available, "flood_wait": every account is under
+        flood control, "lazy": accounts are created with the first page,
+        "error": creating an account failed last time.
+        """
+        if self.accounts:
+            now = time.monotonic()
+            if all(account.blocked_until > now for account in self.accounts):
+                return "flood_wait"
+            return "ready"
+        return "error" if self._account_error else "lazy"
+    
+    async def get_page_list(self, offset: int = 0, limit: int = 50,
+                            account: TelegraphAccount = None) -> List[Dict]:
+        """Get list of pages created by an account (the first in the pool by default)"""
         try:
-            response = self.telegraph.get_page_list(offset=offset, limit=limit)
+            account = account or (self.accounts[0] if self.accounts else None)
+            if not account:
+                return []
+            
+            _, response = await self._call(
+                self.client.get_page_list, offset=offset, limit=limit, account=account
+            )
             return response.get('pages', [])
         except Exception as e:
             logger.error(f"Error getting page list: {e}")
-            return []
\ No newline at end of file
+            return []
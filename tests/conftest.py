@@ -0,0 +1,83 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from config import Config
+from database import Article, Database
+
+
+class FakeBot:
+    """Records the Bot API calls of the publisher, failing the next `fail` sends"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = 0
+        self.message_ids = itertools.count(100)
+
+    async def _send(self, method, **kwargs):
+        self.calls.append((method, kwargs))
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("network error")
+        return SimpleNamespace(message_id=next(self.message_ids))
+
+    async def send_message(self, **kwargs):
+        return await self._send("send_message", **kwargs)
+
+    async def send_photo(self, **kwargs):
+        return await self._send("send_photo", **kwargs)
+
+    async def send_media_group(self, **kwargs):
+        await self._send("send_media_group", **kwargs)
+        return [SimpleNamespace(message_id=next(self.message_ids)) for _ in kwargs["media"]]
+
+    def sent(self, chat_id=None):
+        """Calls that posted to a chat, the channel by default"""
+        chat_id = Config.CHAT_ID if chat_id is None else chat_id
+        return [(method, kwargs) for method, kwargs in self.calls if kwargs.get("chat_id") == chat_id]
+
+
+class FakeTelegraph:
+    """Creates one numbered page per call, or none while `fail` is set"""
+
+    def __init__(self):
+        self.created = []
+        self.fail = False
+
+    async def create_article_page(self, article):
+        if self.fail:
+            return None
+        self.created.append(article.url)
+        return f"https://telegra.ph/page-{len(self.created)}"
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / "bot.db"))
+
+
+@pytest.fixture
+def add_article(db):
+    def add(number=1, **fields):
+        article = Article(url=f"https://example.com/archives/{number}", title=f"خبر {number}",
+                          summary="ملخص", content="نص الخبر", hash=f"hash-{number}", **fields)
+        article.id = db.add_article(article)
+        return article
+
+    return add
+
+
+@pytest.fixture
+def publisher(db, monkeypatch):
+    monkeypatch.setattr(Config, "BOT_TOKEN", "123456:test")
+    monkeypatch.setattr(Config, "CHAT_ID", "-100123")
+    monkeypatch.setattr(Config, "ADMIN_IDS", [7])
+    monkeypatch.setattr(Config, "ENABLE_TEXT_SHORTENING", True)
+    monkeypatch.setattr(Config, "DIGEST_ALBUM", False)
+
+    from telegram_publisher import TelegramPublisher
+    publisher = TelegramPublisher(db, FakeTelegraph())
+    publisher.bot = FakeBot()
+    publisher._ready.set()
+    return publisher
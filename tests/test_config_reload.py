@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import config
+from config import Config
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """A .env file for reload, with the environment and settings restored afterwards"""
+    saved_environ = dict(os.environ)
+    saved_settings = Config.settings()
+    saved_keys = set(config._env_file_keys)
+
+    path = tmp_path / ".env"
+    monkeypatch.setattr(config, "ENV_FILE", str(path))
+
+    def write(**values):
+        base = {"BOT_TOKEN": "123456:test", "CHAT_ID": "-100123", "WEBSITE_URL": "https://example.com"}
+        path.write_text("".join(f"{key}={value}\n" for key, value in {**base, **values}.items()))
+
+    yield write
+
+    os.environ.clear()
+    os.environ.update(saved_environ)
+    config._env_file_keys = saved_keys
+    for name, value in saved_settings.items():
+        setattr(Config, name, value)
+
+
+def test_changed_setting_is_applied(env_file):
+    env_file(DIGEST_WINDOW="123")
+    changes = Config.reload()
+
+    assert changes["DIGEST_WINDOW"][1] == 123
+    assert Config.DIGEST_WINDOW == 123
+
+
+def test_restart_settings_are_reported_but_kept(env_file):
+    running = Config.BOT_TOKEN
+    env_file(BOT_TOKEN="999999:other")
+    changes = Config.reload()
+
+    assert changes["BOT_TOKEN"] == (running, "999999:other")
+    assert Config.BOT_TOKEN == running
+
+
+def test_setting_removed_from_env_file_returns_to_its_default(env_file):
+    env_file(OUTBOX_MAX_ATTEMPTS="9")
+    Config.reload()
+    assert Config.OUTBOX_MAX_ATTEMPTS == 9
+
+    env_file()
+    Config.reload()
+    assert Config.OUTBOX_MAX_ATTEMPTS == 5
+    assert "OUTBOX_MAX_ATTEMPTS" not in os.environ
+
+
+@pytest.mark.parametrize("values", [{"DIGEST_WINDOW": "soon"}, {"BOT_TOKEN": ""}])
+def test_rejected_reload_changes_nothing(env_file, values):
+    env_file(DIGEST_WINDOW="321")
+    Config.reload()
+    environ = dict(os.environ)
+
+    env_file(**values)
+    with pytest.raises(ValueError):
+        Config.reload()
+
+    assert Config.DIGEST_WINDOW == 321
+    assert dict(os.environ) == environ
@@ -0,0 +1,90 @@
+import asyncio
+
+from config import Config
+from database import OUTBOX_QUEUED, OUTBOX_SENDING, OUTBOX_SENT, OUTBOX_TELEGRAPH_DONE
+from telegram.constants import ParseMode
+
+
+def queued(db, add_article, count, **fields):
+    articles = [add_article(number, **fields) for number in range(1, count + 1)]
+    for article in articles:
+        db.enqueue_publish(article.id)
+    return articles
+
+
+def test_digest_is_one_escaped_html_post(publisher, db, add_article):
+    articles = queued(db, add_article, 3)
+    articles[0].title = "<b>أ & ب</b>"
+
+    assert asyncio.run(publisher.publish_digest(articles)) == 3
+
+    [(method, message)] = publisher.bot.sent()
+    assert message["parse_mode"] == ParseMode.HTML
+    assert "&lt;b&gt;أ &amp; ب&lt;/b&gt;" in message["text"]
+    assert message["text"].count('<a href="https://telegra.ph/page-') == 3
+    assert all(db.get_outbox_item(article.id).state == OUTBOX_SENT for article in articles)
+
+
+def test_failed_part_requeues_only_its_articles(publisher, db, add_article, monkeypatch):
+    articles = queued(db, add_article, 4)
+    for article in articles:
+        article.title = "عنوان طويل " * 10
+    # Room for about two entries per message
+    monkeypatch.setattr(Config, "MAX_MESSAGE_LENGTH", 500)
+
+    original = publisher.bot.send_message
+    sends = []
+
+    async def send_message(**kwargs):
+        sends.append(kwargs)
+        if len(sends) == 2:
+            raise RuntimeError("network error")
+        return await original(**kwargs)
+
+    publisher.bot.send_message = send_message
+    published = asyncio.run(publisher.publish_digest(articles))
+
+    states = [db.get_outbox_item(article.id).state for article in articles]
+    assert 0 < published < len(articles)
+    assert states[:published] == [OUTBOX_SENT] * published
+    # Their Telegraph pages are kept for the retry
+    assert set(states[published:]) == {OUTBOX_TELEGRAPH_DONE}
+
+
+def test_interrupted_send_is_left_out(publisher, db, add_article):
+    articles = queued(db, add_article, 3)
+    db.mark_outbox_sending(articles[0].id)
+
+    assert asyncio.run(publisher.publish_digest(articles)) == 2
+    [(_, message)] = publisher.bot.sent()
+    assert articles[0].title not in message["text"]
+    assert db.get_outbox_item(articles[0].id).state == OUTBOX_SENDING
+
+
+def test_album_is_not_resent_on_retry(publisher, db, add_article, monkeypatch):
+    monkeypatch.setattr(Config, "DIGEST_ALBUM", True)
+    articles = queued(db, add_article, 2, image_url="https://example.com/image.jpg")
+
+    original = publisher.bot.send_message
+
+    async def fail_once(**kwargs):
+        publisher.bot.send_message = original
+        raise RuntimeError("network error")
+
+    publisher.bot.send_message = fail_once
+    assert asyncio.run(publisher.publish_digest(articles)) == 0
+    assert {db.get_outbox_item(article.id).state for article in articles} == {OUTBOX_TELEGRAPH_DONE}
+
+    retried = [db.get_article_by_id(article.id) for article in articles]
+    assert asyncio.run(publisher.publish_digest(retried)) == 2
+    albums = [call for call in publisher.bot.calls if call[0] == "send_media_group"]
+    assert len(albums) == 1
+
+
+def test_queued_state_without_telegraph(publisher, db, add_article, monkeypatch):
+    monkeypatch.setattr(Config, "ENABLE_TEXT_SHORTENING", False)
+    articles = queued(db, add_article, 2)
+    publisher.bot.fail = 1
+
+    assert asyncio.run(publisher.publish_digest(articles)) == 0
+    assert {db.get_outbox_item(article.id).state for article in articles} == {OUTBOX_QUEUED}
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from config import Config
+from database import Article, Database, Section
+from main import NewsBot
+from pipeline import ArticlePipeline
+from website_monitor import WebsiteMonitor
+
+URL = "https://example.com/archives/1"
+
+
+class FakePublisher:
+    def __init__(self):
+        self.approvals = []
+
+    async def prerender_article(self, article):
+        pass
+
+    async def send_article_for_approval(self, admin_id, article):
+        self.approvals.append((admin_id, article.url))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "AUTO_PUBLISH", False)
+    monkeypatch.setattr(Config, "PRERENDER_PENDING", False)
+    monkeypatch.setattr(Config, "ADMIN_IDS", [1])
+    return Database(str(tmp_path / "bot.db"))
+
+
+def run_follower_cycle(db):
+    monitor = WebsiteMonitor(db)
+
+    async def discover(section):
+        return [URL]
+
+    async def fetch(url):
+        return "<html></html>"
+
+    async def extract(url, section, page_html):
+        return Article(url=url, title="خبر", content="نص", section=section.name, hash="h1",
+                       needs_approval=True)
+
+    monitor.discover_article_urls = discover
+    monitor.fetch_page = fetch
+    monitor.extract_section_article = extract
+    monitor.should_include_article = lambda article: True
+
+    published = []
+
+    async def publish(articles):
+        published.extend(articles)
+
+    pipeline = ArticlePipeline(db, monitor, FakePublisher(), publish)
+    stored = asyncio.run(pipeline.run_cycle([Section(id=1, name="news", url="https://example.com/news/")],
+                                            publish=False))
+    return stored, published
+
+
+def leader(db):
+    bot = NewsBot.__new__(NewsBot)  # Only the parts send_owed_approvals uses
+    bot.db = db
+    bot.telegram_publisher = FakePublisher()
+    return bot
+
+
+def test_follower_cycle_leaves_the_approval_to_the_leader(db):
+    stored, published = run_follower_cycle(db)
+    assert stored == 1
+    assert published == []
+    assert [article.url for article in db.get_articles_owing_approval_notice()] == [URL]
+
+    bot = leader(db)
+    asyncio.run(bot.send_owed_approvals())
+    assert bot.telegram_publisher.approvals == [(1, URL)]
+    assert db.get_articles_owing_approval_notice() == []
+
+    # Sent once only
+    asyncio.run(bot.send_owed_approvals())
+    assert bot.telegram_publisher.approvals == [(1, URL)]
+
+
+def test_failed_approval_stays_owed(db):
+    run_follower_cycle(db)
+    bot = leader(db)
+
+    async def fail(admin_id, article):
+        raise RuntimeError("network")
+
+    bot.telegram_publisher.send_article_for_approval = fail
+    asyncio.run(bot.send_owed_approvals())
+    assert [article.url for article in db.get_articles_owing_approval_notice()] == [URL]
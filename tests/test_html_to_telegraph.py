@@ -0,0 +1,40 @@
+from html_to_telegraph import html_to_nodes
+
+
+def test_table_cells_are_separated():
+    nodes = html_to_nodes(
+        "<table><tr><th>الاسم</th><th>العدد</th></tr>\n"
+        "<tr><td> صنعاء </td>\n<td><b>3</b></td></tr></table>"
+    )
+    assert nodes == [{'tag': 'p', 'children': [
+        'الاسم | العدد', {'tag': 'br'}, 'صنعاء | ', {'tag': 'b', 'children': ['3']}
+    ]}]
+
+
+def test_text_outside_tables_is_unchanged():
+    assert html_to_nodes("<p>a  b</p><p>c</p>") == [
+        {'tag': 'p', 'children': ['a b']},
+        {'tag': 'p', 'children': ['c']},
+    ]
+
+
+def test_sibling_divs_stay_separate_paragraphs():
+    assert html_to_nodes("<div>first para</div>\n<div>second para</div>") == [
+        {'tag': 'p', 'children': ['first para']},
+        {'tag': 'p', 'children': ['second para']},
+    ]
+
+
+def test_text_directly_inside_section_is_its_own_paragraph():
+    assert html_to_nodes("<section>intro<p>body</p>outro</section>after") == [
+        {'tag': 'p', 'children': ['intro']},
+        {'tag': 'p', 'children': ['body']},
+        {'tag': 'p', 'children': ['outro']},
+        {'tag': 'p', 'children': ['after']},
+    ]
+
+
+def test_unwrapped_block_inside_quote_breaks_the_line():
+    assert html_to_nodes("<blockquote>a <div>b</div> c</blockquote>") == [
+        {'tag': 'blockquote', 'children': ['a', {'tag': 'br'}, 'b', {'tag': 'br'}, 'c']}
+    ]
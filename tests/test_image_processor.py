@@ -0,0 +1,30 @@
+import io
+import random
+
+from PIL import Image
+
+from image_processor import MIN_SIDE, ImageProcessor
+
+
+def noise_image(side: int) -> bytes:
+    rng = random.Random(3)
+    image = Image.frombytes("RGB", (side, side), bytes(rng.getrandbits(8) for _ in range(side * side * 3)))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_large_image_is_shrunk_to_fit():
+    image = Image.new("RGB", (3000, 2000), (200, 30, 30))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+
+    prepared = ImageProcessor.prepare_sync(output.getvalue(), max_bytes=50_000, max_side=1280)
+    assert prepared is not None and prepared.format == "JPEG"
+    assert len(prepared.data) <= 50_000
+    assert max(Image.open(io.BytesIO(prepared.data)).size) <= 1280
+
+
+def test_incompressible_image_that_never_fits_is_skipped():
+    # Noise barely compresses: even at MIN_SIDE and the lowest quality it stays over the budget
+    assert ImageProcessor.prepare_sync(noise_image(MIN_SIDE * 2), max_bytes=5_000) is None
@@ -0,0 +1,105 @@
+import sqlite3
+
+import pytest
+
+from leases import LEADER_LEASE, LeaseManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def make_manager(tmp_path, clock):
+    path = str(tmp_path / "leases.db")
+
+    def make(owner, ttl=30):
+        manager = LeaseManager(lambda: sqlite3.connect(path), owner, ttl, clock=clock)
+        manager.init_table()
+        return manager
+
+    return make
+
+
+def test_assignee_is_stable_and_independent_of_order():
+    workers = ["a", "b", "c"]
+    for key in map(str, range(50)):
+        assignee = LeaseManager._assignee(key, workers)
+        assert assignee in workers
+        assert LeaseManager._assignee(key, list(reversed(workers))) == assignee
+
+
+def test_assignee_moves_only_keys_of_a_new_worker():
+    keys = [str(key) for key in range(200)]
+    before = {key: LeaseManager._assignee(key, ["a", "b"]) for key in keys}
+    after = {key: LeaseManager._assignee(key, ["a", "b", "c"]) for key in keys}
+
+    moved = [key for key in keys if before[key] != after[key]]
+    assert moved
+    assert all(after[key] == "c" for key in moved)
+
+
+def test_assignee_moves_only_keys_of_a_removed_worker():
+    keys = [str(key) for key in range(200)]
+    before = {key: LeaseManager._assignee(key, ["a", "b", "c"]) for key in keys}
+    after = {key: LeaseManager._assignee(key, ["a", "c"]) for key in keys}
+
+    assert all(after[key] == before[key] for key in keys if before[key] != "b")
+    assert {after[key] for key in keys if before[key] == "b"} == {"a", "c"}
+
+
+def test_rebalance_splits_keys_between_workers(make_manager):
+    a, b = make_manager("a"), make_manager("b")
+    keys = [str(key) for key in range(20)]
+
+    # Both heartbeats must be visible before the shares settle
+    a.rebalance(keys)
+    b.rebalance(keys)
+    held_a = a.rebalance(keys)
+    held_b = b.rebalance(keys)
+
+    assert held_a | held_b == set(keys)
+    assert not held_a & held_b
+
+
+def test_rebalance_releases_removed_keys(make_manager):
+    a = make_manager("a")
+    assert a.rebalance(["1", "2"]) == {"1", "2"}
+    assert a.rebalance(["1"]) == {"1"}
+    assert a.holder("section:2") is None
+
+
+def test_single_leader(make_manager):
+    a, b = make_manager("a"), make_manager("b")
+    assert a.is_leader()
+    assert not b.is_leader()
+    assert a.is_leader()
+    assert a.holder(LEADER_LEASE) == "a"
+
+
+def test_leader_fails_over_after_expiry(make_manager, clock):
+    a, b = make_manager("a", ttl=30), make_manager("b", ttl=30)
+    assert a.is_leader()
+
+    clock.now += 20
+    assert not b.is_leader()
+
+    clock.now += 11
+    assert b.is_leader()
+    assert not a.is_leader()
+
+
+def test_release_all_hands_leadership_over(make_manager):
+    a, b = make_manager("a"), make_manager("b")
+    assert a.is_leader()
+    a.release_all()
+    assert b.is_leader()
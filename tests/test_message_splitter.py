@@ -0,0 +1,63 @@
+import random
+
+from message_splitter import split_message, utf16_len
+
+
+def check_limits(parts, max_length, first_max_length=None):
+    assert parts
+    assert utf16_len(parts[0]) <= (first_max_length or max_length)
+    for part in parts[1:]:
+        assert utf16_len(part) <= max_length
+    assert all(part.strip() for part in parts)
+
+
+def test_short_text_is_one_part():
+    assert split_message("مرحبا", 100) == ["مرحبا"]
+
+
+def test_parts_respect_limits():
+    text = "\n\n".join("جملة عربية طويلة. " * 20 for _ in range(10))
+    parts = split_message(text, 300, first_max_length=100)
+    check_limits(parts, 300, 100)
+    assert "".join(parts).replace(" ", "").replace("\n", "") == text.replace(" ", "").replace("\n", "")
+
+
+def test_leading_whitespace_keeps_first_limit():
+    text = "\n\n   " + "كلمة " * 400
+    parts = split_message(text, 1000, first_max_length=30)
+    check_limits(parts, 1000, 30)
+
+
+def test_utf16_limits_with_emoji():
+    text = "😀" * 100
+    parts = split_message(text, 20)
+    check_limits(parts, 20)
+    assert "".join(parts) == text
+
+
+def test_markdown_entity_not_split():
+    text = "a " * 10 + "[رابط المقال](https://example.com/x)" + " b" * 10
+    parts = split_message(text, 40)
+    check_limits(parts, 40)
+    assert any("[رابط المقال](https://example.com/x)" in part for part in parts)
+
+
+def test_fuzz_first_part_limit():
+    rng = random.Random(7)
+    alphabet = ["كلمة", "word", "\n", "\n\n", " ", ".", "*bold*", "😀", "   ", "،"]
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) + " " for _ in range(rng.randint(1, 400)))
+        if rng.random() < 0.5:
+            text = rng.choice(["\n", " ", "\n\n  "]) * rng.randint(1, 5) + text
+        if not text.strip():
+            continue
+        first = rng.randint(20, 200)
+        parts = split_message(text, 500, first_max_length=first)
+        check_limits(parts, 500, first)
+
+
+def test_split_lands_on_punctuated_paragraph_end():
+    first = "الفقرة الأولى تنتهي هنا. " * 3 + "وهذه آخر جملة فيها."
+    second = "جملة من الفقرة الثانية. " * 4
+    parts = split_message(first + "\n\n" + second, utf16_len(first) + 40)
+    assert parts[0] == first
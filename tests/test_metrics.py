@@ -0,0 +1,85 @@
+import math
+
+import pytest
+
+from metrics import Counter, Gauge, Histogram, Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_exposition(registry):
+    counter = Counter("items_total", "Items seen", ["stage"], registry=registry)
+    counter.inc(stage="fetch")
+    counter.inc(2, stage="fetch")
+    counter.inc(stage="publish")
+
+    assert registry.render() == (
+        "# HELP items_total Items seen\n"
+        "# TYPE items_total counter\n"
+        'items_total{stage="fetch"} 3.0\n'
+        'items_total{stage="publish"} 1.0\n'
+    )
+
+
+def test_metric_without_labels_has_no_braces(registry):
+    Gauge("up", "Whether the bot runs", registry=registry).set(1)
+    assert registry.render().splitlines()[-1] == "up 1.0"
+
+
+def test_label_values_are_escaped(registry):
+    counter = Counter("errors_total", "Errors", ["message"], registry=registry)
+    counter.inc(message='say "hi"\\\nbye')
+    assert registry.render().splitlines()[-1] == 'errors_total{message="say \\"hi\\"\\\\\\nbye"} 1.0'
+
+
+def test_gauge_callback_is_read_on_render(registry):
+    gauge = Gauge("queue_depth", "Queued items", ["queue"], registry=registry)
+    depths = {"outbox": 2}
+    gauge.set_function(lambda: depths)
+    depths["outbox"] = 5
+
+    assert registry.render().splitlines()[-1] == 'queue_depth{queue="outbox"} 5.0'
+
+
+def test_failing_gauge_callback_renders_no_samples(registry):
+    gauge = Gauge("broken", "Broken gauge", registry=registry)
+    gauge.set_function(lambda: 1 / 0)
+    assert registry.render() == "# HELP broken Broken gauge\n# TYPE broken gauge\n"
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram("latency_seconds", "Latency", ["method"], buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, method="send")
+
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{method="send",le="0.1"} 2',
+        'latency_seconds_bucket{method="send",le="1.0"} 3',
+        'latency_seconds_bucket{method="send",le="+Inf"} 4',
+        'latency_seconds_sum{method="send"} 3.65',
+        'latency_seconds_count{method="send"} 4',
+    ]
+
+
+def test_histogram_time_observes_when_the_block_raises(registry):
+    histogram = Histogram("job_seconds", "Job duration", registry=registry)
+    with pytest.raises(RuntimeError):
+        with histogram.time():
+            raise RuntimeError()
+    assert histogram.count() == 1
+
+
+def test_wrong_labels_and_duplicate_names_are_rejected(registry):
+    counter = Counter("sends_total", "Sends", ["method"], registry=registry)
+    with pytest.raises(ValueError):
+        counter.inc(chat="1")
+    with pytest.raises(ValueError):
+        Counter("sends_total", "Sends again", registry=registry)
+
+
+def test_infinite_values(registry):
+    Gauge("limit", "Limit", registry=registry).set(math.inf)
+    assert registry.render().splitlines()[-1] == "limit +Inf"
@@ -0,0 +1,182 @@
+import asyncio
+from types import SimpleNamespace
+
+from database import OUTBOX_FAILED, OUTBOX_QUEUED, OUTBOX_SENDING, OUTBOX_SENT, OUTBOX_TELEGRAPH_DONE
+
+
+def state(db, article):
+    return db.get_outbox_item(article.id).state
+
+
+def test_states_follow_the_publish_steps(db, add_article):
+    article = add_article()
+    assert db.enqueue_publish(article.id).state == OUTBOX_QUEUED
+    assert [item.article_id for item in db.get_pending_outbox_items()] == [article.id]
+
+    db.mark_outbox_telegraph_done(article.id, "https://telegra.ph/page-1")
+    assert state(db, article) == OUTBOX_TELEGRAPH_DONE
+
+    db.mark_outbox_sending(article.id)
+    assert state(db, article) == OUTBOX_SENDING
+    # Neither retried nor counted while the send is in flight
+    assert db.get_pending_outbox_items(due_only=False) == []
+    assert db.count_pending_outbox_items() == 0
+
+    db.mark_outbox_sent(article.id, 42)
+    item = db.get_outbox_item(article.id)
+    assert (item.state, item.message_id) == (OUTBOX_SENT, 42)
+
+    # Queueing a sent article again is a no-op
+    assert db.enqueue_publish(article.id).state == OUTBOX_SENT
+
+
+def test_failed_send_goes_back_to_the_last_completed_step(db, add_article):
+    with_page, without_page = add_article(1), add_article(2)
+    for article in (with_page, without_page):
+        db.enqueue_publish(article.id)
+    db.mark_outbox_telegraph_done(with_page.id, "https://telegra.ph/page-1")
+
+    for article in (with_page, without_page):
+        db.mark_outbox_sending(article.id)
+        db.record_outbox_failure(article.id, "Telegram send failed", 0, 5)
+
+    assert state(db, with_page) == OUTBOX_TELEGRAPH_DONE
+    assert state(db, without_page) == OUTBOX_QUEUED
+    assert db.get_outbox_item(with_page.id).attempts == 1
+
+
+def test_exhausted_attempts_fail_and_sent_items_are_kept(db, add_article):
+    failing, sent = add_article(1), add_article(2)
+    for article in (failing, sent):
+        db.enqueue_publish(article.id)
+    for _ in range(3):
+        db.record_outbox_failure(failing.id, "Telegraph page creation failed", 0, 3)
+    db.mark_outbox_sent(sent.id, 1)
+    db.record_outbox_failure(sent.id, "late error", 0, 3)
+
+    assert state(db, failing) == OUTBOX_FAILED
+    assert state(db, sent) == OUTBOX_SENT
+
+
+def test_backoff_delays_the_retry(db, add_article):
+    article = add_article()
+    db.enqueue_publish(article.id)
+    db.record_outbox_failure(article.id, "Telegram send failed", 3600, 5)
+
+    assert db.get_pending_outbox_items(due_only=True) == []
+    assert len(db.get_pending_outbox_items(due_only=False)) == 1
+
+
+def test_publish_goes_from_queued_to_sent(publisher, db, add_article):
+    article = add_article()
+    assert asyncio.run(publisher.publish_article(article))
+
+    item = db.get_outbox_item(article.id)
+    assert item.state == OUTBOX_SENT
+    assert item.telegraph_url == "https://telegra.ph/page-1"
+    assert db.get_article_by_id(article.id).is_published
+    assert len(publisher.bot.sent()) == 1
+
+
+def test_retry_reuses_the_telegraph_page(publisher, db, add_article):
+    article = add_article()
+    publisher.bot.fail = 1
+    assert not asyncio.run(publisher.publish_article(article))
+    assert state(db, article) == OUTBOX_TELEGRAPH_DONE
+
+    assert asyncio.run(publisher.process_due_outbox(due_only=False)) == 1
+    assert state(db, article) == OUTBOX_SENT
+    assert publisher.telegraph_manager.created == [article.url]
+
+
+def test_telegraph_failure_stays_queued(publisher, db, add_article):
+    article = add_article()
+    publisher.telegraph_manager.fail = True
+    assert not asyncio.run(publisher.publish_article(article))
+
+    item = db.get_outbox_item(article.id)
+    assert (item.state, item.attempts, item.last_error) == (OUTBOX_QUEUED, 1, "Telegraph page creation failed")
+    assert publisher.bot.calls == []
+
+
+def test_recovery_asks_the_admins_about_interrupted_sends(publisher, db, add_article):
+    interrupted, queued = add_article(1), add_article(2)
+    for article in (interrupted, queued):
+        db.enqueue_publish(article.id)
+    db.mark_outbox_sending(interrupted.id)
+
+    assert asyncio.run(publisher.recover_outbox()) == 1
+
+    # The queued article is published, the interrupted one is left to the admins
+    assert state(db, queued) == OUTBOX_SENT
+    assert state(db, interrupted) == OUTBOX_SENDING
+    assert len(publisher.bot.sent()) == 1
+    notices = publisher.bot.sent(chat_id=7)
+    assert len(notices) == 1
+    buttons = [button.callback_data for row in notices[0][1]["reply_markup"].inline_keyboard for button in row]
+    assert buttons == [f"obx_s_{interrupted.id}", f"obx_r_{interrupted.id}"]
+
+    # Not resent by later retries either
+    assert asyncio.run(publisher.process_due_outbox(due_only=False)) == 0
+    assert len(publisher.bot.sent()) == 1
+
+
+class Query:
+    def __init__(self, data, user_id=7):
+        self.data = data
+        self.from_user = SimpleNamespace(id=user_id)
+        self.answers = []
+
+    async def edit_message_text(self, text, **kwargs):
+        self.answers.append(text)
+
+
+def interrupted_article(db, add_article):
+    article = add_article()
+    db.enqueue_publish(article.id)
+    db.mark_outbox_telegraph_done(article.id, "https://telegra.ph/page-1")
+    db.mark_outbox_sending(article.id)
+    return article
+
+
+def test_admin_confirms_an_interrupted_send(publisher, db, add_article):
+    article = interrupted_article(db, add_article)
+    asyncio.run(publisher.handle_outbox_callback(Query(f"obx_s_{article.id}")))
+
+    assert state(db, article) == OUTBOX_SENT
+    assert db.get_article_by_id(article.id).is_published
+    assert publisher.bot.calls == []
+
+
+def test_admin_resends_an_interrupted_send(publisher, db, add_article):
+    article = interrupted_article(db, add_article)
+    query = Query(f"obx_r_{article.id}")
+    asyncio.run(publisher.handle_outbox_callback(query))
+
+    assert state(db, article) == OUTBOX_SENT
+    assert len(publisher.bot.sent()) == 1
+    # The page of the interrupted attempt is reused
+    assert publisher.telegraph_manager.created == []
+
+    # A second answer to the same notice changes nothing
+    asyncio.run(publisher.handle_outbox_callback(Query(f"obx_r_{article.id}")))
+    assert len(publisher.bot.sent()) == 1
+
+
+def test_only_admins_answer_interrupted_sends(publisher, db, add_article):
+    article = interrupted_article(db, add_article)
+    asyncio.run(publisher.handle_outbox_callback(Query(f"obx_s_{article.id}", user_id=8)))
+    assert state(db, article) == OUTBOX_SENDING
+
+
+def test_sending_state_is_set_before_the_send(publisher, db, add_article):
+    article = add_article()
+    states = []
+
+    async def send_message(**kwargs):
+        states.append(state(db, article))
+        return SimpleNamespace(message_id=1)
+
+    publisher.bot.send_message = send_message
+    assert asyncio.run(publisher.publish_article(article))
+    assert states == [OUTBOX_SENDING]
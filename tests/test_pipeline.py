@@ -0,0 +1,89 @@
+import asyncio
+
+from pipeline import Pipeline, Stage
+
+
+def run(stages, items, queue_size=2):
+    pipeline = Pipeline(stages, queue_size)
+    return asyncio.run(pipeline.run(items))
+
+
+def test_items_flow_through_every_stage():
+    results = []
+
+    async def double(item):
+        return [item, item + 100]
+
+    async def collect(item):
+        results.append(item)
+
+    stats = run([Stage("double", double, 2), Stage("collect", collect)], range(5))
+    assert sorted(results) == [0, 1, 2, 3, 4, 100, 101, 102, 103, 104]
+    assert (stats["double"].processed, stats["double"].emitted) == (5, 10)
+    assert stats["collect"].processed == 10
+
+
+def test_failing_item_does_not_stop_the_stage():
+    results = []
+
+    async def check(item):
+        if item == 2:
+            raise ValueError("bad item")
+        return [item]
+
+    async def collect(item):
+        results.append(item)
+
+    stats = run([Stage("check", check), Stage("collect", collect)], range(4))
+    assert sorted(results) == [0, 1, 3]
+    assert stats["check"].errors == 1
+
+
+def test_batched_stage_receives_lists():
+    batches = []
+
+    async def slow_pass(item):
+        return [item]
+
+    async def collect(items):
+        batches.append(list(items))
+        await asyncio.sleep(0.01)
+
+    run([Stage("pass", slow_pass, 4), Stage("collect", collect, batch_size=3)], range(7), queue_size=10)
+    assert sorted(item for batch in batches for item in batch) == list(range(7))
+    assert max(len(batch) for batch in batches) <= 3
+    assert any(len(batch) > 1 for batch in batches)
+
+
+def test_slow_stage_bounds_the_queue_in_front_of_it():
+    async def fast(item):
+        return [item]
+
+    async def slow(item):
+        await asyncio.sleep(0.005)
+
+    stats = run([Stage("fast", fast, 4), Stage("slow", slow)], range(30), queue_size=3)
+    assert stats["slow"].processed == 30
+    assert stats["slow"].queue_peak <= 3
+    assert stats["fast"].blocked_time > 0
+
+
+def test_first_item_reaches_the_end_before_the_input_is_exhausted():
+    finished = []
+
+    async def produce(item):
+        await asyncio.sleep(0.01)
+        return [item]
+
+    async def finish(item):
+        finished.append(item)
+
+    def items():
+        for item in range(5):
+            # The first item has gone through by the time the last is fed
+            if item == 4:
+                assert finished
+            yield item
+
+    run([Stage("produce", produce), Stage("finish", finish)], items(), queue_size=1)
+    assert sorted(finished) == list(range(5))
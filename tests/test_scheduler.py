@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+
+from scheduler import CronSchedule
+
+
+def test_fields_parse_lists_ranges_and_steps():
+    schedule = CronSchedule("*/15 9-17 1,15 * 1-5")
+    assert schedule.minutes == {0, 15, 30, 45}
+    assert schedule.hours == set(range(9, 18))
+    assert schedule.days == {1, 15}
+    assert schedule.months == set(range(1, 13))
+    assert schedule.weekdays == {1, 2, 3, 4, 5}
+
+
+def test_single_value_with_step_runs_to_the_end_of_the_field():
+    assert CronSchedule("5/20 * * * *").minutes == {5, 25, 45}
+
+
+def test_seven_is_sunday():
+    assert CronSchedule("0 0 * * 7").weekdays == {0}
+    assert CronSchedule("0 0 * * 5-7").weekdays == {5, 6, 0}
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "* * * * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "10-5 * * * *",
+    "*/0 * * * *",
+    "x * * * *",
+])
+def test_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_next_after_is_strictly_later():
+    schedule = CronSchedule("30 * * * *")
+    assert schedule.next_after(datetime(2024, 3, 10, 12, 30, 15)) == datetime(2024, 3, 10, 13, 30)
+    assert schedule.next_after(datetime(2024, 3, 10, 12, 29, 59)) == datetime(2024, 3, 10, 12, 30)
+
+
+def test_next_after_rolls_over_day_month_and_year():
+    schedule = CronSchedule("0 6 1 1 *")
+    assert schedule.next_after(datetime(2024, 1, 1, 6, 0)) == datetime(2025, 1, 1, 6, 0)
+    assert CronSchedule("15 0 * * *").next_after(datetime(2024, 2, 29, 23, 50)) == datetime(2024, 3, 1, 0, 15)
+
+
+def test_next_after_weekday():
+    # 2024-03-10 is a Sunday
+    assert CronSchedule("0 8 * * 1").next_after(datetime(2024, 3, 10, 9, 0)) == datetime(2024, 3, 11, 8, 0)
+    assert CronSchedule("0 8 * * 0").next_after(datetime(2024, 3, 10, 7, 0)) == datetime(2024, 3, 10, 8, 0)
+
+
+def test_restricted_day_and_weekday_match_either():
+    # The 15th, or any Monday
+    schedule = CronSchedule("0 0 15 * 1")
+    assert schedule.next_after(datetime(2024, 3, 10, 12, 0)) == datetime(2024, 3, 11, 0, 0)
+    assert schedule.next_after(datetime(2024, 3, 12, 12, 0)) == datetime(2024, 3, 15, 0, 0)
+
+
+def test_day_that_never_exists_is_an_error():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2024, 1, 1))
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from config import Config
+from database import Article, Section
+from sites import SiteProfile, SiteRegistry, local_section_name
+
+
+@pytest.fixture
+def news():
+    return SiteProfile(
+        name="news", website_url="https://www.news.example/",
+        sections={"politics": {"url": "https://www.news.example/politics/"}},
+        section_settings={"politics": {"emoji": "🏛"}},
+        include_keywords=["اليمن"], exclude_keywords=["رياضة"], important_keywords=["عاجل"]
+    )
+
+
+@pytest.fixture
+def blog():
+    return SiteProfile(name="blog", website_url="https://blog.example")
+
+
+def test_urls_are_matched_by_host(news):
+    assert news.host == "news.example"
+    assert news.owns("https://news.example/archives/1")
+    assert news.is_article_url("https://www.news.example/archives/1")
+    assert not news.is_article_url("https://www.news.example/category/politics/")
+    assert not news.owns("https://other.example/archives/1")
+
+
+def test_section_names_are_namespaced_except_for_the_default_site(news):
+    assert news.section_name("politics") == "news:politics"
+    assert local_section_name("news", "news:politics") == "politics"
+    assert SiteProfile(name="default", website_url="https://x.example").section_name("politics") == "politics"
+    assert news.get_section_settings("news:politics") == {"emoji": "🏛"}
+
+
+def test_keyword_filters(news, monkeypatch):
+    monkeypatch.setattr(Config, "EXCLUDE_KEYWORDS", ["إعلان"])
+    assert news.should_include(Article(title="أخبار اليمن"))
+    assert not news.should_include(Article(title="رياضة اليمن"))
+    assert not news.should_include(Article(title="إعلان عن اليمن"))
+    assert not news.should_include(Article(title="أخبار العالم"))
+
+
+def test_important_keywords(news):
+    assert news.is_important(Article(title="عاجل: خبر"))
+    assert not news.is_important(Article(title="خبر"))
+
+
+def test_default_profile_reads_important_keywords_from_config(monkeypatch):
+    monkeypatch.setattr(Config, "IMPORTANT_KEYWORDS", ["عاجل"])
+    assert SiteProfile.from_config().is_important(Article(title="عاجل"))
+
+
+def test_registry_lookups(news, blog):
+    registry = SiteRegistry([news, blog])
+    assert registry.default is news
+    assert registry.for_url("https://blog.example/post") is blog
+    assert registry.for_url("https://unknown.example/") is news
+    section = Section(name="blog:posts", url="https://elsewhere.example/", custom_settings={"site": "blog"})
+    assert registry.for_section(section) is blog
+
+
+def test_interleave_alternates_sites(news, blog):
+    registry = SiteRegistry([news, blog])
+    sections = [Section(name=f"n{i}", url="https://news.example/") for i in range(3)]
+    sections += [Section(name="b0", url="https://blog.example/")]
+    assert [section.name for section in registry.interleave(sections)] == ["n0", "b0", "n1", "n2"]
+
+
+def test_profile_from_file_ignores_unknown_fields(tmp_path):
+    path = tmp_path / "site.json"
+    path.write_text(json.dumps({"name": "saba", "website_url": "https://saba.example", "colour": "red"}))
+    profile = SiteProfile.from_file(str(path))
+    assert (profile.name, profile.display_name) == ("saba", "saba")
+
+
+def test_broken_profile_is_skipped_unless_strict(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SITE_PROFILES", ["default", str(tmp_path / "missing.json")])
+    registry = SiteRegistry.from_config()
+    assert list(registry.profiles) == ["default"]
+    assert registry.failed == [str(tmp_path / "missing.json")]
+
+    with pytest.raises(ValueError):
+        SiteRegistry.from_config(strict=True)
+
+
+def test_reload_reports_changed_profiles(tmp_path, monkeypatch):
+    path = tmp_path / "saba.json"
+    path.write_text(json.dumps({"name": "saba", "website_url": "https://saba.example"}))
+    monkeypatch.setattr(Config, "SITE_PROFILES", ["default", str(path)])
+    registry = SiteRegistry.from_config()
+    default = registry.get("default")
+
+    path.write_text(json.dumps({"name": "saba", "website_url": "https://saba.example", "footer": "سبأ"}))
+    assert registry.reload() == ["saba"]
+    assert registry.get("saba").footer == "سبأ"
+    # Unchanged profiles are kept as they are
+    assert registry.get("default") is default
+
+    # A broken profile aborts the reload
+    path.write_text("{")
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert registry.get("saba").footer == "سبأ"
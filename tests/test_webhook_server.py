@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from config import Config
+from webhook_server import SECRET_TOKEN_HEADER, WebhookServer
+
+UPDATE = {"update_id": 1, "message": {
+    "message_id": 5, "date": 0, "chat": {"id": 7, "type": "private"}, "text": "/status"
+}}
+
+
+@pytest.fixture(autouse=True)
+def secret(monkeypatch):
+    monkeypatch.setattr(Config, "WEBHOOK_SECRET_TOKEN", "s3cret")
+
+
+def post(body=None, headers=None, data=None):
+    """Status of a request to the webhook endpoint and the updates it queued"""
+    async def run():
+        server = WebhookServer(SimpleNamespace(bot=None, update_queue=asyncio.Queue()))
+        app = web.Application()
+        app.router.add_post("/webhook", server.handle_update)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.post("/webhook", json=body, data=data, headers=headers or {})
+        queue = server.application.update_queue
+        return response.status, [queue.get_nowait() for _ in range(queue.qsize())]
+
+    return asyncio.run(run())
+
+
+def test_update_with_the_secret_is_queued():
+    status, updates = post(UPDATE, {SECRET_TOKEN_HEADER: "s3cret"})
+    assert status == 200
+    assert [update.update_id for update in updates] == [1]
+
+
+@pytest.mark.parametrize("headers", [{}, {SECRET_TOKEN_HEADER: "wrong"}, {SECRET_TOKEN_HEADER: "sécret"}])
+def test_missing_or_wrong_secret_is_forbidden(headers):
+    assert post(UPDATE, headers) == (403, [])
+
+
+def test_body_that_is_not_json_is_rejected():
+    assert post(data=b"{not json", headers={SECRET_TOKEN_HEADER: "s3cret"}) == (400, [])
+
+
+@pytest.mark.parametrize("body", [[1, 2], {"message": "hello"}])
+def test_json_that_is_not_an_update_is_rejected(body):
+    assert post(body, {SECRET_TOKEN_HEADER: "s3cret"}) == (400, [])
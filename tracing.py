@@ -0,0 +1,218 @@
+"""
+Article tracing and profiling
+=============================
+
+A lightweight span API recording where each article's time goes: every
+pipeline step, extractor, Telegraph and Telegram call is timed as a span
+of the article's trace, keyed by the article URL. The most recent traces
+are kept in a fixed-size ring buffer for the /trace admin command.
+
+SamplingProfiler takes periodic stack samples of every thread for a few
+seconds and reports the hottest functions, for the /profile command.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """Timed step of an article"""
+    name: str
+    started_at: float  # Wall-clock timestamp
+    duration: float
+    error: str = ""
+
+
+@dataclass
+class Trace:
+    """Timeline of one article"""
+    key: str
+    title: str = ""
+    spans: List[Span] = field(default_factory=list)
+
+    @property
+    def started_at(self) -> float:
+        return min((span.started_at for span in self.spans), default=0.0)
+
+    @property
+    def duration(self) -> float:
+        """Wall time from the first span's start to the last span's end"""
+        if not self.spans:
+            return 0.0
+        return max(span.started_at + span.duration for span in self.spans) - self.started_at
+
+    def format_timeline(self) -> str:
+        """One line per span: offset from the start of the trace, duration and name"""
+        start = self.started_at
+        lines = []
+        for span in sorted(self.spans, key=lambda span: span.started_at):
+            line = f"+{span.started_at - start:7.2f}s {span.duration:7.2f}s  {span.name}"
+            if span.error:
+                line += f" ✗ {span.error}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+class Tracer:
+    """Per-article spans kept in a ring buffer of the most recent traces"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()  # Extraction spans are recorded from worker threads
+
+    def _get_trace(self, key: str) -> Trace:
+        trace = self._traces.get(key)
+        if trace is None:
+            trace = self._traces[key] = Trace(key)
+            while len(self._traces) > self.capacity:
+                self._traces.popitem(last=False)
+        return trace
+
+    def record(self, key: str, name: str, started_at: float, duration: float, error: str = ""):
+        """Add a finished span to the trace of key"""
+        if not key or self.capacity <= 0:
+            return
+        with self._lock:
+            self._get_trace(key).spans.append(Span(name, started_at, duration, error))
+
+    @contextmanager
+    def span(self, key: str, name: str):
+        """Time the with-block as a span of key's trace, also when it raises"""
+        started_at = time.time()
+        started = time.perf_counter()
+        error = ""
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(key, name, started_at, time.perf_counter() - started, error)
+
+    def resize(self, capacity: int):
+        """Change the number of traces kept, dropping the oldest ones beyond it"""
+        with self._lock:
+            self.capacity = capacity
+            while len(self._traces) > max(capacity, 0):
+                self._traces.popitem(last=False)
+
+    def set_title(self, key: str, title: str):
+        """Name a trace after its article once the title is known"""
+        if not key or self.capacity <= 0:
+            return
+        with self._lock:
+            self._get_trace(key).title = title
+
+    def get(self, key: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(key)
+
+    def recent(self, limit: int = 10) -> List[Trace]:
+        """Most recently started traces first"""
+        with self._lock:
+            traces = list(self._traces.values())
+        return traces[::-1][:limit]
+
+    def slowest(self, limit: int = 5) -> List[Trace]:
+        """Traces in the buffer with the longest timelines"""
+        with self._lock:
+            traces = list(self._traces.values())
+        return sorted(traces, key=lambda trace: trace.duration, reverse=True)[:limit]
+
+
+tracer = Tracer(Config.TRACE_BUFFER_SIZE)
+
+
+# Leaf frames of threads blocked waiting for work rather than running
+IDLE_FRAMES = {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get")}
+
+
+def _frame_key(frame) -> Tuple[str, str, int]:
+    code = frame.f_code
+    return os.path.basename(code.co_filename), code.co_name, code.co_firstlineno
+
+
+@dataclass
+class ProfileResult:
+    """Outcome of a profiling run"""
+    duration: float
+    samples: int  # Busy thread samples
+    idle_samples: int
+    self_counts: Dict[Tuple[str, str, int], int]
+    total_counts: Dict[Tuple[str, str, int], int]
+
+    def top(self, limit: int = 15) -> List[Tuple[Tuple[str, str, int], float, float]]:
+        """Hottest functions: (file, function, line), self share, inclusive share"""
+        if not self.samples:
+            return []
+        ranked = sorted(self.self_counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            (key, count / self.samples, self.total_counts.get(key, count) / self.samples)
+            for key, count in ranked
+        ]
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stacks of all threads"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, seconds: float) -> ProfileResult:
+        """Sample for the given time (blocking, run it in a thread)"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profiling run is already in progress")
+
+        try:
+            own_thread = threading.get_ident()
+            self_counts = Counter()
+            total_counts = Counter()
+            samples = idle_samples = 0
+
+            started = time.perf_counter()
+            deadline = started + seconds
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    leaf = _frame_key(frame)
+                    if leaf[:2] in IDLE_FRAMES:
+                        idle_samples += 1
+                        continue
+
+                    samples += 1
+                    self_counts[leaf] += 1
+                    seen = set()
+                    while frame is not None:
+                        key = _frame_key(frame)
+                        if key not in seen:
+                            seen.add(key)
+                            total_counts[key] += 1
+                        frame = frame.f_back
+                time.sleep(self.interval)
+
+            return ProfileResult(time.perf_counter() - started, samples, idle_samples,
+                                 dict(self_counts), dict(total_counts))
+        finally:
+            self._lock.release()
+
+
+profiler = SamplingProfiler(Config.PROFILE_SAMPLE_INTERVAL)
@@ -0,0 +1,79 @@
+import hmac
+import logging
+import secrets
+from typing import Optional
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+class WebhookServer:
+    """Embedded aiohttp server that receives Telegram updates via webhook"""
+
+    def __init__(self, application: Application):
+        self.application = application
+        self.runner: Optional[web.AppRunner] = None
+        # Telegram sends this token back with every update, generate one if not configured
+        self.secret_token = Config.WEBHOOK_SECRET_TOKEN or secrets.token_urlsafe(32)
+
+    @property
+    def webhook_url(self) -> str:
+        """Public URL Telegram posts updates to"""
+        return f"{Config.WEBHOOK_URL.rstrip('/')}{Config.WEBHOOK_PATH}"
+
+    async def start(self):
+        """Start the HTTP endpoint and register the webhook with Telegram"""
+        app = web.Application()
+        app.router.add_post(Config.WEBHOOK_PATH, self.handle_update)
+
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, Config.WEBHOOK_LISTEN, Config.WEBHOOK_PORT)
+        await site.start()
+
+        await self.application.bot.set_webhook(
+            url=self.webhook_url,
+            secret_token=self.secret_token,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=True
+        )
+
+        logger.info(
+            f"Webhook listening on {Config.WEBHOOK_LISTEN}:{Config.WEBHOOK_PORT}{Config.WEBHOOK_PATH}"
+        )
+
+    async def stop(self):
+        """Stop the HTTP endpoint"""
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Verify and enqueue an incoming update"""
+        # Compared as bytes: compare_digest rejects str with non-ASCII characters
+        token = request.headers.get(SECRET_TOKEN_HEADER, "").encode("utf-8", "surrogateescape")
+        if not hmac.compare_digest(token, self.secret_token.encode()):
+            logger.warning(f"Rejected webhook request from {request.remote}: bad secret token")
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+        except Exception:
+            return web.Response(status=400)
+
+        # Valid JSON that is not an update
+        try:
+            update = Update.de_json(data, self.application.bot)
+        except Exception as e:
+            logger.warning(f"Rejected webhook request from {request.remote}: not an update ({e})")
+            return web.Response(status=400)
+
+        if update:
+            await self.application.update_queue.put(update)
+
+        return web.Response()
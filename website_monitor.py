@@ -1,21 +1,60 @@
 import requests
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
-from newspaper import Article as NewsArticle
-from readability import Document
+import importlib
 from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
-import html2text
+import hashlib
+import html
 import re
 import logging
 from urllib.parse import urljoin, urlparse
 from config import Config
 from database import Database, Article, Section
+from metrics import SECTION_FETCH_SECONDS, EXTRACTION_SECONDS, record_error
+from tracing import tracer
+from sites import SiteProfile, site_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Parsing libraries imported on first use; newspaper alone pulls in NLTK and lxml
+EXTRACTOR_MODULES = ("bs4", "newspaper", "readability", "html2text")
+
+def preload_extractors():
+    """Import the parsing libraries ahead of the first extraction (blocking)"""
+    for name in EXTRACTOR_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.error(f"Error importing {name}: {e}")
+
+def parse_html(markup):
+    """Parse HTML with BeautifulSoup"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, 'html.parser')
+
+# Article fields compared when revalidating published articles
+REVALIDATED_FIELDS = ("title", "summary", "content", "image_url")
+
+def article_fingerprints(article: Article) -> Dict[str, str]:
+    """Fingerprint each revalidated field, ignoring whitespace changes"""
+    return {
+        name: hashlib.sha1(" ".join((getattr(article, name) or "").split()).encode()).hexdigest()
+        for name in REVALIDATED_FIELDS
+    }
+
+@dataclass
+class SourceChange:
+    """Edit detected on the source page of a published article"""
+    article: Article
+    fresh: Article
+    changed_fields: List[str]
+    fingerprints: Dict[str, str] = field(default_factory=dict)
+    etag: str = ""
+    last_modified: str = ""
+
 class WebsiteMonitor:
     """Website monitoring and content extraction"""
     
@@ -45,43 +84,16 @@ class WebsiteMonitor:
     async def check_section(self, section: Section) -> List[Article]:
         """Check a specific section for new articles"""
         try:
-            # Get the section page
-            response = self.session.get(section.url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find articles using the section selector
-            article_elements = soup.select(section.selector) if section.selector else soup.find_all('a', href=True)
-            
             new_articles = []
             
-            for element in article_elements:
+            for article_url in await self.discover_article_urls(section):
                 try:
-                    # Extract article URL
-                    article_url = self._extract_article_url(element, section.url)
-                    
-                    if not article_url or not self._is_valid_article_url(article_url):
-                        continue
-                    
-                    # Check if article already exists
-                    existing_article = self.db.get_article_by_url(article_url)
-                    if existing_article:
-                        continue
-                    
                     # Extract and process article
-                    article = await self.extract_article(article_url, section.name)
-                    if article:
-                        # Apply section-specific settings
-                        article = self._apply_section_settings(article, section)
-                        
-                        # Apply filters
-                        if self._should_include_article(article):
-                            article_id = self.db.add_article(article)
-                            if article_id > 0:
-                                article.id = article_id
-                                new_articles.append(article)
-                                logger.info(f"Added new article: {article.title}")
+                    article = await self.extract_section_article(article_url, section)
+                    
+                    # Apply filters
+                    if article and self.should_include_article(article) and self.store_article(article):
+                        new_articles.append(article)
                         
                 except Exception as e:
                     logger.error(f"Error processing article element: {e}")
@@ -92,24 +104,111 @@ class WebsiteMonitor:
             logger.error(f"Error checking section {section.name}: {e}")
             return []
     
-    async def extract_article(self, url: str, section: str) -> Optional[Article]:
-        """Extract article content from URL"""
+    async def fetch_page(self, url: str) -> str:
+        """Download a page without blocking the event loop"""
+        response = await asyncio.to_thread(self.session.get, url, timeout=30)
+        response.raise_for_status()
+        return response.text
+    
+    async def discover_article_urls(self, section: Section) -> List[str]:
+        """List the article URLs of a section page that are not stored yet"""
+        # Get the section page
+        with SECTION_FETCH_SECONDS.time(section=section.name):
+            page_html = await self.fetch_page(section.url)
+        
+        # Parsing a large listing page and the lookups block, run them in a worker thread
+        return await asyncio.to_thread(self._find_article_urls, page_html, section.url, section.selector)
+    
+    def _find_article_urls(self, page_html: str, base_url: str, selector: str, new_only: bool = True) -> List[str]:
+        """Parse a section page into its article URLs (blocking)"""
+        soup = parse_html(page_html)
+        
+        # Only articles of the section's own site
+        site = site_registry.find(base_url)
+        
+        # Find articles using the section selector
+        article_elements = soup.select(selector) if selector else soup.find_all('a', href=True)
+        
+        urls = []
+        for element in article_elements:
+            # Extract article URL
+            article_url = self._extract_article_url(element, base_url)
+            
+            if not article_url or not self._is_valid_article_url(article_url, site) or article_url in urls:
+                continue
+            
+            # Check if article already exists
+            if new_only and self.db.get_article_by_url(article_url):
+                continue
+            
+            urls.append(article_url)
+        
+        return urls
+    
+    async def extract_section_article(self, url: str, section: Section, page_html: str = None) -> Optional[Article]:
+        """Extract an article and apply its section's settings"""
+        article = await self.extract_article(url, section.name, page_html=page_html)
+        if article:
+            article = self._apply_section_settings(article, section)
+        return article
+    
+    def store_article(self, article: Article) -> bool:
+        """Store a new article, queueing it for publishing or for the admins' approval"""
+        article_id = self.db.add_article(article)
+        if article_id <= 0:
+            return False
+        
+        article.id = article_id
+        if Config.AUTO_PUBLISH:
+            # Queue before publishing so a crash can't lose it
+            self.db.enqueue_publish(article_id)
+        else:
+            # Sent to the admins by the leader, also when a follower stored it
+            self.db.request_approval_notice(article_id)
+        logger.info(f"Added new article: {article.title}")
+        return True
+    
+    async def extract_article(self, url: str, section: str, page_html: str = None) -> Optional[Article]:
+        """Extract article content from URL, or from its already downloaded HTML"""
+        # Parsing and the fallback downloads are blocking, run them in a worker thread
+        return await asyncio.to_thread(self._extract_article_sync, url, section, page_html)
+    
+    def _extract_article_sync(self, url: str, section: str, page_html: str = None) -> Optional[Article]:
+        """Extract article content (blocking)"""
         try:
-            # Use newspaper3k for content extraction
-            news_article = NewsArticle(url)
-            news_article.download()
-            news_article.parse()
+            from newspaper import Article as NewsArticle
+            
+            site = site_registry.for_url(url)
+            
+            # Use newspaper3k for content extraction, keeping the cleaned body HTML
+            with EXTRACTION_SECONDS.time(extractor="newspaper"), tracer.span(url, "extract.newspaper"):
+                news_article = NewsArticle(url, keep_article_html=True)
+                news_article.download(input_html=page_html)
+                news_article.parse()
             
             # Fallback to manual extraction if newspaper3k fails
             if not news_article.text:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
+                if page_html is None:
+                    response = self.session.get(url, timeout=30)
+                    response.raise_for_status()
+                    page_html = response.text
+                
+                # Use the site's content selectors, then readability for content extraction
+                content = ""
+                if site.selectors("content"):
+                    with EXTRACTION_SECONDS.time(extractor="selectors"), tracer.span(url, "extract.selectors"):
+                        content = self._select_content(page_html, site)
                 
-                # Use readability for content extraction
-                doc = Document(response.text)
-                content = doc.summary()
+                if not content:
+                    from readability import Document
+                    
+                    with EXTRACTION_SECONDS.time(extractor="readability"), tracer.span(url, "extract.readability"):
+                        doc = Document(page_html)
+                        content = doc.summary()
                 
-                soup = BeautifulSoup(content, 'html.parser')
+                import html2text
+                
+                soup = parse_html(content)
                 text_content = soup.get_text(strip=True)
                 
                 # Convert HTML to markdown
@@ -117,13 +216,15 @@ class WebsiteMonitor:
                 h.ignore_links = False
                 h.ignore_images = False
                 markdown_content = h.handle(content)
+                content_html = content
                 
             else:
                 text_content = news_article.text
                 markdown_content = self._convert_to_markdown(text_content)
+                content_html = news_article.article_html or ""
             
             # Extract additional information
-            title = news_article.title or self._extract_title_from_url(url)
+            title = news_article.title or self._extract_title_from_url(url, site)
             author = news_article.authors[0] if news_article.authors else ""
             publish_date = news_article.publish_date or datetime.now()
             
@@ -132,7 +233,7 @@ class WebsiteMonitor:
             if news_article.top_image:
                 image_url = news_article.top_image
             else:
-                image_url = self._extract_main_image(url)
+                image_url = self._extract_main_image(url, site)
             
             # Create summary
             summary = self._create_summary(text_content)
@@ -151,15 +252,78 @@ class WebsiteMonitor:
                 section=section,
                 image_url=image_url,
                 tags=tags,
-                needs_approval=not Config.AUTO_PUBLISH
+                needs_approval=not Config.AUTO_PUBLISH,
+                content_html=content_html
             )
             
             return article
             
         except Exception as e:
+            record_error("extract", e)
             logger.error(f"Error extracting article from {url}: {e}")
             return None
     
+    async def revalidate_article(self, article: Article) -> Optional[SourceChange]:
+        """Check a published article's source page for edits.
+        
+        Uses the stored ETag/Last-Modified validators so unchanged pages cost a
+        304, and compares per-field fingerprints to report only what changed.
+        """
+        revision = self.db.get_article_revision(article.id) or {}
+        
+        headers = {}
+        if revision.get('etag'):
+            headers['If-None-Match'] = revision['etag']
+        if revision.get('last_modified'):
+            headers['If-Modified-Since'] = revision['last_modified']
+        
+        try:
+            response = await asyncio.to_thread(self.session.get, article.url, headers=headers, timeout=30)
+            
+            if response.status_code == 304:
+                self.db.save_article_revision(article.id)
+                return None
+            response.raise_for_status()
+            
+            etag = response.headers.get('ETag', '')
+            last_modified = response.headers.get('Last-Modified', '')
+            
+            fresh = await self.extract_article(article.url, article.section, page_html=response.text)
+            if not fresh or not fresh.title:
+                return None
+            
+            # Compare like with like: stored articles carry the section formatting
+            section = next((s for s in self.db.get_active_sections() if s.name == article.section), None)
+            if section:
+                fresh = self._apply_section_settings(fresh, section)
+            
+            # The first check compares against what was published
+            previous = revision.get('fingerprints') or article_fingerprints(article)
+            fingerprints = article_fingerprints(fresh)
+            changed_fields = [name for name in REVALIDATED_FIELDS if fingerprints[name] != previous.get(name)]
+            
+            # An image that could not be extracted this time is not a removal
+            if 'image_url' in changed_fields and not fresh.image_url:
+                changed_fields.remove('image_url')
+                fingerprints['image_url'] = previous.get('image_url', '')
+            
+            if not changed_fields:
+                self.db.save_article_revision(article.id, etag, last_modified, fingerprints)
+                return None
+            
+            return SourceChange(
+                article=article,
+                fresh=fresh,
+                changed_fields=changed_fields,
+                fingerprints=fingerprints,
+                etag=etag,
+                last_modified=last_modified
+            )
+        
+        except Exception as e:
+            logger.error(f"Error revalidating {article.url}: {e}")
+            return None
+    
     def _extract_article_url(self, element, base_url: str) -> str:
         """Extract article URL from element"""
         if element.name == 'a':
@@ -172,36 +336,35 @@ class WebsiteMonitor:
             return urljoin(base_url, href)
         return ""
     
-    def _is_valid_article_url(self, url: str) -> bool:
-        """Check if URL is a valid article URL"""
+    def _is_valid_article_url(self, url: str, site: Optional[SiteProfile] = None) -> bool:
+        """Check if URL is a valid article URL of the given site, or of any monitored site"""
         if not url:
             return False
         
-        # Skip external URLs
-        if not url.startswith(Config.WEBSITE_URL):
-            return False
-        
-        # Skip common non-article URLs
-        skip_patterns = [
-            '/category/', '/tag/', '/author/', '/page/', '/search/',
-            '.pdf', '.doc', '.zip', '.jpg', '.png', '.gif',
-            '/wp-admin/', '/wp-content/', '/feed/', '/rss/'
-        ]
-        
-        for pattern in skip_patterns:
-            if pattern in url.lower():
-                return False
-        
-        return True
+        # Skip external URLs and common non-article URLs
+        if site:
+            return site.is_article_url(url)
+        return site_registry.is_article_url(url)
     
-    def _extract_title_from_url(self, url: str) -> str:
+    def _select_content(self, page_html: str, site: SiteProfile) -> str:
+        """HTML of the first element matching one of the site's content selectors"""
+        soup = parse_html(page_html)
+        for selector in site.selectors("content"):
+            element = soup.select_one(selector)
+            if element and element.get_text(strip=True):
+                return str(element)
+        return ""
+    
+    def _extract_title_from_url(self, url: str, site: Optional[SiteProfile] = None) -> str:
         """Extract title from URL as fallback"""
         try:
             response = self.session.get(url, timeout=30)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(response.content)
             
-            # Try different title selectors
-            title_selectors = ['h1', 'title', '.entry-title', '.post-title', '.article-title']
+            # Try the site's title selectors, then common ones
+            title_selectors = (site.selectors("title") if site else []) + [
+                'h1', 'title', '.entry-title', '.post-title', '.article-title'
+            ]
             
             for selector in title_selectors:
                 element = soup.select_one(selector)
@@ -214,11 +377,11 @@ class WebsiteMonitor:
         except Exception:
             return url.split('/')[-1].replace('-', ' ').replace('_', ' ').title()
     
-    def _extract_main_image(self, url: str) -> str:
+    def _extract_main_image(self, url: str, site: Optional[SiteProfile] = None) -> str:
         """Extract main image from article"""
         try:
             response = self.session.get(url, timeout=30)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(response.content)
             
             # Try different image selectors
             image_selectors = [
@@ -228,7 +391,7 @@ class WebsiteMonitor:
                 '.post-thumbnail img',
                 '.entry-content img:first-child',
                 'img[src*="featured"]'
-            ]
+            ] + (site.selectors("image") if site else [])
             
             for selector in image_selectors:
                 element = soup.select_one(selector)
@@ -292,14 +455,20 @@ class WebsiteMonitor:
     
     def _apply_section_settings(self, article: Article, section: Section) -> Article:
         """Apply section-specific settings to article"""
-        settings = section.custom_settings
+        # The section's own settings override its site profile's
+        site = site_registry.for_section(section)
+        settings = {**site.get_section_settings(section.name), **section.custom_settings}
         
         # Apply custom formatting
         if settings.get('custom_header'):
             article.content = settings['custom_header'] + '\n\n' + article.content
+            if article.content_html:
+                article.content_html = f"<p>{html.escape(settings['custom_header'])}</p>" + article.content_html
         
         if settings.get('custom_footer'):
             article.content = article.content + '\n\n' + settings['custom_footer']
+            if article.content_html:
+                article.content_html += f"<p>{html.escape(settings['custom_footer'])}</p>"
         
         # Apply custom tags
         if settings.get('default_tags'):
@@ -307,24 +476,10 @@ class WebsiteMonitor:
         
         return article
     
-    def _should_include_article(self, article: Article) -> bool:
+    def should_include_article(self, article: Article) -> bool:
         """Check if article should be included based on filters"""
-        # Check exclude keywords
-        if Config.EXCLUDE_KEYWORDS:
-            text_to_check = f"{article.title} {article.content}".lower()
-            for keyword in Config.EXCLUDE_KEYWORDS:
-                if keyword.lower() in text_to_check:
-                    return False
-        
-        # Check include keywords (if specified, at least one must match)
-        if Config.INCLUDE_KEYWORDS:
-            text_to_check = f"{article.title} {article.content}".lower()
-            for keyword in Config.INCLUDE_KEYWORDS:
-                if keyword.lower() in text_to_check:
-                    return True
-            return False  # None of the include keywords matched
-        
-        return True
+        # Global keywords plus those of the article's site
+        return site_registry.for_article(article).should_include(article)
     
     def add_section(self, name: str, url: str, selector: str = "", custom_settings: Dict = None) -> int:
         """Add a new section to monitor"""
@@ -344,19 +499,8 @@ class WebsiteMonitor:
     async def test_section(self, url: str, selector: str = "") -> List[str]:
         """Test section monitoring and return found article URLs"""
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find articles using the selector
-            article_elements = soup.select(selector) if selector else soup.find_all('a', href=True)
-            
-            article_urls = []
-            for element in article_elements:
-                article_url = self._extract_article_url(element, url)
-                if article_url and self._is_valid_article_url(article_url):
-                    article_urls.append(article_url)
+            page_html = await self.fetch_page(url)
+            article_urls = await asyncio.to_thread(self._find_article_urls, page_html, url, selector, False)
             
             return article_urls[:10]  # Return first 10 for testing
             